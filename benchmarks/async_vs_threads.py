@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Async Engine vs Thread Workers for I/O-bound Jobs
+
+Runs N jobs whose handler waits on simulated I/O, once on thread Workers
+(one OS thread per concurrent job) and once on the AsyncWorkerEngine, and
+reports jobs/sec and resident memory growth.
+"""
+import sys
+import os
+import argparse
+import resource
+import threading
+import time
+from datetime import datetime
+from functools import partial
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config.execution_backend import ExecutionBackend
+from src.main.config.job_status import JobStatus
+from src.main.config import event_log
+from src.main.config.job_type import JobType
+from src.main.job.job import Job
+from src.main.worker.async_worker import AsyncWorkerEngine
+from src.main.worker.job_handlers import JobHandlerRegistry, simulate_io, simulate_work
+from src.main.worker.worker import Worker
+from src.main.worker.worker_queue import WorkerQueue
+
+def rss_mb():
+    """Current resident set size in MB (falls back to peak RSS off Linux)"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def wait_for(jobs, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(job.status in (JobStatus.COMPLETED, JobStatus.FAILED) for job in jobs):
+            return True
+        time.sleep(0.05)
+    return False
+
+def run_threads(num_jobs, concurrency, io_seconds):
+    handlers = JobHandlerRegistry()
+    handlers.register(JobType.EMAIL, partial(simulate_work, io_seconds))
+    queue = WorkerQueue()
+    jobs = [Job(f"task-{i}", datetime.now(), job_type=JobType.EMAIL) for i in range(num_jobs)]
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    workers = [Worker(f"t{i}", queue, handlers) for i in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for job in jobs:
+        queue.push(job)
+    wait_for(jobs, timeout=io_seconds * num_jobs / concurrency + 60)
+    elapsed = time.perf_counter() - start
+    rss_growth = rss_mb() - rss_before
+    for worker in workers:
+        worker.running = False
+    return num_jobs / elapsed, rss_growth
+
+def run_async(num_jobs, concurrency, io_seconds):
+    handlers = JobHandlerRegistry()
+    handlers.register(JobType.EMAIL, partial(simulate_io, io_seconds), ExecutionBackend.ASYNC)
+    jobs = [Job(f"task-{i}", datetime.now(), job_type=JobType.EMAIL) for i in range(num_jobs)]
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    engine = AsyncWorkerEngine("bench", handlers, max_concurrency=concurrency)
+    engine.start()
+    for job in jobs:
+        engine.worker_queue.push(job)
+    wait_for(jobs, timeout=io_seconds * num_jobs / concurrency + 60)
+    elapsed = time.perf_counter() - start
+    rss_growth = rss_mb() - rss_before
+    engine.stop()
+    return num_jobs / elapsed, rss_growth
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=10000)
+    parser.add_argument("--io-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+    # Per-job events would only add console I/O to the measurements
+    event_log.configure(level=event_log.WARNING)
+
+    print("=" * 60)
+    print(f"ASYNC vs THREADS ({args.jobs} jobs, {args.concurrency} concurrent, "
+          f"{args.io_seconds}s I/O each)")
+    print("=" * 60)
+    async_rate, async_rss = run_async(args.jobs, args.concurrency, args.io_seconds)
+    print(f"{'async engine':<16} {async_rate:>10,.0f} jobs/s   RSS +{async_rss:.1f} MB")
+    threading.stack_size(256 * 1024)
+    thread_rate, thread_rss = run_threads(args.jobs, args.concurrency, args.io_seconds)
+    print(f"{'thread workers':<16} {thread_rate:>10,.0f} jobs/s   RSS +{thread_rss:.1f} MB")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Autoscale Replay: ScalingPolicy against a burst trace, in simulated time
+
+Replays job arrivals through a simulated worker pool driven by the same
+ScalingPolicy the WorkerPool uses, and compares it with fixed pools at the
+policy's min and max sizes. Reports pick lag (run_time to pick) and the
+worker-seconds spent. Use --trace to replay recorded arrivals (one arrival
+offset in seconds per line); otherwise a synthetic trace with periodic
+bursts is generated.
+"""
+import sys
+import os
+import argparse
+import random
+from collections import deque
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.worker.worker_pool import ScalingPolicy
+
+TICK = 0.05
+
+def synthetic_trace(duration, base_rate, burst_rate, burst_every, burst_length, seed=7):
+    rng = random.Random(seed)
+    arrivals = []
+    t = 0.0
+    while t < duration:
+        in_burst = (t % burst_every) < burst_length
+        t += rng.expovariate(burst_rate if in_burst else base_rate)
+        arrivals.append(t)
+    return arrivals
+
+def load_trace(path):
+    with open(path) as trace:
+        return sorted(float(line) for line in trace if line.strip())
+
+def simulate(arrivals, service_time, policy, interval):
+    """Discrete-time pool: returns (sorted pick lags, worker-seconds, max size)"""
+    pending = deque(arrivals)
+    queue = deque()
+    workers = [0.0] * policy.min_workers  # time at which each worker is free again
+    lags = []
+    worker_seconds = 0.0
+    max_size = len(workers)
+    window_lag = 0.0
+    next_decision = interval
+    now = 0.0
+    end = arrivals[-1] if arrivals else 0.0
+    while pending or queue or now <= end:
+        while pending and pending[0] <= now:
+            queue.append(pending.popleft())
+        for i, free_at in enumerate(workers):
+            if free_at <= now and queue:
+                arrival = queue.popleft()
+                lags.append(now - arrival)
+                window_lag = max(window_lag, now - arrival)
+                workers[i] = now + service_time
+        if now >= next_decision:
+            busy = sum(1 for free_at in workers if free_at > now)
+            target, reason = policy.decide(now, len(workers), busy, len(queue), window_lag)
+            window_lag = 0.0
+            next_decision += interval
+            if target > len(workers):
+                workers.extend([now] * (target - len(workers)))
+            elif target < len(workers):
+                # A RETIRE pill is taken by a worker that is free
+                for _ in range(len(workers) - target):
+                    idle = [i for i, free_at in enumerate(workers) if free_at <= now]
+                    if idle:
+                        workers.pop(idle[0])
+            max_size = max(max_size, len(workers))
+        worker_seconds += len(workers) * TICK
+        now += TICK
+    lags.sort()
+    return lags, worker_seconds, max_size
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", help="file with one arrival offset (seconds) per line")
+    parser.add_argument("--duration", type=float, default=300.0)
+    parser.add_argument("--service-time", type=float, default=0.2)
+    parser.add_argument("--min-workers", type=int, default=2)
+    parser.add_argument("--max-workers", type=int, default=64)
+    parser.add_argument("--cooldown", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    arrivals = (load_trace(args.trace) if args.trace else
+                synthetic_trace(args.duration, base_rate=5, burst_rate=150, burst_every=60, burst_length=10))
+
+    print("=" * 60)
+    print(f"AUTOSCALE REPLAY ({len(arrivals):,} jobs, {args.service_time}s each)")
+    print("=" * 60)
+    variants = [
+        (f"fixed {args.min_workers}", ScalingPolicy(args.min_workers, args.min_workers)),
+        (f"fixed {args.max_workers}", ScalingPolicy(args.max_workers, args.max_workers)),
+        (f"elastic {args.min_workers}-{args.max_workers}",
+         ScalingPolicy(args.min_workers, args.max_workers, cooldown=args.cooldown)),
+    ]
+    for label, policy in variants:
+        lags, worker_seconds, max_size = simulate(arrivals, args.service_time, policy, args.interval)
+        print(f"{label:<12} lag p50 {percentile(lags, 0.5):6.2f}s  p99 {percentile(lags, 0.99):6.2f}s  "
+              f"max {lags[-1] if lags else 0:6.2f}s  {worker_seconds:8,.0f} worker-s  peak {max_size}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
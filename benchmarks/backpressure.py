@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Backpressure: overload with a bounded hand-off, overflow file and admission control
+
+Adds --jobs tasks due immediately, faster than --workers workers can run
+them (--job-seconds each), and samples where the waiting jobs are held:
+- unbounded:   worker_queue_size=0, every due job goes to the worker queue
+- bounded:     the default 1024-slot worker queue; the rest stay in the
+               priority queue, where they can still be cancelled or reprioritized
+- overflow:    bounded, and jobs past --limit queued wait in a spill file
+- reject / block / shed: add_task admission control at --limit pending jobs
+Reports peak jobs in the worker queue and in memory, jobs on disk, and
+tasks accepted, rejected or shed.
+"""
+import sys
+import os
+import argparse
+import queue
+import threading
+import time
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config import event_log
+from src.main.config.admission_policy import AdmissionPolicy
+from src.main.config.job_type import JobType
+from src.main.job_scheduler_app import JobSchedulerApp
+
+MODES = {
+    "unbounded": dict(worker_queue_size=0),
+    "bounded": dict(),
+    "overflow": dict(overflow_threshold=None),
+    "reject": dict(admission_policy=AdmissionPolicy.REJECT),
+    "block": dict(admission_policy=AdmissionPolicy.BLOCK),
+    "shed": dict(admission_policy=AdmissionPolicy.SHED_LOWEST),
+}
+
+def run(mode, args):
+    options = dict(MODES[mode])
+    if mode == "overflow":
+        options["overflow_threshold"] = args.limit
+    elif "admission_policy" in options:
+        options["max_pending_jobs"] = args.limit
+    app = JobSchedulerApp(num_workers=args.workers, **options)
+    app.register_handler(JobType.EMAIL, lambda payload: time.sleep(args.job_seconds))
+    app.start()
+
+    peaks = {"worker_queue": 0, "memory": 0, "disk": 0}
+    sampling = True
+
+    def sample():
+        overflow = app.scheduler.overflow
+        while sampling:
+            in_worker_queue = app.worker_queue.qsize()
+            peaks["worker_queue"] = max(peaks["worker_queue"], in_worker_queue)
+            peaks["memory"] = max(peaks["memory"], in_worker_queue + len(app.job_priority_queue))
+            if overflow is not None:
+                peaks["disk"] = max(peaks["disk"], len(overflow))
+            time.sleep(0.01)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    accepted = rejected = 0
+    started = time.perf_counter()
+    for i in range(args.jobs):
+        try:
+            app.add_task(f"t{i}", JobType.EMAIL, datetime.now(), priority=i % 10)
+            accepted += 1
+        except queue.Full:
+            rejected += 1
+    elapsed = time.perf_counter() - started
+    time.sleep(0.2)
+    sampling = False
+    sampler.join()
+    shed = app.admission.shed_total.value if app.admission is not None else 0
+    app.stop()
+    return peaks, accepted, rejected, shed, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--job-seconds", type=float, default=0.001)
+    parser.add_argument("--limit", type=int, default=5_000, help="overflow threshold / max pending jobs")
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+    event_log.configure(level=event_log.WARNING)
+
+    print("=" * 60)
+    print(f"BACKPRESSURE ({args.jobs:,} jobs, {args.workers} workers, limit {args.limit:,})")
+    print("=" * 60)
+    print(f"{'mode':<10} {'wq peak':>8} {'mem peak':>9} {'disk peak':>10} {'accepted':>9} "
+          f"{'rejected':>9} {'shed':>7} {'add time':>9}")
+    for mode in args.modes.split(","):
+        peaks, accepted, rejected, shed, elapsed = run(mode, args)
+        print(f"{mode:<10} {peaks['worker_queue']:>8,} {peaks['memory']:>9,} {peaks['disk']:>10,} "
+              f"{accepted:>9,} {rejected:>9,} {shed:>7,} {elapsed:>8.2f}s")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
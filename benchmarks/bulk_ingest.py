@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingestion: streaming a large task file into the scheduler
+
+Writes a CSV schedule of --rows tasks (mixed job types, spread over a day)
+and loads it in a fresh process per variant, reporting rows/sec and peak
+RSS:
+- add_task:        one JobSchedulerApp.add_task call per row (first --per-call rows)
+- import_tasks:    chunked streaming import into memory
+- import + tiered: the same with a 1h memory horizon, so later tasks go to disk
+
+The import paths never hold more than one chunk of parsed rows; with the
+memory horizon, resident memory stays flat however many rows are loaded.
+"""
+import sys
+import os
+import argparse
+import csv
+import json
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config import event_log
+from src.main.config.job_type import JobType
+from src.main.job_scheduler_app import JobSchedulerApp
+from src.main.task.task_loader import read_csv_tasks
+
+JOB_TYPES = [JobType.EMAIL, JobType.NOTIFICATION, JobType.REPORT, JobType.DATA_EXPORT]
+
+def write_schedule(path, rows, seed=7):
+    rng = random.Random(seed)
+    start = datetime.now() + timedelta(minutes=10)
+    with open(path, "w", newline="") as output:
+        writer = csv.writer(output)
+        writer.writerow(["name", "job_type", "schedule_time", "repeat_interval", "payload"])
+        for i in range(rows):
+            when = start + timedelta(seconds=rng.random() * 86400)
+            repeat = 86400 if i % 10 == 0 else ""
+            writer.writerow([f"nightly-{i}", rng.choice(JOB_TYPES), when.isoformat(), repeat,
+                             json.dumps({"account": i})])
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_child(mode, path, per_call):
+    """Load the file one way in this process; prints a JSON result line"""
+    event_log.configure(level=event_log.WARNING)
+    baseline_rss = peak_rss_mb()
+    app = JobSchedulerApp(num_workers=0,
+                          memory_horizon=timedelta(hours=1) if mode == "tiered" else None)
+    started = time.perf_counter()
+    if mode == "add_task":
+        rows = 0
+        for task in read_csv_tasks(path):
+            app.add_task(task.name, task.job_type, task.schedule_time,
+                         repeat_interval=task.repeat_interval, payload=task.payload)
+            rows += 1
+            if rows >= per_call:
+                break
+    else:
+        rows = app.import_tasks(path)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"rows": rows, "seconds": elapsed, "peak_rss_mb": peak_rss_mb(),
+                      "baseline_rss_mb": baseline_rss, "resident": len(app.task_management.tasks)}))
+    app.task_management.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--per-call", type=int, default=200_000, help="rows loaded with add_task")
+    parser.add_argument("--child", choices=["add_task", "memory", "tiered"], help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.child, args.file, args.per_call)
+        return
+
+    print("=" * 60)
+    print(f"BULK INGESTION ({args.rows:,} rows)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schedule.csv")
+        started = time.perf_counter()
+        write_schedule(path, args.rows)
+        print(f"Wrote {os.path.getsize(path) / 1e6:,.0f} MB in {time.perf_counter() - started:.1f}s")
+        for label, mode in (("add_task", "add_task"), ("import_tasks", "memory"),
+                            ("import + tiered", "tiered")):
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode,
+                                    "--file", path, "--per-call", str(args.per_call)],
+                                   capture_output=True, text=True, check=True)
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            print(f"{label:<16} {result['rows']:>10,} rows  {result['rows'] / result['seconds']:>9,.0f} rows/s  "
+                  f"peak RSS {result['peak_rss_mb']:>7,.0f} MB  ({result['resident']:,} resident)")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cluster Scaling: job throughput with 1..N ClusterNode processes
+
+Fills a shared SQLite store with due tasks, then starts N node processes
+(each with its own worker threads) and times how long the cluster takes to
+complete every job. Also checks that no task produced more than one job.
+--cpu makes handlers spin instead of sleep, which only scales with cores.
+"""
+import sys
+import os
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config.job_status import JobStatus
+from src.main.config.job_type import JobType
+from src.main.persistence.shared_job_store import SharedJobStore
+from src.main.task.task import Task
+from src.main.worker.cluster_node import ClusterNode
+
+def simulated_work(payload):
+    seconds, cpu = payload
+    if cpu:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+    else:
+        time.sleep(seconds)
+
+def run_node(path, workers, stop_event):
+    node = ClusterNode(path, num_workers=workers, tick_interval=0.1)
+    node.register_handler(JobType.REPORT, simulated_work)
+    node.start()
+    stop_event.wait()
+    node.stop()
+
+def measure(processes, jobs, workers, work_seconds, cpu):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "cluster.sqlite")
+    store = SharedJobStore(path)
+    now = datetime.now()
+    for i in range(jobs):
+        store.add_task(Task(f"task-{i}", JobType.REPORT, now, payload=(work_seconds, cpu)))
+
+    stop_event = multiprocessing.Event()
+    nodes = [multiprocessing.Process(target=run_node, args=(path, workers, stop_event))
+             for _ in range(processes)]
+    started = time.perf_counter()
+    for node in nodes:
+        node.start()
+    while store.count_jobs(JobStatus.COMPLETED) < jobs:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    stop_event.set()
+    for node in nodes:
+        node.join()
+    duplicates = store.count_jobs() - jobs
+    store.close()
+    shutil.rmtree(directory)
+    return jobs / elapsed, duplicates
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-processes", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4, help="worker threads per process")
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    parser.add_argument("--cpu", action="store_true")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"CLUSTER SCALING ({args.jobs} jobs, {args.work_ms}ms {'cpu' if args.cpu else 'sleep'} each, "
+          f"{os.cpu_count()} cores)")
+    print("=" * 60)
+    baseline = None
+    processes = 1
+    while processes <= args.max_processes:
+        rate, duplicates = measure(processes, args.jobs, args.workers, args.work_ms / 1000, args.cpu)
+        baseline = baseline or rate
+        print(f"{processes:>3} processes: {rate:>9,.0f} jobs/s  ({rate / baseline:4.2f}x)  "
+              f"{duplicates} duplicate jobs")
+        processes *= 2
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
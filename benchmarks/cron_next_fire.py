@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Cron Next Fire: computing recurring schedules
+
+1. Next-fire cost for a few cron expressions, computed by jumping field
+   by field (CronSchedule.next_after) vs stepping minute by minute until
+   the expression matches.
+2. Misfire flood: --tasks recurring tasks every --interval seconds whose
+   scheduler was paused for --pause seconds. Counts the jobs created on
+   resume under each misfire policy.
+"""
+import sys
+import os
+import argparse
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config import event_log
+from src.main.config.job_type import JobType
+from src.main.config.misfire_policy import MisfirePolicy
+from src.main.job.job_priority_queue import JobPriorityQueue
+from src.main.task.cron import CronSchedule
+from src.main.task.task import Task
+from src.main.task.task_management import TaskManagement
+from src.main.worker.scheduler import Scheduler
+from src.main.worker.worker_queue import WorkerQueue
+
+EXPRESSIONS = ["*/5 * * * *", "30 2 * * 1-5", "0 9 1 * *", "0 0 29 2 *"]
+
+def step_minutes(schedule, after):
+    t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while not (t.minute in schedule.minutes and t.hour in schedule.hours
+               and t.month in schedule.months and schedule._day_matches(t)):
+        t += timedelta(minutes=1)
+    return t
+
+def time_per_call(fn, schedule, start, calls):
+    started = time.perf_counter()
+    after = start
+    for _ in range(calls):
+        after = fn(schedule, after)
+    return (time.perf_counter() - started) / calls
+
+def misfire_flood(policy, num_tasks, interval, pause):
+    task_management = TaskManagement()
+    priority_queue = JobPriorityQueue()
+    scheduler = Scheduler(priority_queue, WorkerQueue(), task_management)
+    start = datetime.now() - timedelta(seconds=pause)
+    task_management.add_tasks(Task(f"t{i}", JobType.NOTIFICATION, start,
+                                   repeat_interval=timedelta(seconds=interval),
+                                   misfire_policy=policy) for i in range(num_tasks))
+    started = time.perf_counter()
+    # Resume: run scheduling passes until nothing more is due
+    while task_management.next_schedule_time() <= datetime.now():
+        scheduler._create_jobs_from_ready_tasks()
+    return len(priority_queue), time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="next-fire computations per expression")
+    parser.add_argument("--tasks", type=int, default=1_000)
+    parser.add_argument("--interval", type=int, default=60, help="task interval in seconds")
+    parser.add_argument("--pause", type=int, default=3600, help="simulated scheduler pause in seconds")
+    args = parser.parse_args()
+    event_log.configure(level=event_log.WARNING)
+
+    print("=" * 60)
+    print("CRON NEXT FIRE")
+    print("=" * 60)
+    start = datetime(2026, 1, 1)
+    for expression in EXPRESSIONS:
+        schedule = CronSchedule(expression)
+        jump = time_per_call(CronSchedule.next_after, schedule, start, args.calls)
+        step = time_per_call(step_minutes, schedule, start, max(1, args.calls // 20))
+        print(f"{expression:<14} jump {jump * 1e6:9.1f} us   minute steps {step * 1e6:12.1f} us")
+
+    print("-" * 60)
+    print(f"MISFIRE FLOOD ({args.tasks:,} tasks every {args.interval}s, paused {args.pause}s)")
+    for policy in (MisfirePolicy.FIRE_ALL, MisfirePolicy.FIRE_ONCE, MisfirePolicy.SKIP):
+        jobs, elapsed = misfire_flood(policy, args.tasks, args.interval, args.pause)
+        print(f"{policy:<10} {jobs:>10,} jobs created in {elapsed:6.2f}s")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
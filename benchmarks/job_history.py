@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Job History: memory and query cost of the columnar finished-job store
+
+Records --records finished jobs (uuid ids, --tasks distinct tasks, four
+job types, eight workers) and reports:
+- memory per million retained records: Job objects kept in a list vs
+  JobHistory columns, measured with tracemalloc
+- record cost per job (the listener call on each finish)
+- query latency by task, by worker, by status + type, for a time range,
+  and stats() (per-type p95) over the most recent half of the records
+"""
+import sys
+import os
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config.job_status import JobStatus
+from src.main.config.job_type import JobType
+from src.main.job.job import Job
+from src.main.job.job_history import JobHistory
+
+JOB_TYPES = [JobType.EMAIL, JobType.NOTIFICATION, JobType.REPORT, JobType.DATA_EXPORT]
+
+def finished_jobs(count, tasks):
+    now = datetime.now()
+    task_ids = [f"task-{i}" for i in range(tasks)]
+    for i in range(count):
+        job = Job(task_ids[i % tasks], now, job_type=JOB_TYPES[i % len(JOB_TYPES)])
+        job.picked_by_worker(JobStatus.IN_PROGRESS, f"worker-{i % 8}")
+        if i % 20:
+            job.complete_job()
+        else:
+            job.fail_job(RuntimeError("boom"))
+        yield job
+
+def measure_memory(count, tasks):
+    gc.collect()
+    tracemalloc.start()
+    kept = list(finished_jobs(count, tasks))
+    objects = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    gc.collect()
+    tracemalloc.start()
+    history = JobHistory(capacity=count)
+    for job in finished_jobs(count, tasks):
+        history.record(job)
+    columns = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, columns
+
+def timed(fn, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--memory-records", type=int, default=200_000,
+                        help="records used for the tracemalloc comparison")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"JOB HISTORY ({args.records:,} records, {args.tasks:,} tasks)")
+    print("=" * 60)
+    objects, columns = measure_memory(args.memory_records, args.tasks)
+    scale = 1_000_000 / args.memory_records
+    print(f"Memory per 1M records: Job objects {objects * scale / 1e6:7.1f} MB   "
+          f"JobHistory {columns * scale / 1e6:7.1f} MB")
+
+    history = JobHistory(capacity=args.records)
+    jobs = list(finished_jobs(args.records, args.tasks))
+    started = time.perf_counter()
+    for job in jobs:
+        history(job)
+    elapsed = time.perf_counter() - started
+    print(f"Record: {elapsed / args.records * 1e6:.2f} us per job")
+    middle = history.query(limit=args.records // 2)[-1].finished_at
+    del jobs
+
+    print("-" * 60)
+    queries = [
+        ("by task", lambda: history.query(task_id="task-42")),
+        ("by worker, limit 100", lambda: history.query(worker_id="worker-3", limit=100)),
+        ("failed EMAIL, limit 100", lambda: history.query(status=JobStatus.FAILED, job_type=JobType.EMAIL,
+                                                          limit=100)),
+        ("time range, limit 1000", lambda: history.query(since=middle, limit=1000)),
+        ("stats, newest half", lambda: history.stats(since=middle)),
+    ]
+    for label, query in queries:
+        seconds, result = timed(query, repeat=3 if label.startswith("stats") else 20)
+        print(f"{label:<26} {seconds * 1e3:9.3f} ms   ({len(result):,} rows)")
+    p95 = history.stats(since=timedelta(hours=1))[JobType.REPORT]["duration"]["p95"]
+    print(f"REPORT p95 duration over the last hour: {p95 * 1e6:.1f} us")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Job Memory and Transition Cost: original Job class vs the compact Job
+
+Reports bytes per job (and MB per 1M jobs) with tracemalloc, and the rate
+of full lifecycles (create -> picked_by_worker -> complete_job).
+"""
+import sys
+import os
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config.ids import use_compact_ids
+from src.main.config.job_status import JobStatus
+from src.main.job.job import Job
+
+class LegacyJob:
+    """The original Job: dict-backed, uuid4 ids, datetime.now() per field"""
+
+    def __init__(self, task_id, run_time, priority=0, status=JobStatus.IN_QUEUE):
+        self.id = str(uuid.uuid4())
+        self.task_id = task_id
+        self.run_time = run_time
+        self.priority = priority
+        self.status = status
+        self.attempt_count = 1
+        self.started_at = None
+        self.finished_at = None
+        self.worker_id = None
+        self.created_at = datetime.now()
+        self.last_updated_at = datetime.now()
+
+    def picked_by_worker(self, status, worker_id):
+        self.status = status
+        self.worker_id = worker_id
+        self.started_at = datetime.now()
+        self.last_updated_at = datetime.now()
+
+    def complete_job(self):
+        self.status = JobStatus.COMPLETED
+        self.finished_at = datetime.now()
+        self.last_updated_at = datetime.now()
+
+def measure_memory(job_class, count):
+    run_time = datetime.now()
+    gc.collect()
+    tracemalloc.start()
+    jobs = [job_class("task", run_time) for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del jobs
+    return current / count
+
+def measure_transitions(job_class, count):
+    run_time = datetime.now()
+    start = time.perf_counter()
+    for _ in range(count):
+        job = job_class("task", run_time)
+        job.picked_by_worker(JobStatus.IN_PROGRESS, "worker-0")
+        job.complete_job()
+    return count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"JOB MEMORY & TRANSITIONS ({args.count} jobs)")
+    print("=" * 60)
+    variants = [
+        ("legacy Job", LegacyJob, False),
+        ("compact Job, uuid ids", Job, False),
+        ("compact Job, int ids", Job, True),
+    ]
+    for name, job_class, compact_ids in variants:
+        use_compact_ids(compact_ids)
+        per_job = measure_memory(job_class, args.count)
+        rate = measure_transitions(job_class, args.count)
+        print(f"{name:<24} {per_job:>7.0f} B/job  {per_job * 1e6 / 2**20:>8.1f} MB/1M  "
+              f"{rate:>10,.0f} lifecycles/s")
+    use_compact_ids(False)
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
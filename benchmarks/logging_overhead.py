@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Logging Overhead: per-job print vs the buffered event logger
+
+N threads each emit M per-job lines, as workers do, either with print()
+to a file (every call formats and takes the stream lock) or through an
+EventLogger writing to the same kind of file from its flusher thread.
+Reports caller-side cost per event and how many events were dropped.
+"""
+import sys
+import os
+import argparse
+import contextlib
+import tempfile
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config.event_log import EventLogger
+
+def run_threads(num_threads, emit):
+    barrier = threading.Barrier(num_threads + 1)
+
+    def work(worker_id):
+        barrier.wait()
+        emit(worker_id)
+
+    threads = [threading.Thread(target=work, args=(f"worker-{i}",)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+def measure_print(path, num_threads, events):
+    # Line buffered, as stdout is on a terminal
+    with open(path, "w", buffering=1) as sink, contextlib.redirect_stdout(sink):
+        def emit(worker_id):
+            for i in range(events):
+                print(f"[Worker-{worker_id}] Completed job {i}")
+        return run_threads(num_threads, emit)
+
+def measure_logger(path, num_threads, events, capacity):
+    logger = EventLogger(path, capacity=capacity)
+
+    def emit(worker_id):
+        for i in range(events):
+            logger.info("job_completed", worker=worker_id, job=i)
+
+    elapsed = run_threads(num_threads, emit)
+    logger.close()
+    return elapsed, logger.dropped, logger.written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--events", type=int, default=50_000, help="events per thread")
+    parser.add_argument("--capacity", type=int, default=10_000, help="per-thread buffer bound")
+    args = parser.parse_args()
+
+    total = args.threads * args.events
+    print("=" * 60)
+    print(f"LOGGING OVERHEAD ({args.threads} threads x {args.events:,} events)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed = measure_print(os.path.join(directory, "print.log"), args.threads, args.events)
+        print(f"{'print':<14} {elapsed / total * 1e6:6.2f} us per event")
+        elapsed, dropped, written = measure_logger(os.path.join(directory, "events.log"),
+                                                   args.threads, args.events, args.capacity)
+        print(f"{'event logger':<14} {elapsed / total * 1e6:6.2f} us per event   "
+              f"{written:,} written, {dropped:,} dropped")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+JobPriorityQueue Throughput Under Concurrent Producers
+
+Compares the original bare-heapq queue against the locked queue, unsharded
+and sharded, with N producer threads calling add() while one consumer
+drains ready jobs.
+"""
+import sys
+import os
+import argparse
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.job.job import Job
+from src.main.job.job_priority_queue import JobPriorityQueue
+
+class LegacyJobPriorityQueue:
+    """The original implementation: a bare heapq list ordered by Job.__lt__"""
+
+    def __init__(self):
+        self.heap = []
+
+    def add(self, job):
+        heapq.heappush(self.heap, job)
+
+    def pop(self):
+        return heapq.heappop(self.heap) if self.heap else None
+
+    def is_empty(self):
+        return len(self.heap) == 0
+
+class _NoLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def make_jobs(count, thread_id):
+    past = datetime.now() - timedelta(seconds=1)
+    return [Job(f"t{thread_id}-{i}", past, priority=i % 10) for i in range(count)]
+
+def run_legacy(num_producers, jobs_per_producer, lock=None):
+    """Legacy queue, unguarded or behind one global lock
+
+    Unguarded, concurrent heappush/heappop calls interleave inside the
+    Python-level Job.__lt__ and raise or corrupt the heap; those jobs are
+    reported as lost.
+    """
+    pq = LegacyJobPriorityQueue()
+    lock = lock or _NoLock()
+    batches = [make_jobs(jobs_per_producer, t) for t in range(num_producers)]
+    total = num_producers * jobs_per_producer
+    consumed = [0]
+    producers_done = threading.Event()
+
+    def producer(jobs):
+        for job in jobs:
+            try:
+                with lock:
+                    pq.add(job)
+            except RuntimeError:
+                pass
+
+    def consumer():
+        while consumed[0] < total:
+            try:
+                with lock:
+                    job = pq.pop() if not pq.is_empty() else None
+            except RuntimeError:
+                job = None
+            if job is not None:
+                consumed[0] += 1
+            elif producers_done.is_set():
+                break
+
+    return _timed(producer, consumer, batches, producers_done, consumed)
+
+def run_locked(num_producers, jobs_per_producer, num_shards):
+    pq = JobPriorityQueue(num_shards=num_shards)
+    batches = [make_jobs(jobs_per_producer, t) for t in range(num_producers)]
+    total = num_producers * jobs_per_producer
+    consumed = [0]
+    producers_done = threading.Event()
+
+    def producer(jobs):
+        for job in jobs:
+            pq.add(job)
+
+    def consumer():
+        while consumed[0] < total:
+            jobs = pq.pop_ready(limit=256)
+            consumed[0] += len(jobs)
+            if not jobs and producers_done.is_set() and pq.is_empty():
+                break
+
+    return _timed(producer, consumer, batches, producers_done, consumed)
+
+def _timed(producer, consumer, batches, producers_done, consumed):
+    producer_threads = [threading.Thread(target=producer, args=(jobs,)) for jobs in batches]
+    consumer_thread = threading.Thread(target=consumer)
+    start = time.perf_counter()
+    consumer_thread.start()
+    for t in producer_threads:
+        t.start()
+    for t in producer_threads:
+        t.join()
+    producers_done.set()
+    consumer_thread.join()
+    elapsed = time.perf_counter() - start
+    return consumed[0], elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=25000, help="jobs per producer")
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    total = args.producers * args.jobs
+    print("=" * 60)
+    print(f"PRIORITY QUEUE THROUGHPUT ({args.producers} producers, {total} jobs)")
+    print("=" * 60)
+    scenarios = [
+        ("legacy heapq (unlocked)", lambda: run_legacy(args.producers, args.jobs)),
+        ("legacy heapq + global lock", lambda: run_legacy(args.producers, args.jobs, threading.Lock())),
+        ("locked, 1 shard", lambda: run_locked(args.producers, args.jobs, 1)),
+        (f"locked, {args.shards} shards", lambda: run_locked(args.producers, args.jobs, args.shards)),
+    ]
+    for name, scenario in scenarios:
+        consumed, elapsed = scenario()
+        lost = total - consumed
+        print(f"{name:<28} {consumed / elapsed:>12,.0f} jobs/s   lost: {lost}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite: reproducible load scenarios with JSON results and baselines
+
+Runs synthetic loads through the scheduler pipeline:
+- ingest:   JobSchedulerApp.add_task rate
+- tick:     get_ready_tasks + removal cost per tick vs stored task count
+- pq:       JobPriorityQueue add/pop throughput with concurrent producers
+- dispatch: end-to-end lag from run_time to pick by a worker (percentiles)
+- workers:  jobs completed per second by the worker pool
+
+Job types are drawn from --mix with a fixed --seed, so runs are
+comparable. Each metric is the median of --repeat runs. Write results with
+--output and compare against a stored run with --baseline; a metric that
+got worse by more than its threshold is a regression and the exit status
+is 1, so the suite can gate a deploy:
+
+    python3 benchmarks/suite.py --output baseline.json
+    python3 benchmarks/suite.py --baseline baseline.json --threshold 0.15 \\
+        --threshold-for 'dispatch*=0.5'
+"""
+import sys
+import os
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config import event_log
+from src.main.config.job_status import JobStatus
+from src.main.job.job import Job
+from src.main.job.job_priority_queue import JobPriorityQueue
+from src.main.job_scheduler_app import JobSchedulerApp
+from src.main.metrics.histogram import Histogram
+from src.main.task.task import Task
+from src.main.task.task_management import TaskManagement
+
+DEFAULT_MIX = "EMAIL=0.5,NOTIFICATION=0.3,REPORT=0.15,DATA_EXPORT=0.05"
+SCENARIOS = ("ingest", "tick", "pq", "dispatch", "workers")
+TICK_DUE = 100  # tasks that fall due per simulated tick
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        job_type, weight = part.split("=")
+        mix[job_type.strip().upper()] = float(weight)
+    return mix
+
+def job_types(mix, count, seed):
+    rng = random.Random(seed)
+    return rng.choices(list(mix), weights=list(mix.values()), k=count)
+
+def noop(payload):
+    return None
+
+def new_app(mix, num_workers):
+    app = JobSchedulerApp(num_workers=num_workers)
+    for job_type in mix:
+        app.register_handler(job_type, noop)
+    return app
+
+def bench_ingest(tasks, mix, seed):
+    app = new_app(mix, 1)
+    types = job_types(mix, tasks, seed)
+    future = datetime.now() + timedelta(days=1)
+    started = time.perf_counter()
+    for i, job_type in enumerate(types):
+        app.add_task(f"task-{i}", job_type, future)
+    elapsed = time.perf_counter() - started
+    return {"tasks_per_sec": (tasks / elapsed, "higher")}
+
+def bench_tick(tasks, mix, seed, ticks=50):
+    management = TaskManagement()
+    types = job_types(mix, tasks, seed)
+    rng = random.Random(seed)
+    future = datetime.now() + timedelta(days=1)
+    management.load_tasks(Task(f"task-{i}", job_type, future + timedelta(seconds=rng.random() * 86400))
+                          for i, job_type in enumerate(types))
+    elapsed = 0.0
+    for _ in range(ticks):
+        past = datetime.now() - timedelta(seconds=1)
+        for i in range(TICK_DUE):
+            management.add_task(Task("due", types[i % len(types)], past))
+        started = time.perf_counter()
+        for task in management.get_ready_tasks():
+            management.remove_task(task.id)
+        elapsed += time.perf_counter() - started
+    return {"tick_us": (elapsed / ticks * 1e6, "lower")}
+
+def bench_pq(jobs, producers, shards):
+    queue = JobPriorityQueue(num_shards=shards)
+    now = datetime.now()
+    per_producer = jobs // producers
+    batches = [[Job("task", now, priority=i % 10) for i in range(per_producer)] for _ in range(producers)]
+    done = threading.Event()
+    popped = [0]
+
+    def produce(batch):
+        for job in batch:
+            queue.add(job)
+
+    def consume():
+        while not done.is_set() or not queue.is_empty():
+            popped[0] += len(queue.pop_ready(limit=256))
+
+    threads = [threading.Thread(target=produce, args=(batch,)) for batch in batches]
+    consumer = threading.Thread(target=consume)
+    started = time.perf_counter()
+    consumer.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    consumer.join()
+    elapsed = time.perf_counter() - started
+    return {"ops_per_sec": (popped[0] * 2 / elapsed, "higher")}
+
+def bench_dispatch(tasks, spread, mix, seed, num_workers):
+    app = new_app(mix, num_workers)
+    lags = Histogram()
+    finished = threading.Event()
+    done = [0]
+
+    def on_transition(job):
+        if job.status is JobStatus.IN_PROGRESS:
+            lags.record(max(0.0, (datetime.now() - job.run_time).total_seconds()))
+        elif job.status is JobStatus.COMPLETED:
+            done[0] += 1
+            if done[0] >= tasks:
+                finished.set()
+
+    app.job_listeners.add(on_transition)
+    types = job_types(mix, tasks, seed)
+    rng = random.Random(seed)
+    app.start()
+    start = datetime.now() + timedelta(seconds=0.5)
+    for i, job_type in enumerate(types):
+        app.add_task(f"task-{i}", job_type, start + timedelta(seconds=rng.random() * spread))
+    finished.wait(spread + 60)
+    app.stop()
+    snapshot = lags.snapshot()
+    return {f"lag_{name}_ms": (snapshot.percentile(pct) * 1e3, "lower")
+            for name, pct in (("p50", 50), ("p90", 90), ("p99", 99))}
+
+def bench_workers(jobs, mix, seed, num_workers):
+    app = new_app(mix, num_workers)
+    finished = threading.Event()
+    done = [0]
+
+    def on_transition(job):
+        if job.status is JobStatus.COMPLETED:
+            done[0] += 1
+            if done[0] >= jobs:
+                finished.set()
+
+    app.job_listeners.add(on_transition)
+    types = job_types(mix, jobs, seed)
+    now = datetime.now()
+    app.start()
+    started = time.perf_counter()
+    app.task_management.load_tasks(Task(f"task-{i}", job_type, now) for i, job_type in enumerate(types))
+    app.scheduler.wakeup(now)
+    finished.wait(600)
+    elapsed = time.perf_counter() - started
+    app.stop()
+    return {"jobs_per_sec": (done[0] / elapsed, "higher")}
+
+def run_scenarios(args, mix):
+    """Yield (scenario name, params, function of no arguments returning metrics)"""
+    if "ingest" in args.scenarios:
+        for size in args.sizes:
+            yield "ingest", {"tasks": size}, lambda size=size: bench_ingest(size, mix, args.seed)
+    if "tick" in args.scenarios:
+        for size in args.sizes:
+            yield "tick", {"tasks": size}, lambda size=size: bench_tick(size, mix, args.seed)
+    if "pq" in args.scenarios:
+        for shards in (1, args.producers):
+            yield ("pq", {"jobs": args.pq_jobs, "producers": args.producers, "shards": shards},
+                   lambda shards=shards: bench_pq(args.pq_jobs, args.producers, shards))
+    if "dispatch" in args.scenarios:
+        yield ("dispatch", {"tasks": args.dispatch_tasks, "spread": args.spread, "workers": args.workers},
+               lambda: bench_dispatch(args.dispatch_tasks, args.spread, mix, args.seed, args.workers))
+    if "workers" in args.scenarios:
+        yield ("workers", {"jobs": args.worker_jobs, "workers": args.workers},
+               lambda: bench_workers(args.worker_jobs, mix, args.seed, args.workers))
+
+def result_key(name, params, metric):
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}].{metric}"
+
+def run(args, mix):
+    results = {}
+    for name, params, bench in run_scenarios(args, mix):
+        runs = [bench() for _ in range(args.repeat)]
+        for metric, (_, better) in runs[0].items():
+            value = statistics.median(run[metric][0] for run in runs)
+            key = result_key(name, params, metric)
+            results[key] = {"value": value, "better": better}
+            print(f"{key:<60} {value:>14,.2f}", flush=True)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=project_root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def threshold_for(key, default, overrides):
+    for pattern, threshold in overrides:
+        if fnmatch.fnmatch(key, pattern):
+            return threshold
+    return default
+
+def compare(results, baseline, default_threshold, overrides):
+    """Print the change per metric; return the keys that regressed"""
+    regressions = []
+    print("-" * 60)
+    print(f"{'metric':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None or not previous["value"]:
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        worse = -change if current["better"] == "higher" else change
+        threshold = threshold_for(key, default_threshold, overrides)
+        flag = "  REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(key)
+        print(f"{key:<60} {previous['value']:>12,.2f} {current['value']:>12,.2f} {change:>+7.1%}{flag}")
+    return regressions
+
+def parse_override(text):
+    pattern, threshold = text.rsplit("=", 1)
+    return pattern, float(threshold)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="task counts for ingest and tick (up to 10000000 with enough memory)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="JobType weights, e.g. EMAIL=0.9,REPORT=0.1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--pq-jobs", type=int, default=200_000)
+    parser.add_argument("--dispatch-tasks", type=int, default=2_000)
+    parser.add_argument("--spread", type=float, default=5.0, help="seconds over which dispatch tasks fall due")
+    parser.add_argument("--worker-jobs", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed relative change for the worse (0.10 = 10%%)")
+    parser.add_argument("--threshold-for", type=parse_override, action="append", default=[],
+                        metavar="PATTERN=FRACTION", help="per-metric threshold, glob on the metric key")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",")]
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    mix = parse_mix(args.mix)
+    # Per-job events would only add console I/O to the measurements
+    event_log.configure(level=event_log.WARNING)
+
+    print("=" * 60)
+    print("BENCHMARK SUITE")
+    print("=" * 60)
+    results = run(args, mix)
+    report = {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Results written to {args.output}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.threshold, args.threshold_for)
+        print(f"{len(regressions)} regression(s)")
+    print("=" * 60)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tiered Task Storage: resident memory as the task count grows
+
+Registers tasks spread over the next 30 days into TaskManagement, once with
+every task in memory and once with a one-hour in-memory horizon backed by
+ColdTaskStore. Reports Python heap held per configuration (tracemalloc) and
+the add_task rate, then pages the first due chunk back in.
+"""
+import sys
+import os
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.config.job_type import JobType
+from src.main.persistence.cold_task_store import ColdTaskStore
+from src.main.task.task import Task
+from src.main.task.task_management import TaskManagement
+
+SPREAD = timedelta(days=30)
+
+def fill(count, tiered):
+    cold_store = ColdTaskStore() if tiered else None
+    task_management = TaskManagement(cold_store=cold_store, horizon=timedelta(hours=1))
+    start_time = datetime.now()
+    step = SPREAD / count
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i in range(count):
+        task_management.add_task(Task(f"task-{i}", JobType.EMAIL, start_time + step * i,
+                                      payload={"i": i}))
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return task_management, current, count / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TIERED TASK STORAGE")
+    print("=" * 60)
+    for count in (args.tasks // 4, args.tasks // 2, args.tasks):
+        for tiered in (False, True):
+            task_management, heap_bytes, rate = fill(count, tiered)
+            label = "tiered   " if tiered else "in-memory"
+            print(f"{label} {count:>10,} tasks: {heap_bytes / 1e6:8.1f} MB heap, "
+                  f"{len(task_management.tasks):>9,} resident, {rate:>9,.0f} adds/s")
+            if tiered:
+                # Advance the horizon by a day: pages the next chunk of tasks in
+                started = time.perf_counter()
+                task_management.horizon += timedelta(days=1)
+                task_management.get_ready_tasks()
+                print(f"{'':9} page-in of one day: {len(task_management.tasks):,} resident "
+                      f"in {time.perf_counter() - started:.2f}s")
+            task_management.close()
+            del task_management
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Watchdog Overhead: cost of timing jobs as the number in flight grows
+
+Keeps N jobs watched (in flight) and measures the cost of one more
+watch() + release() pair, the work every executed job adds. The watchdog
+uses one thread regardless of N.
+"""
+import sys
+import os
+import argparse
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main.job.job import Job
+from src.main.worker.watchdog import Watchdog
+
+def ignore(job):
+    pass
+
+def measure(in_flight, operations):
+    watchdog = Watchdog()
+    watchdog.start()
+    run_time = None
+    for i in range(in_flight):
+        watchdog.watch(Job("task", run_time, job_id=i, timeout=3600), ignore)
+    jobs = [Job("task", run_time, job_id=in_flight + i, timeout=3600) for i in range(operations)]
+    threads = threading.active_count()
+    started = time.perf_counter()
+    for job in jobs:
+        watchdog.release(watchdog.watch(job, ignore))
+    elapsed = time.perf_counter() - started
+    watchdog.stop()
+    return elapsed / operations * 1e6, threads
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-in-flight", type=int, default=1_000_000)
+    parser.add_argument("--operations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("WATCHDOG OVERHEAD")
+    print("=" * 60)
+    in_flight = 1_000
+    while in_flight <= args.max_in_flight:
+        cost_us, threads = measure(in_flight, args.operations)
+        print(f"{in_flight:>10,} in flight: {cost_us:6.2f} us per watch+release, {threads} threads")
+        in_flight *= 10
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+class AdmissionPolicy:
+    REJECT = 'REJECT'
+    BLOCK = 'BLOCK'
+    SHED_LOWEST = 'SHED_LOWEST'
@@ -0,0 +1,20 @@
+import time
+from datetime import datetime
+
+# Anchors pairing the monotonic clock with wall-clock time, taken once at import
+_MONOTONIC_ANCHOR_NS = time.monotonic_ns()
+_WALL_ANCHOR_NS = time.time_ns()
+
+def now_ns() -> int:
+    """Cheap monotonic timestamp used in hot paths"""
+    return time.monotonic_ns()
+
+def to_datetime(timestamp_ns: int):
+    """Convert a now_ns() timestamp to a datetime, for display only"""
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp((_WALL_ANCHOR_NS + timestamp_ns - _MONOTONIC_ANCHOR_NS) / 1e9)
+
+def to_epoch_seconds(timestamp_ns: int) -> float:
+    """Convert a now_ns() timestamp to epoch seconds, comparable with datetime.timestamp()"""
+    return (_WALL_ANCHOR_NS + timestamp_ns - _MONOTONIC_ANCHOR_NS) / 1e9
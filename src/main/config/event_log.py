@@ -0,0 +1,181 @@
+import atexit
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+class EventLogger:
+    """Structured event log that never blocks the caller on I/O
+
+    log() filters by level and per-event sample rate, then appends a tuple
+    to the calling thread's own deque (append/popleft are atomic, so no
+    lock is taken). A flusher thread formats whatever is buffered every
+    `flush_interval` seconds and writes it to the sink in one call. A
+    thread whose buffer already holds `capacity` events drops new ones and
+    counts them in `dropped` instead of waiting.
+
+    `sink` is a file path (appended to) or a text stream; `fmt` is "text"
+    (time LEVEL event key=value ...) or "json" (one object per line).
+    `sample` maps event names to the fraction of events kept.
+    """
+
+    def __init__(self, sink=None, level: int = INFO, fmt: str = "text", sample: dict = None,
+                 capacity: int = 10_000, flush_interval: float = 0.1):
+        if fmt not in ("text", "json"):
+            raise ValueError(f"unknown log format {fmt!r}")
+        self.level = level
+        self.fmt = fmt
+        self.sample = dict(sample or {})
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._path = sink if isinstance(sink, str) else None
+        self._stream = sink if sink is not None and self._path is None else None
+        self._file = None
+        self._local = threading.local()
+        self._buffers = []  # [deque, dropped count] per recording thread
+        self._buffers_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flusher = None
+        self._running = True
+        self._wakeup = threading.Event()
+        self._second = None
+        self._second_text = ""
+
+    def log(self, level: int, event: str, **fields):
+        if level < self.level:
+            return
+        rate = self.sample.get(event)
+        if rate is not None and random.random() >= rate:
+            return
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._new_buffer()
+        if len(buffer[0]) >= self.capacity:
+            buffer[1] += 1
+            return
+        buffer[0].append((time.time(), level, event, fields))
+
+    def debug(self, event: str, **fields):
+        self.log(DEBUG, event, **fields)
+
+    def info(self, event: str, **fields):
+        self.log(INFO, event, **fields)
+
+    def warning(self, event: str, **fields):
+        self.log(WARNING, event, **fields)
+
+    def error(self, event: str, **fields):
+        self.log(ERROR, event, **fields)
+
+    @property
+    def dropped(self):
+        with self._buffers_lock:
+            return sum(buffer[1] for buffer in self._buffers)
+
+    def flush(self):
+        """Write out everything buffered so far (called by the flusher thread)"""
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+        with self._write_lock:
+            records = []
+            for queue, _ in buffers:
+                for _ in range(len(queue)):
+                    records.append(queue.popleft())
+            if not records:
+                return
+            # Buffers are per thread; interleave them back into time order
+            records.sort(key=lambda record: record[0])
+            stream = self._open()
+            stream.write("".join([self._format(record) for record in records]))
+            stream.flush()
+            self.written += len(records)
+
+    def close(self):
+        self._running = False
+        self._wakeup.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=self.flush_interval * 10)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _new_buffer(self):
+        buffer = [deque(), 0]
+        with self._buffers_lock:
+            self._buffers.append(buffer)
+            if self._flusher is None and self._running:
+                # Started on first use, so importing this module starts no thread
+                self._flusher = threading.Thread(target=self._run, name="event-log-flusher", daemon=True)
+                self._flusher.start()
+        self._local.buffer = buffer
+        return buffer
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                sys.stderr.write(f"[EventLogger] Flush failed: {e}\n")
+
+    def _open(self):
+        if self._path is not None:
+            if self._file is None:
+                self._file = open(self._path, "a", encoding="utf-8")
+            return self._file
+        # Resolved per write so redirect_stdout and test captures still apply
+        return self._stream if self._stream is not None else sys.stdout
+
+    def _format(self, record):
+        timestamp, level, event, fields = record
+        if self.fmt == "json":
+            entry = {"time": timestamp, "level": LEVEL_NAMES.get(level, level), "event": event}
+            entry.update(fields)
+            return json.dumps(entry, default=str) + "\n"
+        second = int(timestamp)
+        if second != self._second:
+            # Most events in a batch share the second; format it once
+            self._second = second
+            self._second_text = time.strftime("%H:%M:%S", time.localtime(second))
+        millis = int((timestamp - second) * 1000)
+        pairs = "".join([f" {key}={value}" for key, value in fields.items()])
+        return f"{self._second_text}.{millis:03d} {LEVEL_NAMES.get(level, level)} {event}{pairs}\n"
+
+# Process-wide logger used by the scheduler, workers and app
+_logger = EventLogger()
+
+def configure(sink=None, level: int = INFO, fmt: str = "text", sample: dict = None,
+              capacity: int = 10_000, flush_interval: float = 0.1):
+    """Replace the process-wide logger; events buffered by the old one are flushed"""
+    global _logger
+    old, _logger = _logger, EventLogger(sink, level, fmt, sample, capacity, flush_interval)
+    old.close()
+    return _logger
+
+def get_logger() -> EventLogger:
+    return _logger
+
+def debug(event: str, **fields):
+    _logger.log(DEBUG, event, **fields)
+
+def info(event: str, **fields):
+    _logger.log(INFO, event, **fields)
+
+def warning(event: str, **fields):
+    _logger.log(WARNING, event, **fields)
+
+def error(event: str, **fields):
+    _logger.log(ERROR, event, **fields)
+
+atexit.register(lambda: _logger.close())
@@ -0,0 +1,4 @@
+class ExecutionBackend:
+    THREAD = 'THREAD'
+    PROCESS = 'PROCESS'
+    ASYNC = 'ASYNC'
@@ -0,0 +1,18 @@
+import itertools
+import random
+import uuid
+
+# Random high bits keep compact ids from different processes apart
+_PROCESS_PREFIX = random.getrandbits(24) << 40
+_counter = itertools.count(1)
+_compact_ids = False
+
+def use_compact_ids(enabled: bool = True):
+    """Switch new Job/Task ids between uuid4 strings and compact integers"""
+    global _compact_ids
+    _compact_ids = enabled
+
+def new_id():
+    if _compact_ids:
+        return _PROCESS_PREFIX | next(_counter)
+    return str(uuid.uuid4())
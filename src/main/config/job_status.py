@@ -5,3 +5,4 @@ class JobStatus(Enum):
     IN_PROGRESS = 'IN_PROGRESS'
     COMPLETED = 'COMPLETED'
     FAILED = 'FAILED'
+    CANCELLED = 'CANCELLED'
@@ -0,0 +1,4 @@
+class MisfirePolicy:
+    FIRE_ONCE = 'FIRE_ONCE'
+    FIRE_ALL = 'FIRE_ALL'
+    SKIP = 'SKIP'
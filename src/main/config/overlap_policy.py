@@ -0,0 +1,4 @@
+class OverlapPolicy:
+    ALLOW = 'ALLOW'
+    SKIP = 'SKIP'
+    COALESCE = 'COALESCE'
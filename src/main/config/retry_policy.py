@@ -0,0 +1,4 @@
+class RetryPolicy:
+    FIXED_DELAY = 'FIXED_DELAY'
+    EXPONENTIAL_BACKOFF = 'EXPONENTIAL_BACKOFF'
+    DECORRELATED_JITTER = 'DECORRELATED_JITTER'
@@ -0,0 +1,79 @@
+import queue
+import threading
+import time
+from src.main.config.admission_policy import AdmissionPolicy
+from src.main.config.job_status import JobStatus
+from src.main.metrics.registry import MetricsRegistry
+
+class AdmissionController:
+    """Caps the work waiting to run by gating JobSchedulerApp.add_task and add_tasks
+
+    `pending()` counts jobs created but not yet picked by a worker, plus due
+    tasks that have no job yet. When new tasks would take it past `limit`,
+    they are handled by `policy`:
+    - REJECT: raise queue.Full
+    - BLOCK: wait for a worker to pick a job, raising queue.Full after
+      `timeout` seconds (None waits indefinitely)
+    - SHED_LOWEST: `shed(priority)` cancels the worst queued job if it ranks
+      below `priority`; otherwise the new task is rejected
+
+    Blocked callers are woken as a JobListener, on every pick or cancel.
+    """
+
+    def __init__(self, limit: int, pending, shed=None, policy: str = AdmissionPolicy.REJECT,
+                 timeout: float = None, metrics: MetricsRegistry = None):
+        if policy not in (AdmissionPolicy.REJECT, AdmissionPolicy.BLOCK, AdmissionPolicy.SHED_LOWEST):
+            raise ValueError(f"unknown admission policy {policy!r}")
+        self.limit = limit
+        self.policy = policy
+        self.timeout = timeout
+        self._pending = pending
+        self._shed = shed
+        self._cond = threading.Condition()
+        self._waiters = 0
+        metrics = metrics or MetricsRegistry()
+        self.rejected_total = metrics.counter("tasks_rejected_total", "Tasks refused by admission control")
+        self.shed_total = metrics.counter("jobs_shed_total", "Queued jobs cancelled to admit better ones")
+        self.blocked_total = metrics.counter("admission_blocked_total", "add_task calls that waited for room")
+
+    def admit(self, priority: int = 0, count: int = 1):
+        """Return once `count` tasks ranked at `priority` or better may be added, or raise queue.Full
+
+        `count` should not exceed `limit`, or BLOCK can only time out.
+        """
+        excess = self._pending() + count - self.limit
+        if excess <= 0:
+            return
+        if self.policy == AdmissionPolicy.BLOCK:
+            self._wait_for_room(count)
+            return
+        if self.policy == AdmissionPolicy.SHED_LOWEST and self._shed is not None:
+            shed = 0
+            while shed < excess and self._shed(priority):
+                shed += 1
+            self.shed_total.inc(shed)
+            if shed == excess:
+                return
+        self.rejected_total.inc(count)
+        raise queue.Full(f"{self._pending()} jobs waiting (limit {self.limit})")
+
+    def __call__(self, job):
+        if self._waiters and job.status in (JobStatus.IN_PROGRESS, JobStatus.CANCELLED):
+            with self._cond:
+                self._cond.notify_all()
+
+    def _wait_for_room(self, count):
+        self.blocked_total.inc()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            self._waiters += 1
+            try:
+                while self._pending() + count > self.limit:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected_total.inc(count)
+                        raise queue.Full(f"no room for {self.timeout}s (limit {self.limit})")
+                    # Bounded wait, in case room appears without a pick (e.g. a cancelled task)
+                    self._cond.wait(min(remaining, 0.1) if remaining is not None else 0.1)
+            finally:
+                self._waiters -= 1
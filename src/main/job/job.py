@@ -1,49 +1,107 @@
-import uuid
 from datetime import datetime
 
+from src.main.config import clock
+from src.main.config.ids import new_id
 from src.main.config.job_status import JobStatus
+from src.main.config.retry_policy import RetryPolicy
 
 class Job:
+    # Slots keep per-job memory flat; timestamps are monotonic ns ints
+    # converted to datetime only when read through the properties below
+    __slots__ = ('id', 'task_id', 'run_time', 'priority', 'status', 'job_type', 'payload',
+                 'attempt_count', 'worker_id', 'dispatched_at', 'result', 'error',
+                 'retry_policy', 'max_retries', 'retry_delay', 'timeout',
+                 '_created_ns', '_updated_ns', '_started_ns', '_finished_ns')
 
     def __init__(self, 
                  task_id: str,
                  run_time: datetime,
                  priority: int = 0,
-                 status: JobStatus = JobStatus.IN_QUEUE
+                 status: JobStatus = JobStatus.IN_QUEUE,
+                 job_type: str = None,
+                 payload=None,
+                 job_id=None,
+                 retry_policy: str = RetryPolicy.FIXED_DELAY,
+                 max_retries: int = 0,
+                 timeout: float = None
                  ):
-        self.id = str(uuid.uuid4())
+        now = clock.now_ns()
+        self.id = job_id if job_id is not None else new_id()
         self.task_id = task_id
         self.run_time = run_time
         self.priority = priority
         self.status = status
+        self.job_type = job_type
+        self.payload = payload
         self.attempt_count = 1
-        self.started_at = None
-        self.finished_at = None
+        self.retry_policy = retry_policy
+        self.max_retries = max_retries
+        self.retry_delay = 0.0  # last backoff in seconds, for decorrelated jitter
+        self.timeout = timeout  # seconds an attempt may run; None for no limit
+        self.dispatched_at = None
         self.worker_id = None
-        self.created_at = datetime.now()
-        self.last_updated_at = datetime.now()
+        self.result = None
+        self.error = None
+        self._started_ns = None
+        self._finished_ns = None
+        self._created_ns = now
+        self._updated_ns = now
+
+    @property
+    def created_at(self):
+        return clock.to_datetime(self._created_ns)
+
+    @property
+    def last_updated_at(self):
+        return clock.to_datetime(self._updated_ns)
+
+    @property
+    def started_at(self):
+        return clock.to_datetime(self._started_ns)
+
+    @property
+    def finished_at(self):
+        return clock.to_datetime(self._finished_ns)
+
+    # Raw clock.now_ns() values, for computing durations without datetimes
+    @property
+    def created_ns(self):
+        return self._created_ns
+
+    @property
+    def started_ns(self):
+        return self._started_ns
+
+    @property
+    def finished_ns(self):
+        return self._finished_ns
 
     def job_update(self, status: JobStatus, increaseAttemptCount: bool):
         self.status = status
-        self.last_updated_at = datetime.now()
+        self._updated_ns = clock.now_ns()
         if increaseAttemptCount:
             self.attempt_count += 1
 
     def picked_by_worker(self, status: JobStatus, worker_id: str):
+        now = clock.now_ns()
         self.status = status
         self.worker_id = worker_id
-        self.started_at = datetime.now()
-        self.last_updated_at = datetime.now()
+        self._started_ns = now
+        self._updated_ns = now
     
-    def complete_job(self):
+    def complete_job(self, result=None):
+        now = clock.now_ns()
         self.status = JobStatus.COMPLETED
-        self.finished_at = datetime.now()
-        self.last_updated_at = datetime.now()
+        self.result = result
+        self._finished_ns = now
+        self._updated_ns = now
     
-    def fail_job(self):
+    def fail_job(self, error: Exception = None):
+        now = clock.now_ns()
         self.status = JobStatus.FAILED
-        self.finished_at = datetime.now()
-        self.last_updated_at = datetime.now()
+        self.error = error
+        self._finished_ns = now
+        self._updated_ns = now
     
     # Priority queue comparison methods (lower priority number = higher priority)
     def __lt__(self, other):
@@ -69,4 +127,4 @@ class Job:
         return not self == other
     
     def __repr__(self):
-        return f"Job(id={self.id}, task_id={self.task_id}, priority={self.priority}, run_time={self.run_time}, status={self.status})"
\ No newline at end of file
+        return f"Job(id={self.id}, task_id={self.task_id}, job_type={self.job_type}, priority={self.priority}, run_time={self.run_time}, status={self.status})"
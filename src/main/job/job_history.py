@@ -0,0 +1,325 @@
+import math
+import threading
+import uuid
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta
+from itertools import compress, filterfalse
+from src.main.config import clock
+from src.main.config.job_status import JobStatus
+
+JobRecord = namedtuple("JobRecord", "job_id task_id job_type status worker_id attempts finished_at duration wait")
+
+_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+_NAN = float("nan")
+
+class _Interner:
+    """Small integer codes for repeated values, recycled once no record uses them"""
+    __slots__ = ('codes', 'values', 'refs', 'free')
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+        self.refs = []
+        self.free = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            if self.free:
+                code = self.free.pop()
+                self.values[code] = value
+            else:
+                code = len(self.values)
+                self.values.append(value)
+                self.refs.append(0)
+            self.codes[value] = code
+        self.refs[code] += 1
+        return code
+
+    def release(self, code):
+        """Drop one use of `code`; True if that was the last one"""
+        self.refs[code] -= 1
+        if self.refs[code]:
+            return False
+        del self.codes[self.values[code]]
+        self.values[code] = None
+        self.free.append(code)
+        return True
+
+class JobHistory:
+    """Finished jobs kept as compact columns in a fixed-size ring
+
+    Registered as a JobListener, it records every job that ends COMPLETED,
+    FAILED or CANCELLED into preallocated `array` columns instead of
+    keeping Job objects alive: about 55 bytes per record plus one copy of
+    each distinct task id, job type and worker id. The oldest record is
+    evicted once `capacity` is reached, or once it is older than
+    `retention`.
+
+    Records are stamped with the time they are recorded, which never goes
+    backwards, so time ranges are found by binary search. Records with the
+    same task, worker or status are chained through per-record back links,
+    so query() walks only the matching records, newest first. stats()
+    slices the columns for a time range and groups them per job type with
+    C-level iteration (compress, map, sorted) rather than per-record code.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, retention: timedelta = None):
+        self.capacity = capacity
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._finished = array('d', bytes(8 * capacity))   # epoch seconds when recorded
+        self._duration = array('f', bytes(4 * capacity))   # picked to finished, NaN if never picked
+        self._wait = array('f', bytes(4 * capacity))       # created to picked, NaN if never picked
+        self._job_hi = array('Q', bytes(8 * capacity))     # uuid ids as two 64-bit halves;
+        self._job_lo = array('Q', bytes(8 * capacity))     # compact integer ids have hi == 0
+        self._task = array('I', bytes(4 * capacity))
+        self._type = array('H', bytes(2 * capacity))
+        self._worker = array('H', bytes(2 * capacity))
+        self._status = array('B', bytes(capacity))
+        self._attempts = array('H', bytes(2 * capacity))
+        # Distance back to the previous record with the same task / worker / status (0: none)
+        self._task_prev = array('I', bytes(4 * capacity))
+        self._worker_prev = array('I', bytes(4 * capacity))
+        self._status_prev = array('I', bytes(4 * capacity))
+        self._task_heads = {}
+        self._worker_heads = {}
+        self._status_heads = {}
+        self._tasks = _Interner()
+        self._types = _Interner()
+        self._workers = _Interner()
+        self._other_ids = {}  # slot -> job id that is neither a uuid nor an int
+        self._next_seq = 0
+        self._size = 0
+
+    def __call__(self, job):
+        """JobListeners callback"""
+        if job.status in _STATUS_CODES:
+            self.record(job)
+
+    def record(self, job):
+        started, finished = job.started_ns, job.finished_ns
+        duration = (finished - started) / 1e9 if started is not None and finished is not None else _NAN
+        wait = (started - job.created_ns) / 1e9 if started is not None else _NAN
+        with self._lock:
+            now = clock.to_epoch_seconds(clock.now_ns())
+            if self.retention is not None:
+                self._expire(now - self.retention.total_seconds())
+            if self._size == self.capacity:
+                self._evict_oldest()
+            seq = self._next_seq
+            self._next_seq += 1
+            self._size += 1
+            slot = seq % self.capacity
+            self._finished[slot] = now
+            self._duration[slot] = duration
+            self._wait[slot] = wait
+            self._store_id(slot, job.id)
+            self._type[slot] = self._types.code(job.job_type)
+            self._attempts[slot] = min(job.attempt_count, 0xFFFF)
+            self._task[slot] = self._link(self._tasks.code(job.task_id), seq, self._task_heads, self._task_prev)
+            self._worker[slot] = self._link(self._workers.code(job.worker_id), seq, self._worker_heads,
+                                            self._worker_prev)
+            self._status[slot] = self._link(_STATUS_CODES[job.status], seq, self._status_heads,
+                                            self._status_prev)
+
+    def query(self, task_id=None, status: JobStatus = None, worker_id=None, job_type: str = None,
+              since=None, until: datetime = None, limit: int = None):
+        """JobRecords matching every given filter, newest first
+
+        `since` is a datetime, or a timedelta meaning that long ago. The
+        most selective index is walked: task, then worker, then status,
+        otherwise the time range.
+        """
+        since, until = _bound(since), _bound(until)
+        results = []
+        with self._lock:
+            self._expire_for_query()
+            if task_id is not None:
+                seqs = self._chain(self._task_heads, self._task_prev, self._tasks.codes.get(task_id))
+            elif worker_id is not None:
+                seqs = self._chain(self._worker_heads, self._worker_prev, self._workers.codes.get(worker_id))
+            elif status is not None:
+                seqs = self._chain(self._status_heads, self._status_prev, _STATUS_CODES.get(status))
+            else:
+                first, last = self._range(since, until)
+                seqs = range(self._oldest() + last - 1, self._oldest() + first - 1, -1)
+            type_code = self._types.codes.get(job_type, -1) if job_type is not None else None
+            worker_code = self._workers.codes.get(worker_id, -1) if worker_id is not None else None
+            status_code = _STATUS_CODES.get(status, -1) if status is not None else None
+            capacity = self.capacity
+            for seq in seqs:
+                slot = seq % capacity
+                finished = self._finished[slot]
+                if until is not None and finished >= until:
+                    continue
+                if since is not None and finished < since:
+                    break  # Every chain runs newest to oldest
+                if ((type_code is not None and self._type[slot] != type_code)
+                        or (worker_code is not None and self._worker[slot] != worker_code)
+                        or (status_code is not None and self._status[slot] != status_code)):
+                    continue
+                results.append(self._record_at(slot))
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def stats(self, since=None, until: datetime = None, percentiles=(50, 95, 99)):
+        """Per job type: counts by status and duration / wait percentiles in seconds
+
+        `since` is a datetime, or a timedelta meaning that long ago, e.g.
+        stats(since=timedelta(hours=1))["REPORT"]["duration"]["p95"].
+        """
+        since, until = _bound(since), _bound(until)
+        with self._lock:
+            self._expire_for_query()
+            first, last = self._range(since, until)
+            columns = [self._slice(column, first, last)
+                       for column in (self._type, self._status, self._duration, self._wait)]
+            type_names = list(self._types.values)
+        types, statuses, durations, waits = columns
+        result = {}
+        for code in set(types):
+            mask = list(map(code.__eq__, types))
+            type_statuses = list(compress(statuses, mask))
+            result[type_names[code]] = {
+                "count": len(type_statuses),
+                **{status.value.lower(): type_statuses.count(i) for i, status in enumerate(_STATUSES)},
+                "duration": _summary(sorted(filterfalse(math.isnan, compress(durations, mask))), percentiles),
+                "wait": _summary(sorted(filterfalse(math.isnan, compress(waits, mask))), percentiles),
+            }
+        return result
+
+    def memory_bytes(self):
+        """Bytes held by the columns (excludes interned ids and index heads)"""
+        columns = (self._finished, self._duration, self._wait, self._job_hi, self._job_lo, self._task,
+                   self._type, self._worker, self._status, self._attempts, self._task_prev,
+                   self._worker_prev, self._status_prev)
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
+    def _oldest(self):
+        return self._next_seq - self._size
+
+    def _link(self, code, seq, heads, prev):
+        previous = heads.get(code)
+        prev[seq % self.capacity] = seq - previous if previous is not None else 0
+        heads[code] = seq
+        return code
+
+    def _chain(self, heads, prev, code):
+        """Sequence numbers of live records for `code`, newest first"""
+        seq = heads.get(code) if code is not None else None
+        oldest = self._oldest()
+        while seq is not None and seq >= oldest:
+            yield seq
+            distance = prev[seq % self.capacity]
+            seq = seq - distance if distance else None
+
+    def _range(self, since, until):
+        """Offsets [first, last) from the oldest live record covering [since, until)"""
+        first = self._bisect(since) if since is not None else 0
+        last = self._bisect(until) if until is not None else self._size
+        return first, max(first, last)
+
+    def _bisect(self, when):
+        low, high = 0, self._size
+        oldest, capacity, finished = self._oldest(), self.capacity, self._finished
+        while low < high:
+            middle = (low + high) // 2
+            if finished[(oldest + middle) % capacity] < when:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _slice(self, column, first, last):
+        """Copy of `column` for offsets [first, last), as at most two array slices"""
+        start = (self._oldest() + first) % self.capacity
+        end = start + last - first
+        if end <= self.capacity:
+            return column[start:end]
+        return column[start:] + column[:end - self.capacity]
+
+    def _expire_for_query(self):
+        if self.retention is not None:
+            self._expire(clock.to_epoch_seconds(clock.now_ns()) - self.retention.total_seconds())
+
+    def _expire(self, cutoff):
+        while self._size and self._finished[self._oldest() % self.capacity] < cutoff:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        slot = self._oldest() % self.capacity
+        code = self._task[slot]
+        if self._tasks.release(code):
+            del self._task_heads[code]
+        # Replaced and autoscaled workers get new ids, so their codes must be recycled too
+        code = self._worker[slot]
+        if self._workers.release(code):
+            del self._worker_heads[code]
+        self._types.release(self._type[slot])
+        self._other_ids.pop(slot, None)
+        self._size -= 1
+
+    def _store_id(self, slot, job_id):
+        self._other_ids.pop(slot, None)
+        if isinstance(job_id, int) and 0 <= job_id < 1 << 64:
+            self._job_hi[slot], self._job_lo[slot] = 0, job_id
+            return
+        value = _uuid_int(job_id)
+        if value is not None:
+            self._job_hi[slot], self._job_lo[slot] = value >> 64, value & 0xFFFFFFFFFFFFFFFF
+        else:
+            self._job_hi[slot] = self._job_lo[slot] = 0
+            self._other_ids[slot] = job_id
+
+    def _job_id(self, slot):
+        other = self._other_ids.get(slot)
+        if other is not None:
+            return other
+        high = self._job_hi[slot]
+        if not high:
+            return self._job_lo[slot]
+        return str(uuid.UUID(int=high << 64 | self._job_lo[slot]))
+
+    def _record_at(self, slot):
+        duration, wait = self._duration[slot], self._wait[slot]
+        return JobRecord(self._job_id(slot), self._tasks.values[self._task[slot]],
+                         self._types.values[self._type[slot]], _STATUSES[self._status[slot]],
+                         self._workers.values[self._worker[slot]], self._attempts[slot],
+                         datetime.fromtimestamp(self._finished[slot]),
+                         None if math.isnan(duration) else duration, None if math.isnan(wait) else wait)
+
+def _uuid_int(job_id):
+    """128-bit value of a canonical (lowercase, hyphenated) uuid string, else None"""
+    if (not isinstance(job_id, str) or len(job_id) != 36 or job_id[8] != '-' or job_id[13] != '-'
+            or job_id[18] != '-' or job_id[23] != '-' or job_id != job_id.lower()):
+        return None
+    try:
+        value = int(job_id.replace('-', ''), 16)
+    except ValueError:
+        return None
+    # hi == 0 marks integer ids, so leave the (never generated) uuids that would collide as strings
+    return value if value >> 64 else None
+
+def _bound(value):
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        value = datetime.now() - value
+    return value.timestamp()
+
+def _summary(values, percentiles):
+    if not values:
+        return {"mean": 0.0, "max": 0.0, **{f"p{p:g}": 0.0 for p in percentiles}}
+    count = len(values)
+    summary = {"mean": sum(values) / count, "max": values[-1]}
+    for p in percentiles:
+        summary[f"p{p:g}"] = values[min(count - 1, max(0, math.ceil(count * p / 100) - 1))]
+    return summary
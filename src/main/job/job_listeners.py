@@ -0,0 +1,24 @@
+from src.main.config import event_log
+
+class JobListeners:
+    """Callbacks notified after every job state transition
+
+    Components that move a job between states (scheduler, workers, the
+    app's cancel paths) call notify(job); listeners read job.status.
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def add(self, listener):
+        self._listeners.append(listener)
+
+    def remove(self, listener):
+        self._listeners.remove(listener)
+
+    def notify(self, job):
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                event_log.error("listener_error", listener=listener, error=e)
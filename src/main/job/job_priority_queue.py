@@ -1,21 +1,369 @@
 import heapq
-from src.main.config.singleton import singleton
+import itertools
+import threading
+from datetime import datetime
+from src.main.config.job_status import JobStatus
 from src.main.job.job import Job
 
-@singleton
-class JobPriorityQueue:
+class _Shard:
+    """Lock-striped ingestion buffer used when the queue is sharded"""
+    __slots__ = ('lock', 'jobs')
 
     def __init__(self):
-        self.heap = []
+        self.lock = threading.Lock()
+        self.jobs = []
+
+class JobPriorityQueue:
+    """Thread-safe, addressable priority queue of jobs
+
+    Jobs wait in a delayed heap ordered by run_time and are promoted to a
+    ready heap ordered by (priority, run_time) once they are due, so a
+    high-priority job scheduled for later never blocks due work behind it.
+    There is one ready heap per job type; pops take the best top among
+    them, so a rate-limited type can be left in place while others drain.
+    Heap entries are lists holding a precomputed key, a sequence number and
+    the job, so ordering never falls back to Job comparisons.
+
+    Every live entry is indexed by job id (and job ids by task id). Cancel,
+    update_priority and reschedule blank the job slot of the old entry and
+    push a new one; blanked entries are skipped when they reach the top and
+    the heaps are compacted once they make up most of the queue.
+
+    With num_shards > 1, add() only appends to a per-thread shard buffer
+    under that shard's lock; buffers are merged into the heaps in bulk by
+    the consumer, so concurrent producers do not contend on one lock.
+    """
+
+    def __init__(self, num_shards: int = 1):
+        self._lock = threading.RLock()
+        self._delayed = []
+        self._ready = {}  # job_type -> ready heap
+        self._entries = {}
+        self._jobs_by_task = {}
+        self._removed_count = 0
+        self._counter = itertools.count()
+        self._shards = [_Shard() for _ in range(num_shards)] if num_shards > 1 else None
+        self._shard_counter = itertools.count()
+        self._local = threading.local()
+
+    def add(self, job: Job):
+        if self._shards is None:
+            with self._lock:
+                self._push(job)
+            return
+        shard = self._shard_for_thread()
+        with shard.lock:
+            shard.jobs.append(job)
+
+    def add_many(self, jobs):
+        """Add several jobs taking the lock once"""
+        jobs = list(jobs)
+        if self._shards is None:
+            with self._lock:
+                self._push_many(jobs)
+            return
+        shard = self._shard_for_thread()
+        with shard.lock:
+            shard.jobs.extend(jobs)
+
+    def pop_ready(self, now: datetime = None, limit: int = None, quotas: dict = None, job_types=None):
+        """Pop up to `limit` due jobs in priority order, taking the lock once
+
+        `quotas` maps a job type to the most jobs of that type to pop;
+        due jobs beyond it stay queued. Types not in it are unlimited.
+        With `job_types`, only due jobs of those types are popped.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._drain_shards()
+            self._promote(now)
+            remaining = dict(quotas) if quotas else {}
+            heaps = {job_type: heap for job_type, heap in self._ready.items()
+                     if remaining.get(job_type, 1) > 0 and (job_types is None or job_type in job_types)}
+            jobs = []
+            while limit is None or len(jobs) < limit:
+                job_type, heap, runner_up = self._best_ready(heaps)
+                if heap is None:
+                    break
+                count = limit - len(jobs) if limit is not None else None
+                quota = remaining.get(job_type)
+                if quota is not None and (count is None or quota < count):
+                    count = quota
+                popped = self._pop_run(heap, runner_up, count)
+                jobs.extend(popped)
+                if quota is not None:
+                    remaining[job_type] = quota - len(popped)
+                    if remaining[job_type] <= 0:
+                        del heaps[job_type]
+            return jobs
 
-    def add (self, job: Job):
-        heapq.heappush(self.heap, job)
-    
     def pop(self):
-        return heapq.heappop(self.heap) if self.heap else None
-    
+        """Pop the best due job, or the earliest delayed job if none is due"""
+        with self._lock:
+            self._drain_shards()
+            self._promote(datetime.now())
+            heap = self._best_ready(self._ready)[1]
+            return (self._pop_live(heap) if heap is not None else None) or self._pop_live(self._delayed)
+
     def peek(self):
-        return self.heap[0] if self.heap else None
-    
+        with self._lock:
+            self._drain_shards()
+            self._promote(datetime.now())
+            heap = self._best_ready(self._ready)[1]
+            if heap is not None:
+                return heap[0][-1]
+            self._discard_removed(self._delayed)
+            return self._delayed[0][-1] if self._delayed else None
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._drain_shards()
+            entry = self._entries.get(job_id)
+            return entry[-1] if entry else None
+
+    def cancel(self, job_id: str):
+        """Remove a queued job; returns it, or None if it is not queued"""
+        with self._lock:
+            self._drain_shards()
+            job = self._remove_entry(job_id)
+            if job is not None:
+                job.job_update(JobStatus.CANCELLED, False)
+            return job
+
+    def cancel_task(self, task_id: str):
+        """Cancel every queued job created for `task_id`"""
+        with self._lock:
+            self._drain_shards()
+            return [self.cancel(job_id) for job_id in self._task_job_ids(task_id)]
+
+    def pop_lowest(self, count: int = 1):
+        """Remove the `count` worst queued jobs by (priority, run_time), returned best first
+
+        A scan of every queued job, meant for shedding or spilling in bulk
+        under overload rather than for the dispatch path. Statuses are left
+        unchanged.
+        """
+        with self._lock:
+            self._drain_shards()
+            entries = heapq.nlargest(count, self._entries.values(), key=_rank)
+            return [self._remove_entry(entry[-1].id) for entry in reversed(entries)]
+
+    def update_priority(self, job_id: str, priority: int):
+        with self._lock:
+            self._drain_shards()
+            job = self._remove_entry(job_id)
+            if job is None:
+                return False
+            job.priority = priority
+            self._push(job)
+            return True
+
+    def reschedule(self, job_id: str, run_time: datetime):
+        with self._lock:
+            self._drain_shards()
+            job = self._remove_entry(job_id)
+            if job is None:
+                return False
+            job.run_time = run_time
+            self._push(job)
+            return True
+
+    def next_run_time(self, skip_types=(), job_types=None):
+        """Time at which the next queued job is due, or None when empty
+
+        Due jobs of the types in `skip_types`, or not in `job_types` when
+        given, are left out, e.g. types the caller cannot dispatch yet.
+        """
+        with self._lock:
+            self._drain_shards()
+            run_times = []
+            heaps = [heap for job_type, heap in self._ready.items()
+                     if job_type not in skip_types and (job_types is None or job_type in job_types)]
+            for heap in heaps + [self._delayed]:
+                self._discard_removed(heap)
+                if heap:
+                    run_times.append(heap[0][-1].run_time)
+            return min(run_times) if run_times else None
+
+    def due_types(self, job_types, now: datetime = None):
+        """The types among `job_types` that have due jobs queued"""
+        with self._lock:
+            self._drain_shards()
+            self._promote(now or datetime.now())
+            due = set()
+            for job_type in job_types:
+                heap = self._ready.get(job_type)
+                if heap:
+                    self._discard_removed(heap)
+                    if heap:
+                        due.add(job_type)
+            return due
+
     def is_empty(self):
-        return len(self.heap) == 0
\ No newline at end of file
+        return len(self) == 0
+
+    def __len__(self):
+        with self._lock:
+            self._drain_shards()
+            return len(self._entries)
+
+    def _shard_for_thread(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._shards[next(self._shard_counter) % len(self._shards)]
+            self._local.shard = shard
+        return shard
+
+    def _index(self, entry):
+        job = entry[-1]
+        if job.id in self._entries:
+            # Re-adding a queued job replaces its previous entry
+            self._remove_entry(job.id)
+        self._entries[job.id] = entry
+        # Most tasks have a single queued job, so a set is only built for the second one
+        task_jobs = self._jobs_by_task.get(job.task_id)
+        if task_jobs is None:
+            self._jobs_by_task[job.task_id] = job.id
+        elif isinstance(task_jobs, set):
+            task_jobs.add(job.id)
+        else:
+            self._jobs_by_task[job.task_id] = {task_jobs, job.id}
+
+    def _unindex_task(self, job: Job):
+        task_jobs = self._jobs_by_task.get(job.task_id)
+        if task_jobs is None:
+            return
+        if isinstance(task_jobs, set):
+            task_jobs.discard(job.id)
+            if not task_jobs:
+                del self._jobs_by_task[job.task_id]
+        elif task_jobs == job.id:
+            del self._jobs_by_task[job.task_id]
+
+    def _task_job_ids(self, task_id: str):
+        task_jobs = self._jobs_by_task.get(task_id)
+        if task_jobs is None:
+            return []
+        return list(task_jobs) if isinstance(task_jobs, set) else [task_jobs]
+
+    def _push(self, job: Job):
+        entry = [job.run_time, next(self._counter), job]
+        self._index(entry)
+        heapq.heappush(self._delayed, entry)
+
+    def _push_many(self, jobs):
+        delayed = self._delayed
+        counter = self._counter
+        entries = [[job.run_time, next(counter), job] for job in jobs]
+        for entry in entries:
+            self._index(entry)
+        # Rebuilding is O(n + k) and beats k pushes once the batch is large
+        if len(entries) > len(delayed):
+            delayed.extend(entries)
+            heapq.heapify(delayed)
+        else:
+            for entry in entries:
+                heapq.heappush(delayed, entry)
+
+    def _remove_entry(self, job_id: str):
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return None
+        job = entry[-1]
+        entry[-1] = None
+        self._unindex_task(job)
+        self._removed_count += 1
+        self._maybe_compact()
+        return job
+
+    def _pop_live(self, heap):
+        """Pop the top live job of `heap` and drop it from the indexes"""
+        while heap:
+            job = heapq.heappop(heap)[-1]
+            if job is None:
+                self._removed_count -= 1
+                continue
+            del self._entries[job.id]
+            self._unindex_task(job)
+            return job
+        return None
+
+    def _best_ready(self, heaps):
+        """(job_type, heap, runner-up entry) for the ready heap with the best top entry
+
+        The runner-up is the best top entry among the other heaps. Returns
+        (None, None, None) when every heap is empty.
+        """
+        best_type = best = runner_up = None
+        for job_type, heap in heaps.items():
+            self._discard_removed(heap)
+            if not heap:
+                continue
+            if best is None or heap[0] < best[0]:
+                if best is not None:
+                    runner_up = best[0]
+                best_type, best = job_type, heap
+            elif runner_up is None or heap[0] < runner_up:
+                runner_up = heap[0]
+        return best_type, best, runner_up
+
+    def _pop_run(self, heap, bound, count):
+        """Pop up to `count` live jobs from `heap` while its top ranks before `bound`"""
+        jobs = []
+        entries = self._entries
+        while heap and (count is None or len(jobs) < count):
+            if bound is not None and bound < heap[0]:
+                break
+            job = heapq.heappop(heap)[-1]
+            if job is None:
+                self._removed_count -= 1
+                continue
+            del entries[job.id]
+            self._unindex_task(job)
+            jobs.append(job)
+        return jobs
+
+    def _discard_removed(self, heap):
+        while heap and heap[0][-1] is None:
+            heapq.heappop(heap)
+            self._removed_count -= 1
+
+    def _maybe_compact(self):
+        if self._removed_count > 64 and self._removed_count > len(self._entries):
+            # Rebuild in place: callers may hold references to the heap lists
+            self._delayed[:] = [entry for entry in self._delayed if entry[-1] is not None]
+            heapq.heapify(self._delayed)
+            for heap in self._ready.values():
+                heap[:] = [entry for entry in heap if entry[-1] is not None]
+                heapq.heapify(heap)
+            self._removed_count = 0
+
+    def _drain_shards(self):
+        if self._shards is None:
+            return
+        for shard in self._shards:
+            if not shard.jobs:
+                continue
+            with shard.lock:
+                jobs, shard.jobs = shard.jobs, []
+            self._push_many(jobs)
+
+    def _promote(self, now: datetime):
+        delayed = self._delayed
+        ready = self._ready
+        while delayed and delayed[0][0] <= now:
+            entry = heapq.heappop(delayed)
+            job = entry[-1]
+            if job is None:
+                self._removed_count -= 1
+                continue
+            # Re-key the same entry in place so the job index stays valid
+            entry.insert(0, job.priority)
+            heap = ready.get(job.job_type)
+            if heap is None:
+                heap = ready[job.job_type] = []
+            heapq.heappush(heap, entry)
+
+def _rank(entry):
+    job = entry[-1]
+    return job.priority, job.run_time
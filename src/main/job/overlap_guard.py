@@ -0,0 +1,86 @@
+import threading
+from src.main.config.job_status import JobStatus
+
+_FINAL = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+class OverlapGuard:
+    """Queued and running job counts for recurring tasks with an overlap policy
+
+    The scheduler track()s the jobs it creates for such tasks, and consults
+    active() or defer() before the next fire. Registered as a JobListener,
+    it moves a job from queued to running when a worker picks it, back to
+    queued when it is re-queued for a retry, and forgets it once it
+    completes, fails or is cancelled. Jobs of other tasks are ignored after
+    one dict lookup.
+
+    A deferred fire is owed to its task: when the task's last active job
+    ends, `on_idle(task_id)` is called once, however many fires were
+    deferred meanwhile.
+    """
+
+    def __init__(self, on_idle=None):
+        self.on_idle = on_idle
+        self._lock = threading.Lock()
+        self._jobs = {}   # job id -> (task id, running)
+        self._tasks = {}  # task id -> [queued, running]
+        self._owed = set()
+
+    def track(self, job):
+        """Count a job just created IN_QUEUE for its task"""
+        with self._lock:
+            self._jobs[job.id] = (job.task_id, False)
+            self._tasks.setdefault(job.task_id, [0, 0])[0] += 1
+
+    def active(self, task_id):
+        """(queued, running) job counts for `task_id`"""
+        with self._lock:
+            counts = self._tasks.get(task_id)
+            return tuple(counts) if counts else (0, 0)
+
+    def defer(self, task_id):
+        """Owe `task_id` a run once its active jobs end; False if it has none"""
+        with self._lock:
+            if task_id not in self._tasks:
+                return False
+            self._owed.add(task_id)
+            return True
+
+    def __call__(self, job):
+        """JobListeners callback"""
+        if job.id not in self._jobs:
+            return
+        status = job.status
+        with self._lock:
+            tracked = self._jobs.get(job.id)
+            if tracked is None:
+                return
+            task_id, running = tracked
+            if status in _FINAL:
+                del self._jobs[job.id]
+                idle = self._release(task_id, running)
+            else:
+                idle = False
+                running_now = status is JobStatus.IN_PROGRESS
+                if running_now != running:
+                    counts = self._tasks[task_id]
+                    counts[running] -= 1
+                    counts[running_now] += 1
+                    self._jobs[job.id] = (task_id, running_now)
+        if idle and self.on_idle is not None:
+            self.on_idle(task_id)
+
+    def _release(self, task_id, running):
+        """Drop one active job; True if the task went idle owing a run"""
+        counts = self._tasks[task_id]
+        counts[running] -= 1
+        if counts[0] or counts[1]:
+            return False
+        del self._tasks[task_id]
+        if task_id in self._owed:
+            self._owed.discard(task_id)
+            return True
+        return False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs)
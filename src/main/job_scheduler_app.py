@@ -1,46 +1,410 @@
 from datetime import datetime, timedelta
 from src.main.task.task import Task
 from src.main.task.task_management import TaskManagement
+from src.main.task.task_loader import read_tasks
 from src.main.job.job import Job
 from src.main.job.job_priority_queue import JobPriorityQueue
+from src.main.job.job_listeners import JobListeners
+from src.main.job.admission_control import AdmissionController
+from src.main.job.job_history import JobHistory
+from src.main.persistence.write_ahead_log import WriteAheadLog
+from src.main.persistence.cold_task_store import ColdTaskStore
+from src.main.persistence.codec import job_from_record, task_from_record
+from src.main.persistence.spill_file import SpillFile
 from src.main.worker.worker_queue import WorkerQueue
+from src.main.worker.fair_queue import FairWorkerQueue
 from src.main.worker.scheduler import Scheduler
 from src.main.worker.worker import Worker
+from src.main.worker.job_handlers import JobHandlerRegistry
+from src.main.worker.process_pool_backend import ProcessPoolBackend
+from src.main.worker.async_worker import AsyncWorkerEngine
+from src.main.worker.batch_worker import BatchWorker, BatchMetrics
+from src.main.worker.retry_engine import RetryEngine
+from src.main.worker.watchdog import Watchdog
+from src.main.worker.worker_pool import ScalingPolicy, WorkerPool
+from src.main.worker.dag_coordinator import DagCoordinator, DagRun
+from src.main.task.dag import Dag
+from src.main.metrics.registry import MetricsRegistry
+from src.main.metrics.job_metrics import JobMetrics
+from src.main.metrics.http_exporter import MetricsHTTPServer
 from src.main.config.job_type import JobType
 from src.main.config.job_status import JobStatus
+from src.main.config.admission_policy import AdmissionPolicy
+from src.main.config.execution_backend import ExecutionBackend
+from src.main.config.ids import use_compact_ids
+from src.main.config import event_log
+import gc
+import itertools
 import threading
 import time
 
 class JobSchedulerApp:
-    def __init__(self, num_workers=3):
-        self.task_management = TaskManagement()
-        self.job_priority_queue = JobPriorityQueue()
-        self.worker_queue = WorkerQueue()
-        self.scheduler = Scheduler(self.job_priority_queue, self.worker_queue, self.task_management)
-        self.workers = []
+    def __init__(self, num_workers=3, queue_shards=1, compact_ids=False, process_workers=None,
+                 async_concurrency=1000, wal_dir=None, durable_adds=True, snapshot_every=100_000,
+                 memory_horizon: timedelta = None, cold_store_path: str = None,
+                 retry_base_delay: float = 1.0, retry_max_delay: float = 300.0,
+                 max_workers: int = None, scaling_policy: ScalingPolicy = None,
+                 metrics_port: int = None, fair_queue: FairWorkerQueue = None,
+                 dedicated_workers: dict = None, worker_queue_size: int = 1024,
+                 max_pending_jobs: int = None, admission_policy: str = AdmissionPolicy.REJECT,
+                 admission_timeout: float = None, overflow_threshold: int = None,
+                 overflow_path: str = None, history_capacity: int = None,
+                 history_retention: timedelta = None, rate_limits: dict = None):
+        if compact_ids:
+            # Process-wide: integer ids for every Job/Task created from now on
+            use_compact_ids(True)
+        self.job_listeners = JobListeners()
+        # Latency histograms, depth gauges and counters; metrics_port also serves them over HTTP
+        self.metrics = MetricsRegistry()
+        self.journal = None
+        self.durable_adds = durable_adds
+        if wal_dir is not None:
+            self.journal = WriteAheadLog(wal_dir, snapshot_every=snapshot_every)
+            self.job_listeners.add(self.journal.log_job)
+        # Tasks due beyond memory_horizon are kept on disk until they get close
+        cold_store = ColdTaskStore(cold_store_path) if memory_horizon is not None else None
+        self.task_management = TaskManagement(journal=self.journal, cold_store=cold_store,
+                                              horizon=memory_horizon or timedelta(hours=1))
+        if self.journal is not None:
+            self.journal.snapshot_source = self.task_management.snapshot_tasks
+        self.job_priority_queue = JobPriorityQueue(num_shards=queue_shards)
+        # A FairWorkerQueue shares the pool between job types instead of serving them FIFO.
+        # The hand-off is bounded: due jobs beyond it wait in the priority queue.
+        self.worker_queue_size = worker_queue_size
+        self.worker_queue = fair_queue or WorkerQueue(worker_queue_size)
+        if fair_queue is not None:
+            self.job_listeners.add(fair_queue)
+        self.scheduler = Scheduler(self.job_priority_queue, self.worker_queue, self.task_management,
+                                   self.job_listeners, self.metrics)
+        # job_type -> jobs per second, or (rate, burst); due jobs beyond it wait in the priority queue
+        for job_type, limit in (rate_limits or {}).items():
+            self.set_rate_limit(job_type, *(limit if isinstance(limit, tuple) else (limit,)))
+        if overflow_threshold is not None:
+            # Queued jobs past the threshold wait in a local file, read back in order
+            self.scheduler.overflow = SpillFile(overflow_path)
+            self.scheduler.overflow_threshold = overflow_threshold
+        self.admission = None
+        if max_pending_jobs is not None:
+            self.admission = AdmissionController(max_pending_jobs, self._pending_jobs, self._shed_lowest,
+                                                 admission_policy, admission_timeout, self.metrics)
+            self.job_listeners.add(self.admission)
+        # Failed jobs with retries left go back to the priority queue with a backoff
+        self.retry_engine = RetryEngine(self.job_priority_queue, self.job_listeners, self.scheduler.wakeup,
+                                        retry_base_delay, retry_max_delay)
+        # One thread enforces every in-progress job's timeout
+        self.watchdog = Watchdog()
+        # num_workers is the floor; with max_workers the pool grows under backlog or lag
         self.num_workers = num_workers
+        self.worker_pool = WorkerPool(self.worker_queue, self._new_worker,
+                                      scaling_policy or ScalingPolicy(num_workers, max_workers or num_workers),
+                                      self.job_listeners)
+        self.workers = self.worker_pool.workers
+        self.handlers = JobHandlerRegistry.with_simulated_handlers()
+        self.process_workers = process_workers
+        self.process_backend = None
+        self.async_concurrency = async_concurrency
+        self.async_engine = None
+        self.batch_workers = []
+        # job_type -> number of workers that serve only that type, from their own queue
+        self.dedicated_workers = dict(dedicated_workers or {})
+        self.type_workers = []
+        self.batch_metrics = BatchMetrics()
+        self.job_listeners.add(JobMetrics(self.metrics))
+        # Finished jobs kept as compact columns for queries and aggregates
+        self.history = None
+        if history_capacity is not None:
+            self.history = JobHistory(history_capacity, history_retention)
+            self.job_listeners.add(self.history)
+        # DAG steps are queued as soon as their upstream steps complete, critical path first.
+        # Added last so every other listener has seen a step finish before its children queue.
+        self.dags = DagCoordinator(self._enqueue_job)
+        self.job_listeners.add(self.dags)
+        self._register_gauges()
+        self.metrics_port = metrics_port
+        self.metrics_server = None
         
     def start(self):
         """Start the job scheduler system"""
-        # Start scheduler thread
+        if self.journal is not None:
+            self.recover()
+
+        # CPU-bound handlers share one process pool across all workers
+        if self.handlers.uses_backend(ExecutionBackend.PROCESS):
+            self.process_backend = ProcessPoolBackend(self.process_workers)
+
+        # Coroutine handlers run on one event loop; route their job types to it
+        async_job_types = self.handlers.job_types_for(ExecutionBackend.ASYNC)
+        if async_job_types:
+            self.async_engine = AsyncWorkerEngine("async-0", self.handlers, self.async_concurrency,
+                                                  self.job_listeners, self.retry_engine, self.watchdog,
+                                                  queue_size=self.worker_queue_size)
+            for job_type in async_job_types:
+                self.scheduler.route(job_type, self.async_engine.worker_queue)
+            self.metrics.gauge("async_jobs_in_flight", lambda: self.async_engine.in_flight,
+                               "Coroutine jobs running on the async engine")
+            self.async_engine.start()
+
+        # Batched types get their own queue so workers can drain same-type jobs
+        for job_type in self.handlers.batch_job_types():
+            config = self.handlers.get_batch(job_type)
+            batch_queue = WorkerQueue(self.worker_queue_size)
+            self.scheduler.route(job_type, batch_queue)
+            self.metrics.gauge("worker_queue_depth", batch_queue.qsize, queue=job_type)
+            for i in range(config.num_workers):
+                worker = BatchWorker(f"batch-{job_type.lower()}-{i}", job_type, batch_queue,
+                                     config, self.batch_metrics, self.job_listeners, self.retry_engine,
+                                     self.watchdog, self._replace_batch_worker)
+                worker.start()
+                self.batch_workers.append(worker)
+
+        for job_type, num_workers in self.dedicated_workers.items():
+            type_queue = WorkerQueue(self.worker_queue_size)
+            self.scheduler.route(job_type, type_queue)
+            self.metrics.gauge("worker_queue_depth", type_queue.qsize, queue=job_type)
+            for i in range(num_workers):
+                worker = Worker(f"{job_type.lower()}-{i}", type_queue, self.handlers, self.process_backend,
+                                self.job_listeners, self.retry_engine, self.watchdog,
+                                self._replace_type_worker)
+                worker.start()
+                self.type_workers.append(worker)
+
+        # Start scheduler thread once routes are in place
         self.scheduler.start()
-        
+        self.watchdog.start()
+
         # Start worker threads
-        for i in range(self.num_workers):
-            worker = Worker(f"worker-{i}", self.worker_queue)
-            worker.start()
-            self.workers.append(worker)
-        
-        print(f"Job Scheduler started with {self.num_workers} workers")
+        self.worker_pool.start()
+
+        if self.metrics_port is not None:
+            self.metrics_server = MetricsHTTPServer(self.metrics, self.metrics_port)
+            self.metrics_server.start()
+
+        event_log.info("app_started", workers=len(self.worker_pool))
     
-    def add_task(self, name: str, job_type: str, schedule_time: datetime, **kwargs):
-        """Add a new task to the system"""
+    def register_handler(self, job_type: str, handler, backend: str = ExecutionBackend.THREAD):
+        """Register the callable that executes jobs of `job_type` (call before start)"""
+        self.handlers.register(job_type, handler, backend)
+
+    def register_batch_handler(self, job_type: str, handler, max_batch_size: int = 100,
+                               linger: float = 0.005, num_workers: int = 1):
+        """Register a handler that receives a list of payloads (call before start)"""
+        self.handlers.register_batch(job_type, handler, max_batch_size, linger, num_workers)
+
+    def add_task(self, name: str, job_type: str, schedule_time: datetime = None, **kwargs):
+        """Add a new task to the system
+
+        With max_pending_jobs, admission control applies first and may
+        block, shed a worse queued job or raise queue.Full.
+        """
         task = Task(name, job_type, schedule_time, **kwargs)
+        if self.admission is not None:
+            self.admission.admit(task.priority)
         self.task_management.add_task(task)
-        print(f"Task '{name}' added with ID: {task.id}")
+        if self.journal is not None and self.durable_adds:
+            # Group commit: concurrent callers share one fsync
+            self.journal.sync()
+        self.scheduler.wakeup(task.schedule_time)
+        event_log.info("task_added", task=task.id, name=name)
         return task.id
     
+    def add_tasks(self, tasks, chunk_size: int = 10_000):
+        """Add many Tasks; returns how many were added
+
+        `tasks` is consumed `chunk_size` at a time, so a generator is never
+        materialized whole. Each chunk takes the index lock once and, with
+        a write-ahead log, is made durable with one sync. With
+        max_pending_jobs, each chunk goes through admission control and may
+        raise queue.Full, after the earlier chunks were added. A chunk with
+        a task that has no schedule_time raises ValueError the same way.
+        """
+        tasks = iter(tasks)
+        if self.admission is not None:
+            # A chunk is admitted as a whole, so it must fit under the limit
+            chunk_size = min(chunk_size, self.admission.limit)
+        count = 0
+        while True:
+            chunk = list(itertools.islice(tasks, chunk_size))
+            if not chunk:
+                break
+            if any(task.schedule_time is None for task in chunk):
+                # Checked before any task of the chunk reaches the ready-time index
+                raise ValueError("every task needs a schedule_time")
+            if self.admission is not None:
+                # Ranked by its worst task, so shedding only cancels jobs below every task in it
+                self.admission.admit(max(task.priority for task in chunk), len(chunk))
+            self.task_management.add_tasks(chunk)
+            if self.journal is not None and self.durable_adds:
+                self.journal.sync()
+            # Per chunk, so tasks due now start running during a long import
+            self.scheduler.wakeup(min(task.schedule_time for task in chunk))
+            count += len(chunk)
+        event_log.info("tasks_added", count=count)
+        return count
+
+    def import_tasks(self, path: str, fmt: str = None, chunk_size: int = 10_000):
+        """Stream tasks from a CSV or JSONL file (see task_loader.FIELDS)"""
+        return self.add_tasks(read_tasks(path, fmt), chunk_size)
+
+    def cancel_task(self, task_id: str):
+        """Remove a task and cancel the jobs it still has queued"""
+        self.task_management.remove_task(task_id)
+        cancelled = self.job_priority_queue.cancel_task(task_id)
+        if self.scheduler.overflow is not None:
+            cancelled += self.scheduler.overflow.cancel_task(task_id)
+        for job in cancelled:
+            self.job_listeners.notify(job)
+        event_log.info("task_cancelled", task=task_id, jobs_dropped=len(cancelled))
+        return cancelled
+
+    def cancel_job(self, job_id: str):
+        """Cancel a queued job; returns False if it already left the queue"""
+        job = self.job_priority_queue.cancel(job_id)
+        if job is None and self.scheduler.overflow is not None:
+            job = self.scheduler.overflow.cancel(job_id)
+        if job is None:
+            return False
+        self.job_listeners.notify(job)
+        return True
+
+    def update_job_priority(self, job_id: str, priority: int):
+        updated = self.job_priority_queue.update_priority(job_id, priority)
+        if updated:
+            self.job_listeners.notify(self.job_priority_queue.get(job_id))
+        return updated
+
+    def reschedule_job(self, job_id: str, run_time: datetime):
+        rescheduled = self.job_priority_queue.reschedule(job_id, run_time)
+        if rescheduled:
+            self.job_listeners.notify(self.job_priority_queue.get(job_id))
+            self.scheduler.wakeup(run_time)
+        return rescheduled
+
+    def set_rate_limit(self, job_type: str, rate: float, burst: float = None):
+        """Dispatch at most `rate` jobs of `job_type` per second (None removes the limit)"""
+        self.scheduler.set_rate_limit(job_type, rate, burst)
+        event_log.info("rate_limit_set", job_type=job_type, rate=rate, burst=burst)
+
+    def run_dag(self, dag: Dag, run_time: datetime = None):
+        """Start a run of `dag`; returns the DagRun to wait on or inspect"""
+        return self.dags.start(dag, run_time)
+
+    def rerun_dag(self, run: DagRun, steps=None):
+        """Run the failed steps of `run` again, or `steps`, with everything downstream of them"""
+        self.dags.rerun(run, steps)
+
+    def _enqueue_job(self, job: Job):
+        # Notify first: once in the queue, a worker may pick the job before this returns
+        self.job_listeners.notify(job)
+        self.job_priority_queue.add(job)
+        self.scheduler.wakeup(job.run_time)
+
+    def _new_worker(self, worker_id: str):
+        return Worker(worker_id, self.worker_queue, self.handlers, self.process_backend,
+                      self.job_listeners, self.retry_engine, self.watchdog, self.worker_pool.replace)
+
+    def _register_gauges(self):
+        metrics = self.metrics
+        metrics.gauge("job_priority_queue_depth", lambda: len(self.job_priority_queue),
+                      "Jobs waiting in the priority queue, due or not")
+        metrics.gauge("worker_queue_depth", self.worker_queue.qsize,
+                      "Jobs dispatched but not yet picked", queue="default")
+        metrics.gauge("workers", lambda: self.worker_pool.metrics()["size"], "Live pool workers")
+        metrics.gauge("workers_busy", lambda: self.worker_pool.metrics()["busy"],
+                      "Pool workers running a job")
+        metrics.gauge("worker_utilization", self._worker_utilization,
+                      "Fraction of pool workers running a job")
+        metrics.gauge("jobs_in_progress_watched", lambda: len(self.watchdog),
+                      "In-progress jobs tracked by the timeout watchdog")
+        if self.scheduler.overflow is not None:
+            metrics.gauge("jobs_overflowed", lambda: len(self.scheduler.overflow),
+                          "Queued jobs waiting in the overflow file")
+
+    def _pending_jobs(self):
+        """Jobs created but not yet picked by a worker, plus due tasks that have no job yet"""
+        overflow = self.scheduler.overflow
+        return (len(self.job_priority_queue) + self.worker_queue.qsize()
+                + (len(overflow) if overflow is not None else 0)
+                + self.task_management.due_count(self.admission.limit))
+
+    def _shed_lowest(self, priority: int):
+        """Cancel the worst queued job if it ranks below `priority`; True if one was shed"""
+        jobs = self.job_priority_queue.pop_lowest(1)
+        if not jobs:
+            return False
+        job = jobs[0]
+        if job.priority <= priority:
+            self.job_priority_queue.add(job)
+            return False
+        job.job_update(JobStatus.CANCELLED, False)
+        self.job_listeners.notify(job)
+        event_log.info("job_shed", job=job.id, priority=job.priority)
+        return True
+
+    def _worker_utilization(self):
+        pool = self.worker_pool.metrics()
+        return pool["busy"] / pool["size"] if pool["size"] else 0.0
+
+    def _replace_batch_worker(self, worker):
+        """Watchdog callback: start a replacement for a batch worker stuck in a timed-out batch"""
+        replacement = worker.replacement()
+        self.batch_workers[self.batch_workers.index(worker)] = replacement
+        replacement.start()
+
+    def _replace_type_worker(self, worker):
+        """Watchdog callback: start a replacement for a stuck dedicated worker"""
+        replacement = worker.replacement()
+        self.type_workers[self.type_workers.index(worker)] = replacement
+        replacement.start()
+
+    def recover(self):
+        """Rebuild tasks and requeue unfinished jobs from the write-ahead log"""
+        started = time.perf_counter()
+        # Millions of new objects would trigger repeated full GC passes for nothing
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            task_records, job_records = self.journal.recover()
+            self.task_management.load_tasks(task_from_record(record) for record in task_records.values())
+            jobs = []
+            for record in job_records.values():
+                job = job_from_record(record)
+                # A job that was running when the process died runs again
+                job.status = JobStatus.IN_QUEUE
+                jobs.append(job)
+            self.job_priority_queue.add_many(jobs)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        event_log.info("recovered", tasks=len(task_records), jobs=len(jobs),
+                       seconds=round(time.perf_counter() - started, 2))
+        return len(task_records), len(jobs)
+    
     def stop(self):
         """Stop the job scheduler system"""
         self.scheduler.stop()
-        print("Job Scheduler stopped")
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.worker_pool.stop()
+        for worker in self.type_workers:
+            worker.stop()
+        for worker in self.batch_workers:
+            worker.stop()
+        self.watchdog.stop()
+        if self.async_engine is not None:
+            self.async_engine.stop()
+        if self.process_backend is not None:
+            self.process_backend.shutdown(wait=False)
+        if self.journal is not None:
+            self.journal.close()
+        if self.task_management.cold_store is not None:
+            # Let the scheduler finish its pass before the store goes away
+            if self.scheduler.is_alive():
+                self.scheduler.join(timeout=1)
+            self.task_management.close()
+        if self.scheduler.overflow is not None:
+            if self.scheduler.is_alive():
+                self.scheduler.join(timeout=1)
+            self.scheduler.overflow.close()
+        event_log.info("app_stopped")
+        # Write out buffered events now rather than on the flusher's next pass
+        event_log.get_logger().flush()
@@ -0,0 +1,115 @@
+import threading
+
+# Log-linear buckets over integer microseconds, as in HdrHistogram: values
+# below SUB_BUCKETS get their own bucket, larger ones keep 7 significant bits,
+# so any recorded value is off by less than 1/64 (1.6%).
+SUB_BITS = 7
+SUB_BUCKETS = 1 << SUB_BITS
+HALF = SUB_BUCKETS // 2
+MAX_MICROS = (1 << 36) - 1  # ~19 hours; larger values are clamped
+NUM_BUCKETS = SUB_BUCKETS + (36 - SUB_BITS) * HALF
+
+def bucket_index(micros: int) -> int:
+    if micros < SUB_BUCKETS:
+        return micros if micros > 0 else 0
+    if micros > MAX_MICROS:
+        micros = MAX_MICROS
+    shift = micros.bit_length() - SUB_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF + (micros >> shift) - HALF
+
+def bucket_upper_bound(index: int) -> int:
+    """Largest microsecond value that lands in bucket `index`"""
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index - SUB_BUCKETS) // HALF + 1
+    top = (index - SUB_BUCKETS) % HALF + HALF
+    return ((top + 1) << shift) - 1
+
+class Histogram:
+    """Latency histogram with one bucket array per recording thread
+
+    record() only touches the calling thread's own array, so recording
+    needs no lock; snapshot() merges the arrays. Values are seconds.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def record(self, seconds: float):
+        counts = getattr(self._local, "counts", None)
+        if counts is None:
+            counts = self._new_shard()
+        micros = int(seconds * 1e6)
+        counts[bucket_index(micros)] += 1
+        # The last slot holds the sum, so count and sum stay in one array
+        counts[NUM_BUCKETS] += micros
+
+    def snapshot(self):
+        merged = [0] * (NUM_BUCKETS + 1)
+        with self._shards_lock:
+            shards = list(self._shards)
+        for counts in shards:
+            for i, count in enumerate(counts):
+                if count:
+                    merged[i] += count
+        return HistogramSnapshot(merged)
+
+    def _new_shard(self):
+        counts = [0] * (NUM_BUCKETS + 1)
+        with self._shards_lock:
+            self._shards.append(counts)
+        self._local.counts = counts
+        return counts
+
+class HistogramSnapshot:
+    """Merged, immutable view of a Histogram"""
+
+    def __init__(self, counts):
+        self._counts = counts
+        self.count = sum(counts[:NUM_BUCKETS])
+        self.sum = counts[NUM_BUCKETS] / 1e6
+
+    def percentile(self, p: float):
+        """Value in seconds below which `p` percent of the recorded values fall"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(self.count * p / 100 + 0.5))
+        seen = 0
+        for i in range(NUM_BUCKETS):
+            seen += self._counts[i]
+            if seen >= rank:
+                return bucket_upper_bound(i) / 1e6
+        return MAX_MICROS / 1e6
+
+    def max(self):
+        for i in range(NUM_BUCKETS - 1, -1, -1):
+            if self._counts[i]:
+                return bucket_upper_bound(i) / 1e6
+        return 0.0
+
+    def cumulative_counts(self, bounds):
+        """Counts at or below each bound in seconds (Prometheus `le` buckets)"""
+        result = []
+        seen = 0
+        i = 0
+        for bound in bounds:
+            limit = int(bound * 1e6)
+            while i < NUM_BUCKETS and bucket_upper_bound(i) <= limit:
+                seen += self._counts[i]
+                i += 1
+            result.append(seen)
+        return result
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max(),
+        }
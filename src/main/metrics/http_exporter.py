@@ -0,0 +1,56 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.main.config import event_log
+from src.main.metrics.registry import MetricsRegistry
+
+class MetricsHTTPServer(threading.Thread):
+    """Serves a MetricsRegistry over HTTP from a background thread
+
+    GET /metrics returns the Prometheus text format, GET /metrics.json the
+    snapshot() dict. Binds to localhost by default; port 0 picks a free
+    port, available as `port` once constructed.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 9464, host: str = "127.0.0.1"):
+        super().__init__(name="metrics-http")
+        self.daemon = True
+        self.registry = registry
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address[:2]
+
+    def run(self):
+        event_log.info("metrics_server_started", url=f"http://{self.host}:{self.port}/metrics")
+        self.server.serve_forever(poll_interval=0.5)
+
+    def stop(self):
+        if self.is_alive():
+            self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body = registry.to_prometheus().encode()
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body = json.dumps(registry.snapshot()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes every few seconds would flood stdout
+
+        return Handler
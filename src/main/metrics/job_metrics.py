@@ -0,0 +1,68 @@
+from src.main.config import clock
+from src.main.config.job_status import JobStatus
+from src.main.metrics.registry import MetricsRegistry
+
+class JobMetrics:
+    """JobListeners callback recording job latencies into a MetricsRegistry
+
+    Per JobType, when a job is picked:
+    - job_schedule_lag_seconds: Task.schedule_time (the job's run_time) to
+      job creation; first attempts only
+    - job_queue_wait_seconds: job creation to picked_by_worker, or run_time to
+      pick for retries
+    and when it finishes:
+    - job_execution_seconds: picked_by_worker to complete/fail, including
+      failed attempts that are retried
+    - jobs_total{status}: finished and cancelled jobs, for throughput, and
+      RETRIED for failed attempts sent back to the queue
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._by_type = {}  # job_type -> (lag, wait, execution) histograms
+        self._totals = {}   # (job_type, status) -> Counter
+
+    def __call__(self, job):
+        status = job.status
+        if status is JobStatus.IN_PROGRESS:
+            lag, wait, _ = self._histograms(job.job_type)
+            started_ns = job.started_ns
+            if job.attempt_count == 1:
+                created_ns = job.created_ns
+                lag.record(max(0.0, clock.to_epoch_seconds(created_ns) - job.run_time.timestamp()))
+                wait.record((started_ns - created_ns) / 1e9)
+            else:
+                wait.record(max(0.0, clock.to_epoch_seconds(started_ns) - job.run_time.timestamp()))
+        elif status is JobStatus.COMPLETED or status is JobStatus.FAILED:
+            if job.started_ns is not None and job.finished_ns is not None:
+                self._histograms(job.job_type)[2].record((job.finished_ns - job.started_ns) / 1e9)
+            self._total(job.job_type, status.name).inc()
+        elif status is JobStatus.CANCELLED:
+            self._total(job.job_type, "CANCELLED").inc()
+        elif status is JobStatus.IN_QUEUE and job.attempt_count > 1 and job.finished_ns is not None:
+            # RetryEngine re-queued a failed attempt without a FAILED notification
+            self._histograms(job.job_type)[2].record((job.finished_ns - job.started_ns) / 1e9)
+            self._total(job.job_type, "RETRIED").inc()
+
+    def _histograms(self, job_type):
+        histograms = self._by_type.get(job_type)
+        if histograms is None:
+            registry = self.registry
+            histograms = (
+                registry.histogram("job_schedule_lag_seconds",
+                                   "Task schedule_time to job creation", job_type=job_type),
+                registry.histogram("job_queue_wait_seconds",
+                                   "Job creation (or retry run_time) to pick by a worker", job_type=job_type),
+                registry.histogram("job_execution_seconds",
+                                   "Pick by a worker to completion or failure", job_type=job_type),
+            )
+            self._by_type[job_type] = histograms
+        return histograms
+
+    def _total(self, job_type, status):
+        counter = self._totals.get((job_type, status))
+        if counter is None:
+            counter = self.registry.counter("jobs_total", "Jobs finished, cancelled or retried",
+                                            job_type=job_type, status=status)
+            self._totals[(job_type, status)] = counter
+        return counter
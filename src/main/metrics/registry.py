@@ -0,0 +1,121 @@
+import threading
+from src.main.metrics.histogram import Histogram
+
+# Prometheus `le` bounds for latency histograms, in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+class Counter:
+    """Monotonic counter with one cell per recording thread (no lock on inc)"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells = []
+        self._cells_lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0]
+            with self._cells_lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+        cell[0] += amount
+
+    @property
+    def value(self):
+        with self._cells_lock:
+            return sum(cell[0] for cell in self._cells)
+
+class MetricsRegistry:
+    """Named, labelled counters, gauges and histograms
+
+    Counters and histograms are created on first use and cached by
+    (name, labels), so hot paths should keep the returned object. Gauges
+    are callbacks evaluated when metrics are read. snapshot() is the pull
+    API; to_prometheus() renders the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}  # name -> (kind, help, {labels: metric})
+
+    def counter(self, name: str, help_text: str = "", **labels):
+        return self._get(name, "counter", help_text, labels, Counter)
+
+    def histogram(self, name: str, help_text: str = "", **labels):
+        return self._get(name, "histogram", help_text, labels, Histogram)
+
+    def gauge(self, name: str, read, help_text: str = "", **labels):
+        """Register `read()` as the current value of a gauge"""
+        self._get(name, "gauge", help_text, labels, lambda: read)
+
+    def snapshot(self):
+        """{name: {labels-string: value}}; histograms give count/sum/percentiles"""
+        result = {}
+        for name, kind, _, series in self._series():
+            values = {}
+            for labels, metric in series:
+                key = _format_labels(labels) or ""
+                if kind == "counter":
+                    values[key] = metric.value
+                elif kind == "gauge":
+                    values[key] = _read_gauge(metric)
+                else:
+                    values[key] = metric.snapshot().summary()
+            result[name] = values
+        return result
+
+    def to_prometheus(self, buckets=DEFAULT_BUCKETS):
+        lines = []
+        for name, kind, help_text, series in self._series():
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in series:
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+                elif kind == "gauge":
+                    lines.append(f"{name}{_format_labels(labels)} {_read_gauge(metric)}")
+                else:
+                    snapshot = metric.snapshot()
+                    for bound, count in zip(buckets, snapshot.cumulative_counts(buckets)):
+                        lines.append(f"{name}_bucket{_format_labels(labels, le=repr(bound))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, le='+Inf')} {snapshot.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {snapshot.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {snapshot.count}")
+        return "\n".join(lines) + "\n"
+
+    def _get(self, name, kind, help_text, labels, factory):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            entry = self._metrics.get(name)
+            if entry is None:
+                entry = self._metrics[name] = (kind, help_text, {})
+            elif entry[0] != kind:
+                raise ValueError(f"metric {name} is already registered as a {entry[0]}")
+            series = entry[2]
+            metric = series.get(key)
+            if metric is None or kind == "gauge":
+                metric = series[key] = factory()
+            return metric
+
+    def _series(self):
+        with self._lock:
+            return [(name, kind, help_text, list(series.items()))
+                    for name, (kind, help_text, series) in sorted(self._metrics.items())]
+
+def _read_gauge(read):
+    try:
+        return read()
+    except Exception:
+        return float("nan")
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from src.main.config.job_status import JobStatus
+from src.main.config.misfire_policy import MisfirePolicy
+from src.main.config.overlap_policy import OverlapPolicy
+from src.main.job.job import Job
+from src.main.task.task import Task
+
+# Plain-dict encodings of tasks and jobs shared by the WAL and snapshots.
+# Datetimes are stored as POSIX timestamps; payloads must be picklable.
+
+def encode_time(value: datetime):
+    return value.timestamp() if value is not None else None
+
+def decode_time(value):
+    return datetime.fromtimestamp(value) if value is not None else None
+
+def task_to_record(task: Task):
+    return {
+        "id": task.id,
+        "name": task.name,
+        "job_type": task.job_type,
+        "schedule_time": encode_time(task.schedule_time),
+        "retry_policy": task.retry_policy,
+        "max_retries": task.max_retries,
+        "repeat_interval": task.repeat_interval.total_seconds() if task.repeat_interval else None,
+        "timeout": task.timeout,
+        "payload": task.payload,
+        "run_count": task.run_count,
+        "last_run_time": encode_time(task.last_run_time),
+        "cron": task.cron,
+        "misfire_policy": task.misfire_policy,
+        "priority": task.priority,
+        "overlap_policy": task.overlap_policy,
+    }
+
+def task_from_record(record):
+    repeat_interval = record["repeat_interval"]
+    task = Task(record["name"], record["job_type"], decode_time(record["schedule_time"]),
+                retry_policy=record["retry_policy"],
+                max_retries=record["max_retries"],
+                repeat_interval=timedelta(seconds=repeat_interval) if repeat_interval is not None else None,
+                timeout=record["timeout"],
+                payload=record["payload"],
+                task_id=record["id"],
+                cron=record.get("cron"),
+                misfire_policy=record.get("misfire_policy", MisfirePolicy.FIRE_ONCE),
+                priority=record.get("priority", 0),
+                overlap_policy=record.get("overlap_policy", OverlapPolicy.ALLOW))
+    task.run_count = record["run_count"]
+    task.last_run_time = decode_time(record["last_run_time"])
+    return task
+
+def job_to_record(job: Job):
+    return {
+        "id": job.id,
+        "task_id": job.task_id,
+        "job_type": job.job_type,
+        "priority": job.priority,
+        "run_time": encode_time(job.run_time),
+        "status": job.status.value,
+        "attempt_count": job.attempt_count,
+        "payload": job.payload,
+        "retry_policy": job.retry_policy,
+        "max_retries": job.max_retries,
+        "retry_delay": job.retry_delay,
+        "timeout": job.timeout,
+    }
+
+def job_from_record(record):
+    job = Job(record["task_id"], decode_time(record["run_time"]),
+              priority=record["priority"],
+              status=JobStatus(record["status"]),
+              job_type=record["job_type"],
+              payload=record["payload"],
+              job_id=record["id"],
+              retry_policy=record["retry_policy"],
+              max_retries=record["max_retries"],
+              timeout=record["timeout"])
+    job.attempt_count = record["attempt_count"]
+    job.retry_delay = record["retry_delay"]
+    return job
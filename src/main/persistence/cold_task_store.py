@@ -0,0 +1,137 @@
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from src.main.persistence.codec import encode_time, task_from_record, task_to_record
+
+class ColdTaskStore:
+    """On-disk, time-ordered index for tasks outside the in-memory horizon
+
+    Tasks are stored as pickled records in a SQLite table indexed by
+    schedule time, so memory use does not grow with the number of stored
+    tasks. The store is a spill area rather than a source of truth (the
+    write-ahead log is), so it is emptied when opened and written without
+    journaling or fsync.
+
+    Tasks read back from the store are fresh copies; changes to them must be
+    written back with put().
+    """
+
+    def __init__(self, path: str = None):
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="cold-tasks-", suffix=".sqlite")
+            os.close(fd)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("DROP TABLE IF EXISTS tasks")
+        # No declared type on id so both uuid strings and compact integer ids round-trip
+        self._db.execute("CREATE TABLE tasks (id PRIMARY KEY, schedule_time REAL NOT NULL, record BLOB NOT NULL)")
+        self._db.execute("CREATE INDEX tasks_by_time ON tasks (schedule_time, id)")
+        self._count = 0
+
+    def put(self, task):
+        """Insert or replace a task"""
+        self.put_many([task])
+
+    def put_many(self, tasks):
+        """Insert or replace tasks in one transaction; of repeated ids the last one wins"""
+        rows = {task.id: (task.id, encode_time(task.schedule_time),
+                          pickle.dumps(task_to_record(task), protocol=pickle.HIGHEST_PROTOCOL))
+                for task in tasks}
+
+        def work(db):
+            replaced = sum(db.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount for task_id in rows)
+            db.executemany("INSERT INTO tasks VALUES (?, ?, ?)", rows.values())
+            return replaced
+
+        with self._lock:
+            self._count += len(rows) - self._transaction(work)
+
+    def get(self, task_id):
+        with self._lock:
+            row = self._db.execute("SELECT record FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return task_from_record(pickle.loads(row[0])) if row else None
+
+    def remove(self, task_id):
+        """Delete a task; returns True if it was stored"""
+        with self._lock:
+            removed = self._db.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount
+            self._count -= removed
+        return removed > 0
+
+    def remove_many(self, task_ids):
+        """Delete tasks in one transaction; returns how many were stored"""
+        with self._lock:
+            if not self._count:
+                return 0
+            removed = self._transaction(lambda db: db.executemany(
+                "DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids]).rowcount)
+            self._count -= removed
+        return removed
+
+    def take_due(self, until: datetime, limit: int):
+        """Remove and return up to `limit` tasks due at or before `until`, earliest first"""
+        def work(db):
+            rows = db.execute(
+                "SELECT id, record FROM tasks WHERE schedule_time <= ? ORDER BY schedule_time, id LIMIT ?",
+                (until.timestamp(), limit)).fetchall()
+            db.executemany("DELETE FROM tasks WHERE id = ?", [(row[0],) for row in rows])
+            return rows
+
+        with self._lock:
+            rows = self._transaction(work)
+            self._count -= len(rows)
+        return [task_from_record(pickle.loads(row[1])) for row in rows]
+
+    def next_schedule_time(self):
+        """Earliest schedule time in the store, or None when empty"""
+        with self._lock:
+            row = self._db.execute("SELECT MIN(schedule_time) FROM tasks").fetchone()
+        return datetime.fromtimestamp(row[0]) if row[0] is not None else None
+
+    def iter_tasks(self, chunk_size: int = 10_000):
+        """All stored tasks in time order, read in chunks without holding the lock between them"""
+        cursor = (float("-inf"), None)
+        while True:
+            with self._lock:
+                if cursor[1] is None:
+                    rows = self._db.execute(
+                        "SELECT schedule_time, id, record FROM tasks ORDER BY schedule_time, id LIMIT ?",
+                        (chunk_size,)).fetchall()
+                else:
+                    rows = self._db.execute(
+                        "SELECT schedule_time, id, record FROM tasks WHERE (schedule_time, id) > (?, ?) "
+                        "ORDER BY schedule_time, id LIMIT ?", (*cursor, chunk_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield task_from_record(pickle.loads(row[2]))
+            cursor = (rows[-1][0], rows[-1][1])
+
+    def _transaction(self, work):
+        """Run work(db) in one transaction; the caller holds the lock"""
+        self._db.execute("BEGIN")
+        try:
+            result = work(self._db)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            # Without a journal a rollback may not undo what already ran, so count again
+            self._count = self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            raise
+        self._db.execute("COMMIT")
+        return result
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+        if self._owns_file:
+            os.remove(self.path)
+
+    def __len__(self):
+        return self._count
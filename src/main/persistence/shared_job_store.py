@@ -0,0 +1,328 @@
+import math
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from src.main.config.ids import new_id
+from src.main.config.job_status import JobStatus
+from src.main.config.misfire_policy import MisfirePolicy
+from src.main.config.overlap_policy import OverlapPolicy
+from src.main.job.job import Job
+from src.main.task.task import Task
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS nodes (node_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS partitions (
+    partition INTEGER PRIMARY KEY, owner TEXT, lease_expires REAL NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS tasks (
+    id PRIMARY KEY, partition INTEGER NOT NULL, name TEXT, job_type TEXT,
+    schedule_time REAL NOT NULL, repeat_interval REAL, retry_policy TEXT, max_retries INTEGER,
+    timeout REAL, payload BLOB, run_count INTEGER NOT NULL DEFAULT 0, last_run_time REAL,
+    priority INTEGER NOT NULL DEFAULT 0);
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks (partition, schedule_time);
+CREATE TABLE IF NOT EXISTS jobs (
+    id PRIMARY KEY, task_id, job_type TEXT, run_time REAL NOT NULL, priority INTEGER NOT NULL,
+    status TEXT NOT NULL, attempt_count INTEGER NOT NULL, retry_policy TEXT, max_retries INTEGER,
+    retry_delay REAL, timeout REAL, payload BLOB, lease_owner TEXT, lease_expires REAL,
+    error TEXT, finished_at REAL,
+    UNIQUE (task_id, run_time));
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority, run_time);
+CREATE INDEX IF NOT EXISTS jobs_leases ON jobs (status, lease_expires);
+"""
+
+def _dumps(payload):
+    return pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL) if payload is not None else None
+
+def _loads(blob):
+    return pickle.loads(blob) if blob is not None else None
+
+class SharedJobStore:
+    """SQLite-backed task and job store shared by several scheduler processes
+
+    Every write that has to be exclusive runs in a BEGIN IMMEDIATE
+    transaction, so SQLite's single write lock serializes it across
+    processes. Jobs are claimed with a lease (owner + expiry) that the
+    owner renews by heartbeat; expired leases are handed back to the queue
+    by whichever node reaps first. Completion is fenced on the lease owner,
+    so a node that lost its lease cannot overwrite the new owner's result.
+
+    Tasks are spread over a fixed number of partitions. A node only turns
+    due tasks into jobs for partitions it holds a lease on, and
+    UNIQUE(task_id, run_time) rejects a duplicate job for the same run even
+    if two nodes ever raced on a partition.
+
+    One connection is opened per thread; times are POSIX timestamps.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 10.0, num_partitions: int = 64):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        self._immediate(lambda db: self._init_schema(db, num_partitions))
+        self.num_partitions = db.execute("SELECT value FROM meta WHERE key = 'partitions'").fetchone()[0]
+
+    # ---- tasks ---------------------------------------------------------
+
+    def add_task(self, task: Task):
+        if task.cron is not None:
+            raise ValueError("cron tasks are not supported by the shared job store")
+        if task.overlap_policy != OverlapPolicy.ALLOW:
+            raise ValueError("overlap policies are not supported by the shared job store")
+        if task.misfire_policy != MisfirePolicy.FIRE_ONCE:
+            # Missed runs of a recurring task always collapse into one here
+            raise ValueError("misfire policies other than FIRE_ONCE are not supported by the shared job store")
+        row = (task.id, self._partition_of(task.id), task.name, task.job_type,
+               task.schedule_time.timestamp(),
+               task.repeat_interval.total_seconds() if task.repeat_interval else None,
+               task.retry_policy, task.max_retries, task.timeout, _dumps(task.payload),
+               task.run_count, task.last_run_time.timestamp() if task.last_run_time else None,
+               task.priority)
+        self._immediate(lambda db: db.execute(
+            "INSERT OR REPLACE INTO tasks (id, partition, name, job_type, schedule_time, repeat_interval, "
+            "retry_policy, max_retries, timeout, payload, run_count, last_run_time, priority) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row))
+
+    def remove_task(self, task_id):
+        """Delete a task and cancel its queued jobs; returns True if it existed"""
+        def remove(db):
+            db.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE task_id = ? AND status = ?",
+                       (JobStatus.CANCELLED.value, time.time(), task_id, JobStatus.IN_QUEUE.value))
+            return db.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+        return self._immediate(remove)
+
+    def count_tasks(self):
+        return self._db().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    # ---- partitions ----------------------------------------------------
+
+    def heartbeat(self, node_id: str):
+        """Renew this node's liveness, its partition leases and its job leases"""
+        now = time.time()
+        expires = now + self.lease_seconds
+
+        def renew(db):
+            db.execute("INSERT OR REPLACE INTO nodes VALUES (?, ?)", (node_id, now))
+            db.execute("UPDATE partitions SET lease_expires = ? WHERE owner = ?", (expires, node_id))
+            db.execute("UPDATE jobs SET lease_expires = ? WHERE lease_owner = ? AND status = ?",
+                       (expires, node_id, JobStatus.IN_PROGRESS.value))
+        self._immediate(renew)
+
+    def balance_partitions(self, node_id: str):
+        """Hold a fair share of partitions among live nodes; returns the ones held"""
+        now = time.time()
+
+        def balance(db):
+            live = db.execute("SELECT COUNT(*) FROM nodes WHERE heartbeat > ?",
+                              (now - self.lease_seconds,)).fetchone()[0]
+            fair_share = math.ceil(self.num_partitions / max(live, 1))
+            held = [row[0] for row in db.execute(
+                "SELECT partition FROM partitions WHERE owner = ? AND lease_expires > ? ORDER BY partition",
+                (node_id, now))]
+            if len(held) > fair_share:
+                released = held[fair_share:]
+                db.executemany("UPDATE partitions SET owner = NULL, lease_expires = 0 WHERE partition = ?",
+                               [(p,) for p in released])
+                held = held[:fair_share]
+            elif len(held) < fair_share:
+                free = [row[0] for row in db.execute(
+                    "SELECT partition FROM partitions WHERE owner IS NULL OR lease_expires <= ? "
+                    "ORDER BY partition LIMIT ?", (now, fair_share - len(held)))]
+                db.executemany("UPDATE partitions SET owner = ?, lease_expires = ? WHERE partition = ?",
+                               [(node_id, now + self.lease_seconds, p) for p in free])
+                held += free
+            return held
+        return self._immediate(balance)
+
+    # ---- scheduling tick -------------------------------------------------
+
+    def materialize_due_tasks(self, node_id: str, limit: int = 1000):
+        """Create jobs for due tasks in this node's partitions; returns the new jobs
+
+        Recurring tasks are moved to their next run in the same transaction,
+        and non-recurring ones are deleted, so a task is materialized once
+        per schedule time. The next run stays on the task's interval grid;
+        runs missed while no node owned the partition collapse into one.
+        """
+        now = time.time()
+
+        def materialize(db):
+            rows = db.execute(
+                "SELECT t.id, t.job_type, t.schedule_time, t.repeat_interval, t.retry_policy, "
+                "t.max_retries, t.timeout, t.payload, t.priority FROM tasks t JOIN partitions p "
+                "ON p.partition = t.partition AND p.owner = ? AND p.lease_expires > ? "
+                "WHERE t.schedule_time <= ? ORDER BY t.schedule_time LIMIT ?",
+                (node_id, now, now, limit)).fetchall()
+            jobs = []
+            for (task_id, job_type, schedule_time, repeat, retry_policy, max_retries, timeout, payload,
+                 priority) in rows:
+                job_id = new_id()
+                inserted = db.execute(
+                    "INSERT OR IGNORE INTO jobs (id, task_id, job_type, run_time, priority, status, "
+                    "attempt_count, retry_policy, max_retries, retry_delay, timeout, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, 0, ?, ?)",
+                    (job_id, task_id, job_type, schedule_time, priority, JobStatus.IN_QUEUE.value,
+                     retry_policy, max_retries, timeout, payload)).rowcount
+                if repeat is not None:
+                    next_time = schedule_time + (math.floor((now - schedule_time) / repeat) + 1) * repeat
+                    db.execute("UPDATE tasks SET schedule_time = ?, run_count = run_count + 1, "
+                               "last_run_time = ? WHERE id = ?", (next_time, now, task_id))
+                else:
+                    db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                if inserted:
+                    jobs.append(self._job(job_id, task_id, job_type, schedule_time, priority,
+                                          JobStatus.IN_QUEUE.value, 1, retry_policy, max_retries,
+                                          0.0, timeout, payload))
+            return jobs
+        return self._immediate(materialize)
+
+    def reap_expired_leases(self):
+        """Take back jobs whose owner stopped heartbeating; returns (requeued, failed)
+
+        A lost lease counts as a failed attempt, so a job that keeps taking
+        its node down fails once its retries are used up instead of being
+        picked up by every node in turn.
+        """
+        now = time.time()
+
+        def reap(db):
+            failed = db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires = NULL "
+                "WHERE status = ? AND lease_expires <= ? AND attempt_count > COALESCE(max_retries, 0)",
+                (JobStatus.FAILED.value, "lease expired", now, JobStatus.IN_PROGRESS.value, now)).rowcount
+            requeued = db.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, "
+                "attempt_count = attempt_count + 1 WHERE status = ? AND lease_expires <= ?",
+                (JobStatus.IN_QUEUE.value, JobStatus.IN_PROGRESS.value, now)).rowcount
+            return requeued, failed
+        return self._immediate(reap)
+
+    def next_due_time(self, node_id: str):
+        """Earliest task or job time this node may act on, as a datetime, or None"""
+        db = self._db()
+        task_time = db.execute(
+            "SELECT MIN(t.schedule_time) FROM tasks t JOIN partitions p "
+            "ON p.partition = t.partition AND p.owner = ?", (node_id,)).fetchone()[0]
+        job_time = db.execute("SELECT MIN(run_time) FROM jobs WHERE status = ?",
+                              (JobStatus.IN_QUEUE.value,)).fetchone()[0]
+        times = [t for t in (task_time, job_time) if t is not None]
+        return datetime.fromtimestamp(min(times)) if times else None
+
+    # ---- jobs ----------------------------------------------------------
+
+    def claim_jobs(self, node_id: str, limit: int):
+        """Lease up to `limit` due jobs to this node, best priority first"""
+        now = time.time()
+
+        def claim(db):
+            rows = db.execute(
+                "SELECT id, task_id, job_type, run_time, priority, status, attempt_count, retry_policy, "
+                "max_retries, retry_delay, timeout, payload FROM jobs WHERE status = ? AND run_time <= ? "
+                "ORDER BY priority, run_time LIMIT ?", (JobStatus.IN_QUEUE.value, now, limit)).fetchall()
+            if rows:
+                db.executemany(
+                    "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ? WHERE id = ?",
+                    [(JobStatus.IN_PROGRESS.value, node_id, now + self.lease_seconds, row[0]) for row in rows])
+            return rows
+        jobs = []
+        for row in self._immediate(claim):
+            job = self._job(*row)
+            job.picked_by_worker(JobStatus.IN_PROGRESS, node_id)
+            jobs.append(job)
+        return jobs
+
+    def finish_jobs(self, node_id: str, jobs):
+        """Record terminal or retried states; returns the jobs whose lease was still held
+
+        A job back in IN_QUEUE (a retry) is stored with its new run_time and
+        attempt_count and released for any node to claim.
+        """
+        now = time.time()
+
+        def finish(db):
+            kept = []
+            for job in jobs:
+                status = job.status.value
+                if status == JobStatus.IN_QUEUE.value:
+                    updated = db.execute(
+                        "UPDATE jobs SET status = ?, run_time = ?, attempt_count = ?, retry_delay = ?, "
+                        "error = ?, lease_owner = NULL, lease_expires = NULL "
+                        "WHERE id = ? AND lease_owner = ? AND status = ?",
+                        (status, job.run_time.timestamp(), job.attempt_count, job.retry_delay,
+                         repr(job.error) if job.error else None, job.id, node_id,
+                         JobStatus.IN_PROGRESS.value)).rowcount
+                else:
+                    updated = db.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires = NULL "
+                        "WHERE id = ? AND lease_owner = ? AND status = ?",
+                        (status, repr(job.error) if job.error else None, now, job.id, node_id,
+                         JobStatus.IN_PROGRESS.value)).rowcount
+                if updated:
+                    kept.append(job)
+            return kept
+        return self._immediate(finish)
+
+    def count_jobs(self, status: JobStatus = None):
+        db = self._db()
+        if status is None:
+            return db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status.value,)).fetchone()[0]
+
+    def close(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    # ---- helpers -------------------------------------------------------
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _immediate(self, work):
+        """Run work(db) in a BEGIN IMMEDIATE transaction (takes the write lock up front)"""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(db)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return result
+
+    @staticmethod
+    def _init_schema(db, num_partitions):
+        for statement in _SCHEMA.split(";"):
+            if statement.strip():
+                db.execute(statement)
+        # Stores created before tasks had a priority
+        if "priority" not in [row[1] for row in db.execute("PRAGMA table_info(tasks)")]:
+            db.execute("ALTER TABLE tasks ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+        db.execute("INSERT OR IGNORE INTO meta VALUES ('partitions', ?)", (num_partitions,))
+        count = db.execute("SELECT value FROM meta WHERE key = 'partitions'").fetchone()[0]
+        db.executemany("INSERT OR IGNORE INTO partitions (partition) VALUES (?)",
+                       [(p,) for p in range(count)])
+
+    def _partition_of(self, task_id):
+        # Stable across processes, unlike hash() on strings
+        return zlib.crc32(str(task_id).encode()) % self.num_partitions
+
+    @staticmethod
+    def _job(job_id, task_id, job_type, run_time, priority, status, attempt_count, retry_policy,
+             max_retries, retry_delay, timeout, payload):
+        job = Job(task_id, datetime.fromtimestamp(run_time), priority=priority, status=JobStatus(status),
+                  job_type=job_type, payload=_loads(payload), job_id=job_id,
+                  retry_policy=retry_policy, max_retries=max_retries, timeout=timeout)
+        job.attempt_count = attempt_count
+        job.retry_delay = retry_delay
+        return job
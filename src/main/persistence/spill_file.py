@@ -0,0 +1,129 @@
+import os
+import pickle
+import tempfile
+import threading
+from src.main.config.job_status import JobStatus
+from src.main.persistence.codec import job_from_record, job_to_record
+
+class SpillFile:
+    """Append-only overflow file for queued jobs, read back in the order written
+
+    Each append() writes one pickled batch of job records; read_batch()
+    returns the oldest unread batch. Like the cold task store it is a spill
+    area rather than a source of truth (the write-ahead log is), so it is
+    emptied when opened and never synced. Once every batch has been read
+    back the file is truncated, so it only takes disk space while the
+    overflow lasts.
+
+    Spilled jobs stay cancellable: an in-memory index of job id -> task id
+    and batch offset lets cancel() and cancel_task() read back just the
+    batches holding them, and read_batch() skips the ones cancelled.
+    """
+
+    def __init__(self, path: str = None):
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="job-spill-", suffix=".bin")
+            os.close(fd)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "w+b")
+        self._read_offset = 0
+        self._batches = 0
+        self._index = {}    # job id -> (task id, batch offset)
+        self._by_task = {}  # task id -> spilled job ids
+
+    def append(self, jobs):
+        """Write `jobs` as one batch; returns how many were written
+
+        Raises, with nothing written, if a job cannot be pickled or the
+        write fails.
+        """
+        records = [job_to_record(job) for job in jobs]
+        if not records:
+            return 0
+        # Pickled up front, so a payload that cannot be pickled leaves the file untouched
+        blob = pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            offset = self._file.seek(0, os.SEEK_END)
+            try:
+                self._file.write(blob)
+                self._file.flush()
+            except BaseException:
+                self._file.truncate(offset)
+                raise
+            self._batches += 1
+            for record in records:
+                self._index[record["id"]] = (record["task_id"], offset)
+                self._by_task.setdefault(record["task_id"], set()).add(record["id"])
+        return len(records)
+
+    def read_batch(self):
+        """Remove and return the oldest batch as fresh Jobs ([] when empty)"""
+        with self._lock:
+            if not self._batches:
+                return []
+            self._file.seek(self._read_offset)
+            records = [record for record in pickle.load(self._file) if self._unindex(record["id"])]
+            self._read_offset = self._file.tell()
+            self._batches -= 1
+            if not self._batches:
+                self._reset()
+        return [job_from_record(record) for record in records]
+
+    def cancel(self, job_id: str):
+        """Remove a spilled job; returns it CANCELLED, or None if it is not spilled"""
+        jobs = self._cancel([job_id])
+        return jobs[0] if jobs else None
+
+    def cancel_task(self, task_id: str):
+        """Cancel every spilled job created for `task_id`"""
+        with self._lock:
+            job_ids = list(self._by_task.get(task_id, ()))
+        return self._cancel(job_ids)
+
+    def _cancel(self, job_ids):
+        with self._lock:
+            offsets = {}
+            for job_id in job_ids:
+                entry = self._index.get(job_id)
+                if entry is not None:
+                    offsets.setdefault(entry[1], set()).add(job_id)
+            records = []
+            for offset, ids in offsets.items():
+                self._file.seek(offset)
+                records.extend(record for record in pickle.load(self._file) if record["id"] in ids)
+            for record in records:
+                self._unindex(record["id"])
+            if not self._index:
+                # Only cancelled jobs are left on disk
+                self._batches = 0
+                self._reset()
+        jobs = [job_from_record(record) for record in records]
+        for job in jobs:
+            job.job_update(JobStatus.CANCELLED, False)
+        return jobs
+
+    def _unindex(self, job_id):
+        """Drop `job_id` from the index; False if it was cancelled already"""
+        entry = self._index.pop(job_id, None)
+        if entry is None:
+            return False
+        ids = self._by_task[entry[0]]
+        ids.discard(job_id)
+        if not ids:
+            del self._by_task[entry[0]]
+        return True
+
+    def _reset(self):
+        self._file.truncate(0)
+        self._read_offset = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        if self._owns_file:
+            os.remove(self.path)
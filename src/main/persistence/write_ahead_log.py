@@ -0,0 +1,282 @@
+import glob
+import itertools
+import os
+import pickle
+import re
+import threading
+import time
+from src.main.config import event_log
+from src.main.config.job_status import JobStatus
+from src.main.persistence.codec import encode_time, job_to_record, task_to_record
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value}
+_SEGMENT_RE = re.compile(r"wal-(\d+)\.log$")
+
+class WriteAheadLog:
+    """Append-only log of task changes and job state transitions
+
+    Records are plain dicts. Callers append without blocking; a flusher
+    thread pickles everything appended so far into one frame, writes and
+    fsyncs it in one go (group commit), and sync() waits until the caller's
+    records are durable, so concurrent callers share each fsync. A torn
+    final frame left by a crash is ignored on recovery.
+
+    The log is split into segments. Once `snapshot_every` records have been
+    appended since the last snapshot, a checkpoint thread starts a new
+    segment, writes a snapshot of the tasks returned by `snapshot_source`
+    plus all unfinished jobs, and deletes the segments the snapshot covers.
+    Replay is idempotent, so records that land in both the snapshot and the
+    newer segments are harmless.
+    """
+
+    SNAPSHOT_NAME = "snapshot.pickle"
+    SNAPSHOT_CHUNK = 10_000
+
+    def __init__(self, directory: str, group_commit_interval: float = 0.001,
+                 fsync: bool = True, snapshot_every: int = 100_000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.group_commit_interval = group_commit_interval
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every
+        self.snapshot_source = None  # callable returning the tasks to snapshot
+
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._buffer = []
+        self._appended_seq = 0
+        self._durable_seq = 0
+        self._records_since_snapshot = 0
+        self._open_jobs = {}
+        self._closed = False
+
+        segments = self._segments()
+        self._segment = (segments[-1][0] if segments else 0) + 1
+        self._file = open(self._segment_path(self._segment), "ab")
+
+        self._checkpoint_requested = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+        self._checkpointer = threading.Thread(target=self._checkpoint_loop, name="wal-checkpoint", daemon=True)
+        self._flusher.start()
+        self._checkpointer.start()
+
+    # ---- writing -------------------------------------------------------
+
+    def log_task_add(self, task):
+        self._append({"op": "task_add", "task": task_to_record(task)})
+
+    def log_task_remove(self, task_id):
+        self._append({"op": "task_remove", "id": task_id})
+
+    def log_task_reschedule(self, task):
+        self._append({"op": "task_reschedule", "id": task.id,
+                      "schedule_time": encode_time(task.schedule_time),
+                      "run_count": task.run_count,
+                      "last_run_time": encode_time(task.last_run_time)})
+
+    def log_job(self, job):
+        """JobListeners callback: record the job's current state"""
+        status = job.status.value
+        if status == JobStatus.IN_QUEUE.value:
+            record = job_to_record(job)
+            self._open_jobs[job.id] = record
+            self._append({"op": "job", "job": record})
+            return
+        if status in TERMINAL_STATUSES:
+            self._open_jobs.pop(job.id, None)
+        else:
+            open_record = self._open_jobs.get(job.id)
+            if open_record is not None:
+                open_record["status"] = status
+        self._append({"op": "job_status", "id": job.id, "status": status,
+                      "attempt_count": job.attempt_count})
+
+    def sync(self):
+        """Block until every record appended so far is durable"""
+        with self._cond:
+            target = self._appended_seq
+            while self._durable_seq < target and not self._closed:
+                self._cond.wait()
+
+    def close(self):
+        self.sync()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._checkpoint_requested.set()
+        self._flusher.join()
+        with self._io_lock:
+            self._file.close()
+
+    def _append(self, record):
+        with self._cond:
+            self._buffer.append(record)
+            self._appended_seq += 1
+            self._records_since_snapshot += 1
+            if len(self._buffer) == 1:
+                self._cond.notify_all()
+            if self._records_since_snapshot >= self.snapshot_every and self.snapshot_source:
+                self._records_since_snapshot = 0
+                self._checkpoint_requested.set()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer and self._closed:
+                    return
+            # Give concurrent appenders a moment to join this commit
+            if self.group_commit_interval:
+                time.sleep(self.group_commit_interval)
+            self._write_buffer()
+
+    def _write_buffer(self):
+        with self._io_lock:
+            with self._cond:
+                records, self._buffer = self._buffer, []
+                seq = self._appended_seq
+            if records:
+                self._file.write(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+        with self._cond:
+            self._durable_seq = max(self._durable_seq, seq)
+            self._cond.notify_all()
+
+    # ---- snapshots -----------------------------------------------------
+
+    def checkpoint(self, snapshot_source=None):
+        """Snapshot tasks plus unfinished jobs and drop the segments it covers
+
+        Tasks are read only after the new segment is started, so every
+        change in an older segment is already reflected in the snapshot.
+        """
+        next_segment = self._rotate()
+        tasks = iter((snapshot_source or self.snapshot_source)())
+        path = os.path.join(self.directory, self.SNAPSHOT_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as snapshot:
+            pickle.dump([{"op": "snapshot", "next_segment": next_segment}], snapshot)
+            # Stream the source in chunks so a large task set is never fully materialized
+            while True:
+                chunk = [{"op": "task_add", "task": task_to_record(task)}
+                         for task in itertools.islice(tasks, self.SNAPSHOT_CHUNK)]
+                if not chunk:
+                    break
+                pickle.dump(chunk, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._cond:
+                open_jobs = list(self._open_jobs.values())
+            pickle.dump([{"op": "job", "job": record} for record in open_jobs], snapshot,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, path)
+        for segment, segment_path in self._segments():
+            if segment < next_segment:
+                os.remove(segment_path)
+
+    def _checkpoint_loop(self):
+        while True:
+            self._checkpoint_requested.wait()
+            self._checkpoint_requested.clear()
+            if self._closed:
+                return
+            try:
+                self.checkpoint()
+            except Exception as e:
+                event_log.error("checkpoint_failed", error=e)
+
+    def _rotate(self):
+        """Flush the current segment and continue in a new one; returns its number"""
+        with self._io_lock:
+            with self._cond:
+                records, self._buffer = self._buffer, []
+                seq = self._appended_seq
+            if records:
+                self._file.write(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._segment += 1
+            self._file = open(self._segment_path(self._segment), "ab")
+            segment = self._segment
+        with self._cond:
+            self._durable_seq = max(self._durable_seq, seq)
+            self._cond.notify_all()
+        return segment
+
+    # ---- recovery ------------------------------------------------------
+
+    def recover(self):
+        """Replay snapshot and log; returns (task records, unfinished job records)
+
+        Both are dicts keyed by id. The recovered jobs also seed the set of
+        open jobs carried into the next snapshot.
+        """
+        tasks = {}
+        jobs = {}
+        next_segment = 1
+        snapshot_path = os.path.join(self.directory, self.SNAPSHOT_NAME)
+        if os.path.exists(snapshot_path):
+            for record in self._read_records(snapshot_path):
+                if record["op"] == "snapshot":
+                    next_segment = record["next_segment"]
+                else:
+                    self._apply(record, tasks, jobs)
+        for segment, segment_path in self._segments():
+            if next_segment <= segment < self._segment:
+                for record in self._read_records(segment_path):
+                    self._apply(record, tasks, jobs)
+        with self._cond:
+            self._open_jobs.update(jobs)
+        return tasks, jobs
+
+    @staticmethod
+    def _apply(record, tasks, jobs):
+        op = record["op"]
+        if op == "task_add":
+            task = record["task"]
+            tasks[task["id"]] = task
+        elif op == "task_remove":
+            tasks.pop(record["id"], None)
+        elif op == "task_reschedule":
+            task = tasks.get(record["id"])
+            if task is not None:
+                task["schedule_time"] = record["schedule_time"]
+                task["run_count"] = record["run_count"]
+                task["last_run_time"] = record["last_run_time"]
+        elif op == "job":
+            job = record["job"]
+            jobs[job["id"]] = job
+        elif op == "job_status":
+            if record["status"] in TERMINAL_STATUSES:
+                jobs.pop(record["id"], None)
+            elif record["id"] in jobs:
+                jobs[record["id"]]["status"] = record["status"]
+                jobs[record["id"]]["attempt_count"] = record["attempt_count"]
+
+    @staticmethod
+    def _read_records(path):
+        with open(path, "rb") as log:
+            while True:
+                try:
+                    frame = pickle.load(log)
+                except EOFError:
+                    return
+                except (pickle.UnpicklingError, ValueError, IndexError):
+                    # A torn final frame from a crash mid-write
+                    return
+                yield from frame
+
+    def _segments(self):
+        segments = []
+        for path in glob.glob(os.path.join(self.directory, "wal-*.log")):
+            match = _SEGMENT_RE.search(path)
+            if match:
+                segments.append((int(match.group(1)), path))
+        return sorted(segments)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"wal-{segment:08d}.log")
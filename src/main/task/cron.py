@@ -0,0 +1,123 @@
+import bisect
+import calendar
+import functools
+from datetime import datetime, timedelta
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+MONTH_NAMES = {name.upper(): i for i, name in enumerate(calendar.month_abbr) if name}
+DAY_NAMES = {name: i for i, name in enumerate(("SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"))}
+
+class CronSchedule:
+    """A five-field cron expression compiled into sorted tables of allowed values
+
+    Fields are minute, hour, day of month, month and day of week (0 or 7 is
+    Sunday), each `*`, a value, a range `a-b`, a step `*/n` or `a-b/n`, or a
+    comma-separated list of those; months and weekdays also accept names.
+    As in cron, when both day fields are restricted a day matches either.
+
+    next_after() jumps field by field to the next allowed value with bisect,
+    so finding the next fire costs a few table lookups rather than stepping
+    through minutes. Datetimes are naive local time, like the rest of the
+    scheduler.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        self.minutes = _parse_field(fields[0], 0, 59, {})
+        self.hours = _parse_field(fields[1], 0, 23, {})
+        self.days = _parse_field(fields[2], 1, 31, {})
+        self.months = _parse_field(fields[3], 1, 12, MONTH_NAMES)
+        weekdays = _parse_field(fields[4], 0, 7, DAY_NAMES)
+        self.weekdays = tuple(sorted({day % 7 for day in weekdays}))
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+        # datetime.weekday() counts from Monday; cron counts from Sunday
+        self._weekday_set = frozenset((day - 1) % 7 for day in self.weekdays)
+        self._day_set = frozenset(self.days)
+        if self._any_weekday and not any(min(self.days) <= _max_days(month) for month in self.months):
+            raise ValueError(f"cron expression never fires: {expression!r}")
+
+    def next_after(self, after: datetime) -> datetime:
+        """First fire time strictly after `after`"""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Each pass either returns or moves t forward to the start of a later unit
+        for _ in range(1000):
+            i = bisect.bisect_left(self.months, t.month)
+            if i == len(self.months):
+                t = datetime(t.year + 1, self.months[0], 1)
+                continue
+            if self.months[i] != t.month:
+                t = datetime(t.year, self.months[i], 1)
+                continue
+            if not self._day_matches(t):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            i = bisect.bisect_left(self.hours, t.hour)
+            if i == len(self.hours):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            if self.hours[i] != t.hour:
+                t = t.replace(hour=self.hours[i], minute=0)
+            i = bisect.bisect_left(self.minutes, t.minute)
+            if i == len(self.minutes):
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=self.minutes[i])
+        raise ValueError(f"no fire time found for {self.expression!r} after {after}")
+
+    def _day_matches(self, t: datetime):
+        day_ok = t.day in self._day_set
+        weekday_ok = t.weekday() in self._weekday_set
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
+
+@functools.lru_cache(maxsize=1024)
+def compile_cron(expression: str) -> CronSchedule:
+    """Compiled schedule for `expression`, shared by every task that uses it"""
+    return CronSchedule(expression)
+
+def _parse_field(text, low, high, names):
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"cron step must be positive: {text!r}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _value(start_text, names), _value(end_text, names)
+        else:
+            start = _value(part, names)
+            end = high if step > 1 else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"cron field {text!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return tuple(sorted(values))
+
+def _value(text, names):
+    upper = text.upper()
+    return names[upper] if upper in names else int(text)
+
+def _max_days(month):
+    return 29 if month == 2 else calendar.monthrange(2001, month)[1]
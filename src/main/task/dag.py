@@ -0,0 +1,91 @@
+from src.main.config.retry_policy import RetryPolicy
+
+class DagNode:
+    __slots__ = ('name', 'job_type', 'payload', 'upstream', 'downstream', 'estimate',
+                 'retry_policy', 'max_retries', 'timeout')
+
+    def __init__(self, name, job_type, payload, upstream, estimate, retry_policy, max_retries, timeout):
+        self.name = name
+        self.job_type = job_type
+        self.payload = payload
+        self.upstream = upstream
+        self.downstream = []
+        self.estimate = estimate
+        self.retry_policy = retry_policy
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+class Dag:
+    """Named steps with dependencies, started as a whole with JobSchedulerApp.run_dag
+
+    Steps are added after the steps they depend on, so the insertion order
+    is a topological order and a cycle cannot be declared. `estimate` is a
+    step's expected run time in seconds; it only matters relative to the
+    other steps, for critical-path priorities.
+    """
+
+    def __init__(self, name: str, priority: int = 0):
+        self.name = name
+        self.priority = priority  # Job priority of the steps on the critical path
+        self.nodes = {}
+
+    def add(self, name: str, job_type: str, payload=None, after=(), estimate: float = 1.0,
+            retry_policy: str = RetryPolicy.FIXED_DELAY, max_retries: int = 0, timeout: float = None):
+        """Add a step that runs once every step named in `after` has completed; returns `name`"""
+        if name in self.nodes:
+            raise ValueError(f"duplicate DAG step {name!r}")
+        after = [after] if isinstance(after, str) else list(after)
+        for upstream in after:
+            if upstream not in self.nodes:
+                raise ValueError(f"DAG step {name!r} depends on unknown step {upstream!r}")
+        node = DagNode(name, job_type, payload, after, estimate, retry_policy, max_retries, timeout)
+        self.nodes[name] = node
+        for upstream in after:
+            self.nodes[upstream].downstream.append(name)
+        return name
+
+    def roots(self):
+        return [name for name, node in self.nodes.items() if not node.upstream]
+
+    def bottom_levels(self):
+        """Longest estimated time from the start of each step to the end of the DAG"""
+        levels = {}
+        for name in reversed(list(self.nodes)):
+            node = self.nodes[name]
+            levels[name] = node.estimate + max((levels[child] for child in node.downstream), default=0.0)
+        return levels
+
+    def critical_path(self):
+        """Steps on the longest estimated chain, in order"""
+        levels = self.bottom_levels()
+        path = []
+        candidates = self.roots()
+        while candidates:
+            name = max(candidates, key=levels.__getitem__)
+            path.append(name)
+            candidates = self.nodes[name].downstream
+        return path
+
+    def priorities(self):
+        """Job priority per step: steps with longer remaining chains go first
+
+        Distinct bottom levels are ranked densely from self.priority, so the
+        critical path gets self.priority and shorter chains count upwards.
+        """
+        levels = self.bottom_levels()
+        ranks = {level: rank for rank, level in enumerate(sorted(set(levels.values()), reverse=True))}
+        return {name: self.priority + ranks[level] for name, level in levels.items()}
+
+    def descendants(self, names):
+        """`names` and every step downstream of them"""
+        found = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in found:
+                found.add(name)
+                stack.extend(self.nodes[name].downstream)
+        return found
+
+    def __len__(self):
+        return len(self.nodes)
@@ -1,18 +1,40 @@
-import uuid
 from datetime import datetime, timedelta
+from src.main.config import clock
+from src.main.config.ids import new_id
 from src.main.config.job_type import JobType
+from src.main.config.misfire_policy import MisfirePolicy
+from src.main.config.overlap_policy import OverlapPolicy
+from src.main.config.retry_policy import RetryPolicy
+from src.main.task.cron import compile_cron
 
 
 class Task:
+    __slots__ = ('id', 'name', 'job_type', 'schedule_time', 'retry_policy', 'max_retries',
+                 'repeat_interval', 'timeout', 'payload', 'priority', 'run_count', 'last_run_time',
+                 'cron', 'misfire_policy', 'overlap_policy', '_cron_schedule', '_created_ns', '_updated_ns')
+
     def __init__(self, 
                  name: str, 
                  job_type: JobType, 
                  schedule_time: datetime, 
-                 retry_policy: str = "FIXED_DELAY", 
+                 retry_policy: str = RetryPolicy.FIXED_DELAY, 
                  max_retries: int = 3, 
                  repeat_interval: timedelta = None, 
-                 timeout: int = 60):
-        self.id = str(uuid.uuid4())
+                 timeout: int = 60,
+                 payload=None,
+                 task_id=None,
+                 cron: str = None,
+                 misfire_policy: str = MisfirePolicy.FIRE_ONCE,
+                 priority: int = 0,
+                 overlap_policy: str = OverlapPolicy.ALLOW):
+        now = clock.now_ns()
+        # Compiled once per distinct expression; raises ValueError if invalid
+        self._cron_schedule = compile_cron(cron) if cron is not None else None
+        if schedule_time is None:
+            if cron is None:
+                raise ValueError("schedule_time is required unless cron is set")
+            schedule_time = self._cron_schedule.next_after(datetime.now())
+        self.id = task_id if task_id is not None else new_id()
         self.name = name
         self.job_type = job_type
         self.schedule_time = schedule_time
@@ -20,24 +42,49 @@ class Task:
         self.max_retries = max_retries
         self.repeat_interval = repeat_interval
         self.timeout = timeout
+        self.payload = payload
+        self.priority = priority  # Given to each job; lower runs first
+        self.cron = cron
+        self.misfire_policy = misfire_policy
+        self.overlap_policy = overlap_policy  # Whether a fire may add a job while one is still active
         self.run_count = 0
         self.last_run_time = None
-        self.created_at = datetime.now()
-        self.last_updated_at = datetime.now()
+        self._created_ns = now
+        self._updated_ns = now
+
+    @property
+    def created_at(self):
+        return clock.to_datetime(self._created_ns)
+
+    @property
+    def last_updated_at(self):
+        return clock.to_datetime(self._updated_ns)
 
     def is_recurring(self) -> bool: 
-        return self.repeat_interval is not None
+        return self.repeat_interval is not None or self.cron is not None
     
     def next_run_time(self) -> datetime:
+        """The nominal fire time after the current one
+
+        Computed from schedule_time rather than from when the job actually
+        ran, so scheduling lag does not accumulate into drift.
+        """
         if not self.is_recurring():
             return None
-        if self.last_run_time:
-            return self.last_run_time + self.repeat_interval
-        else:
+        return self.next_fire_after(self.schedule_time)
+
+    def next_fire_after(self, after: datetime) -> datetime:
+        """First nominal fire time strictly after `after` (None if not recurring)"""
+        if self._cron_schedule is not None:
+            return self._cron_schedule.next_after(after)
+        if self.repeat_interval is None:
+            return None
+        if after < self.schedule_time:
             return self.schedule_time
+        # Fire times stay on the grid schedule_time + k * repeat_interval
+        periods = (after - self.schedule_time) // self.repeat_interval + 1
+        return self.schedule_time + periods * self.repeat_interval
         
     def mark_executed(self):
         self.run_count+=1
         self.last_run_time = datetime.now()
-
-
@@ -0,0 +1,103 @@
+import csv
+import json
+from datetime import datetime, timedelta
+from src.main.task.task import Task
+
+# Columns / keys understood by the loaders; only the first three are required.
+# schedule_time is ISO 8601 or a POSIX timestamp (may be empty when cron is
+# set), repeat_interval is seconds, payload is JSON (a JSON-encoded string in
+# CSV files).
+FIELDS = ("name", "job_type", "schedule_time", "repeat_interval", "retry_policy",
+          "max_retries", "timeout", "payload", "id", "cron", "misfire_policy", "priority",
+          "overlap_policy")
+_KNOWN_FIELDS = frozenset(FIELDS)
+
+def task_from_row(row: dict):
+    """Build a Task from a CSV row or JSONL object; missing or empty fields use Task defaults"""
+    get = row.get
+    kwargs = {}
+    value = get("repeat_interval")
+    if value is not None and value != "":
+        kwargs["repeat_interval"] = timedelta(seconds=float(value))
+    value = get("retry_policy")
+    if value:
+        kwargs["retry_policy"] = value
+    value = get("max_retries")
+    if value is not None and value != "":
+        kwargs["max_retries"] = int(value)
+    value = get("timeout")
+    if value is not None and value != "":
+        kwargs["timeout"] = int(value)
+    value = get("payload")
+    if value is not None and value != "":
+        kwargs["payload"] = json.loads(value) if isinstance(value, str) else value
+    value = get("id")
+    if value is not None and value != "":
+        kwargs["task_id"] = value
+    value = get("cron")
+    if value:
+        kwargs["cron"] = value
+    value = get("misfire_policy")
+    if value:
+        kwargs["misfire_policy"] = value
+    value = get("priority")
+    if value is not None and value != "":
+        kwargs["priority"] = int(value)
+    value = get("overlap_policy")
+    if value:
+        kwargs["overlap_policy"] = value
+    value = get("schedule_time")
+    if value is not None and value != "":
+        schedule_time = parse_time(value)
+    elif "cron" in kwargs:
+        schedule_time = None  # First fire of the cron expression
+    else:
+        raise ValueError("schedule_time is required unless cron is set")
+    return Task(row["name"], row["job_type"], schedule_time, **kwargs)
+
+def parse_time(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    try:
+        return datetime.fromtimestamp(float(value))
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+def read_csv_tasks(path: str):
+    """Yield Tasks from a CSV file with a header row, one row at a time"""
+    with open(path, newline="", encoding="utf-8") as source:
+        reader = csv.DictReader(source)
+        _check_fields(reader.fieldnames or (), path)
+        for line, row in enumerate(reader, start=2):
+            yield _parse(task_from_row, row, path, line)
+
+def read_jsonl_tasks(path: str):
+    """Yield Tasks from a file with one JSON object per line, one line at a time"""
+    with open(path, encoding="utf-8") as source:
+        for line, text in enumerate(source, start=1):
+            if text.strip():
+                row = _parse(json.loads, text, path, line)
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path}:{line}: expected a JSON object per line")
+                _check_fields(row, path, line)
+                yield _parse(task_from_row, row, path, line)
+
+def read_tasks(path: str, fmt: str = None):
+    """Stream Tasks from a .csv or .jsonl file; `fmt` overrides the extension"""
+    fmt = fmt or ("csv" if path.endswith(".csv") else "jsonl")
+    if fmt == "csv":
+        return read_csv_tasks(path)
+    if fmt in ("jsonl", "json"):
+        return read_jsonl_tasks(path)
+    raise ValueError(f"unknown task file format {fmt!r}")
+
+def _check_fields(fields, path, line=1):
+    unknown = set(fields) - _KNOWN_FIELDS
+    if unknown:
+        raise ValueError(f"{path}:{line}: unknown task fields {sorted(unknown)}")
+
+def _parse(parse, data, path, line):
+    try:
+        return parse(data)
+    except (KeyError, ValueError, TypeError) as e:
+        raise ValueError(f"{path}:{line}: invalid task ({e!r})") from e
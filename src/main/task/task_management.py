@@ -1,28 +1,262 @@
-from datetime import datetime
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
 from src.main.task.task import Task
 
+# Placeholder stored in a heap entry once its task was removed or rescheduled
+REMOVED = '<removed>'
+
 class TaskManagement:
-    """Centralized task management"""
-    def __init__(self):
+    """Centralized task management
+
+    Tasks are indexed by id and by ready time. The ready-time index is a
+    min-heap of [schedule_time, seq, task_id] entries; removing or
+    rescheduling a task only invalidates its current entry, and stale
+    entries are discarded lazily when they reach the top of the heap.
+
+    When a journal (WriteAheadLog) is attached, every change is appended to
+    it while the lock is held, so the log order matches the index order.
+
+    With a cold store (ColdTaskStore), only tasks due within `horizon` are
+    kept in memory. Later tasks are written to the store and paged back into
+    the index in time-ordered chunks of `page_size` as the horizon advances.
+    get_task, add_task, remove_task and reschedule_task work across both
+    tiers.
+    """
+    def __init__(self, journal=None, cold_store=None, horizon: timedelta = timedelta(hours=1),
+                 page_size: int = 1000):
+        self.journal = journal
+        self.cold_store = cold_store
+        self.horizon = horizon
+        self.page_size = page_size
+        self._cold_next = None  # earliest schedule time in the cold store
         self.tasks = {}
-    
+        self._ready_index = []
+        self._index_entries = {}
+        self._counter = itertools.count()
+        self._lock = threading.RLock()
+
     def add_task(self, task: Task):
-        self.tasks[task.id] = task
-    
+        with self._lock:
+            self._discard(task.id)
+            self._store(task)
+            if self.journal:
+                self.journal.log_task_add(task)
+
+    def add_tasks(self, tasks):
+        """Add a chunk of tasks, taking the lock once and journaling each"""
+        with self._lock:
+            self._insert_many(tasks, self.journal)
+
+    def load_tasks(self, tasks):
+        """Bulk-load tasks (e.g. on recovery) without journaling them again"""
+        with self._lock:
+            self._insert_many(tasks, None)
+
+    def snapshot_tasks(self):
+        """Every stored task, for a write-ahead log snapshot
+
+        The cold tier is streamed first and resident tasks are read last:
+        a task paged in meanwhile is then read from memory, so none is missed.
+        """
+        if self.cold_store is not None:
+            yield from self.cold_store.iter_tasks()
+        with self._lock:
+            resident = list(self.tasks.values())
+        yield from resident
+
     def get_task(self, task_id: str):
-        return self.tasks.get(task_id)
-    
+        task = self.tasks.get(task_id)
+        if task is None and self.cold_store is not None:
+            task = self.cold_store.get(task_id)
+        return task
+
     def get_ready_tasks(self):
-        """Get tasks that are ready to be executed"""
+        """Get tasks that are ready to be executed
+
+        Only the due part of the index is visited: if a heap node is not
+        due, none of its children are, so the cost is proportional to the
+        number of ready tasks rather than to the number of stored tasks.
+        """
         current_time = datetime.now()
         ready_tasks = []
-        
-        for task in self.tasks.values():
-            if task.schedule_time <= current_time:
-                ready_tasks.append(task)
-        
+
+        with self._lock:
+            self._page_in(current_time)
+            self._discard_stale()
+            for task_id in self._due_ids(current_time):
+                ready_tasks.append(self.tasks[task_id])
+
+        ready_tasks.sort(key=lambda task: task.schedule_time)
         return ready_tasks
-    
+
+    def due_count(self, limit: int = None):
+        """Resident tasks that are due but have no job yet, counting at most `limit`"""
+        count = 0
+        with self._lock:
+            for _ in self._due_ids(datetime.now()):
+                count += 1
+                if count == limit:
+                    break
+        return count
+
+    def reschedule_task(self, task_id: str, schedule_time: datetime):
+        """Move a stored task to a new schedule time"""
+        with self._lock:
+            task = self.get_task(task_id)
+            if task is None:
+                return False
+            self._discard(task_id)
+            task.schedule_time = schedule_time
+            cold = self._store(task)
+            if self.journal:
+                if cold:
+                    # A full record, so a snapshot that missed the task mid-move still recovers it
+                    self.journal.log_task_add(task)
+                else:
+                    self.journal.log_task_reschedule(task)
+            return True
+
+    def next_schedule_time(self):
+        """Earliest time the index needs attention, or None when empty
+
+        That is the earliest resident schedule time, or the moment the
+        earliest cold task enters the horizon and has to be paged in.
+        """
+        with self._lock:
+            self._discard_stale()
+            times = [self._ready_index[0][0]] if self._ready_index else []
+            if self._cold_next is not None:
+                times.append(self._cold_next - self.horizon)
+            return min(times) if times else None
+
     def remove_task(self, task_id: str):
+        with self._lock:
+            if self._discard(task_id) and self.journal:
+                self.journal.log_task_remove(task_id)
+
+    def close(self):
+        if self.cold_store is not None:
+            self.cold_store.close()
+
+    def __len__(self):
+        return len(self.tasks) + (len(self.cold_store) if self.cold_store is not None else 0)
+
+    def _horizon_end(self):
+        return datetime.now() + self.horizon if self.cold_store is not None else None
+
+    def _store(self, task: Task):
+        """Place a task in the tier its schedule time belongs to; returns True if cold"""
+        horizon_end = self._horizon_end()
+        if horizon_end is not None and task.schedule_time > horizon_end:
+            self._store_cold([task])
+            return True
+        self.tasks[task.id] = task
+        self._push(task)
+        return False
+
+    def _store_cold(self, tasks):
+        self.cold_store.put_many(tasks)
+        earliest = min(task.schedule_time for task in tasks)
+        if self._cold_next is None or earliest < self._cold_next:
+            self._cold_next = earliest
+
+    def _discard(self, task_id: str):
+        """Drop a task from whichever tier holds it; returns True if it was stored"""
         if task_id in self.tasks:
+            self._invalidate(task_id)
             del self.tasks[task_id]
+            return True
+        if self.cold_store is not None and self.cold_store.remove(task_id):
+            self._cold_next = self.cold_store.next_schedule_time()
+            return True
+        return False
+
+    def _page_in(self, now: datetime):
+        """Move cold tasks that entered the horizon into the in-memory index"""
+        if self._cold_next is None or self._cold_next > now + self.horizon:
+            return
+        horizon_end = now + self.horizon
+        while True:
+            chunk = self.cold_store.take_due(horizon_end, self.page_size)
+            for task in chunk:
+                self.tasks[task.id] = task
+                self._push(task)
+            if len(chunk) < self.page_size:
+                break
+        self._cold_next = self.cold_store.next_schedule_time()
+
+    def _insert_many(self, tasks, journal):
+        horizon_end = self._horizon_end()
+        cold = []
+        resident_ids = []
+        entries = []
+        for task in tasks:
+            if task.id in self.tasks:
+                self._invalidate(task.id)
+                del self.tasks[task.id]
+            if journal:
+                journal.log_task_add(task)
+            if horizon_end is not None and task.schedule_time > horizon_end:
+                cold.append(task)
+                if len(cold) >= 10_000:
+                    self._store_cold(cold)
+                    cold = []
+                continue
+            self.tasks[task.id] = task
+            entry = [task.schedule_time, next(self._counter), task.id]
+            self._index_entries[task.id] = entry
+            entries.append(entry)
+            if self.cold_store is not None:
+                resident_ids.append(task.id)
+        if cold:
+            self._store_cold(cold)
+        # A re-added task may still have an older copy in the cold tier
+        if resident_ids and self.cold_store.remove_many(resident_ids):
+            self._cold_next = self.cold_store.next_schedule_time()
+        self._index_many(entries)
+
+    def _index_many(self, entries):
+        heap = self._ready_index
+        # k pushes cost O(k log n) and one heapify O(n + k): pick the cheaper
+        if len(entries) * max(len(heap), 1).bit_length() > len(heap) + len(entries):
+            heap.extend(entries)
+            heapq.heapify(heap)
+        else:
+            for entry in entries:
+                heapq.heappush(heap, entry)
+
+    def _due_ids(self, current_time: datetime):
+        """Ids of due tasks in the index, visiting only due heap nodes"""
+        heap = self._ready_index
+        pending = [0] if heap else []
+        while pending:
+            i = pending.pop()
+            entry = heap[i]
+            if entry[0] > current_time:
+                continue
+            if entry[2] is not REMOVED:
+                yield entry[2]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    pending.append(child)
+
+    def _push(self, task: Task):
+        entry = [task.schedule_time, next(self._counter), task.id]
+        self._index_entries[task.id] = entry
+        heapq.heappush(self._ready_index, entry)
+
+    def _invalidate(self, task_id: str):
+        entry = self._index_entries.pop(task_id, None)
+        if entry is not None:
+            entry[2] = REMOVED
+
+    def _discard_stale(self):
+        heap = self._ready_index
+        while heap and heap[0][2] is REMOVED:
+            heapq.heappop(heap)
+        # Compact once tombstones dominate so memory follows the live task count
+        if len(heap) > 64 and len(heap) > 2 * len(self._index_entries):
+            self._ready_index = [entry for entry in heap if entry[2] is not REMOVED]
+            heapq.heapify(self._ready_index)
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+from collections import deque
+from src.main.worker.job_handlers import JobHandlerRegistry
+from src.main.job.job import Job
+from src.main.job.job_listeners import JobListeners
+from src.main.config import event_log
+from src.main.config.job_status import JobStatus
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+class AsyncWorkerQueue:
+    """WorkerQueue counterpart consumed by an asyncio event loop
+
+    push() may be called from any thread; the loop is only signalled when
+    its consumer is actually waiting, so a burst of pushes costs one wakeup.
+    With maxsize > 0, try_push() and free_slots() bound it like a
+    WorkerQueue, and the pop that frees a slot calls on_space().
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = 0):
+        self._loop = loop
+        self._jobs = deque()
+        self._waiter = None
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.on_space = None
+        self._full = False
+
+    def push(self, job):
+        with self._lock:
+            self._jobs.append(job)
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            self._loop.call_soon_threadsafe(_wake, waiter)
+
+    def try_push(self, job):
+        """Push unless the queue is full"""
+        with self._lock:
+            if self.maxsize and len(self._jobs) >= self.maxsize:
+                self._full = True
+                return False
+        self.push(job)
+        return True
+
+    def free_slots(self):
+        """Jobs that can be pushed, or None if unbounded; at 0 the next pop calls on_space()"""
+        if not self.maxsize:
+            return None
+        with self._lock:
+            free = max(0, self.maxsize - len(self._jobs))
+            self._full = not free
+        return free
+
+    async def pop(self):
+        while True:
+            with self._lock:
+                if self._jobs:
+                    job = self._jobs.popleft()
+                    full, self._full = self._full, False
+                    break
+                waiter = self._waiter = self._loop.create_future()
+            await waiter
+        if full and self.on_space is not None:
+            self.on_space()
+        return job
+
+    def is_empty(self):
+        return not self._jobs
+
+    def qsize(self):
+        return len(self._jobs)
+
+class AsyncWorkerEngine(threading.Thread):
+    """Runs coroutine handlers for I/O-bound job types on one event loop
+
+    Up to `max_concurrency` jobs are in flight at once; each one is a
+    coroutine rather than an OS thread, so thousands of jobs waiting on I/O
+    cost little more than their own state.
+    """
+
+    def __init__(self, engine_id: str, handlers: JobHandlerRegistry, max_concurrency: int = 1000,
+                 job_listeners: JobListeners = None, retry_engine=None, watchdog=None,
+                 queue_size: int = 0):
+        super().__init__()
+        self.job_listeners = job_listeners or JobListeners()
+        self.retry_engine = retry_engine
+        self.watchdog = watchdog
+        self.engine_id = engine_id
+        self.handlers = handlers
+        self.max_concurrency = max_concurrency
+        self.loop = asyncio.new_event_loop()
+        self.worker_queue = AsyncWorkerQueue(self.loop, queue_size)
+        self.in_flight = 0
+        self.daemon = True
+        self.running = True
+
+    def run(self):
+        event_log.info("worker_started", worker=self.engine_id)
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._consume())
+        finally:
+            self.loop.close()
+
+    async def _consume(self):
+        slots = asyncio.Semaphore(self.max_concurrency)
+        pending = set()
+        while self.running:
+            await slots.acquire()
+            job = await self.worker_queue.pop()
+            if job is None:
+                slots.release()
+                break
+            task = self.loop.create_task(self._execute_job(job, slots))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _execute_job(self, job: Job, slots: asyncio.Semaphore):
+        self.in_flight += 1
+        try:
+            job.picked_by_worker(JobStatus.IN_PROGRESS, self.engine_id)
+            self.job_listeners.notify(job)
+            event_log.info("job_started", worker=self.engine_id, job=job.id, task=job.task_id)
+            handler, _ = self.handlers.get(job.job_type)
+            ticket = None
+            if self.watchdog is not None:
+                task = asyncio.current_task()
+                ticket = self.watchdog.watch(job, lambda job: self._time_out(job, task))
+            try:
+                result = await handler(job.payload)
+            except asyncio.CancelledError:
+                if self.watchdog is not None and not self.watchdog.release(ticket):
+                    return  # cancelled by the watchdog, which already failed the job
+                raise
+            except Exception as e:
+                if self.watchdog is None or self.watchdog.release(ticket):
+                    self._fail_job(job, e)
+                return
+            if self.watchdog is not None and not self.watchdog.release(ticket):
+                return
+            job.complete_job(result)
+            self.job_listeners.notify(job)
+            event_log.info("job_completed", worker=self.engine_id, job=job.id)
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    def _time_out(self, job: Job, task: asyncio.Task):
+        """Watchdog callback (watchdog thread): fail the job and cancel its coroutine"""
+        self._fail_job(job, TimeoutError(f"job exceeded its {job.timeout}s timeout"))
+        self.loop.call_soon_threadsafe(task.cancel)
+
+    def _fail_job(self, job: Job, error: Exception):
+        job.fail_job(error)
+        if self.retry_engine is not None and self.retry_engine.retry(job):
+            return
+        self.job_listeners.notify(job)
+        event_log.warning("job_failed", worker=self.engine_id, job=job.id, error=error)
+
+    def stop(self):
+        """Stop taking new jobs; jobs already in flight are allowed to finish"""
+        self.running = False
+        self.worker_queue.push(None)
+        event_log.info("worker_stopping", worker=self.engine_id)
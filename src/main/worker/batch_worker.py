@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import Counter
+from src.main.worker.worker_queue import RETIRE, WorkerQueue
+from src.main.worker.job_handlers import BatchConfig
+from src.main.job.job_listeners import JobListeners
+from src.main.config import event_log
+from src.main.config.job_status import JobStatus
+
+class BatchMetrics:
+    """Achieved batch sizes per job type"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sizes = {}
+
+    def record(self, job_type: str, size: int):
+        with self._lock:
+            self._sizes.setdefault(job_type, Counter())[size] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = {}
+            for job_type, sizes in self._sizes.items():
+                batches = sum(sizes.values())
+                jobs = sum(size * count for size, count in sizes.items())
+                stats[job_type] = {
+                    "batches": batches,
+                    "jobs": jobs,
+                    "mean_size": jobs / batches,
+                    "max_size": max(sizes),
+                    "sizes": dict(sizes),
+                }
+            return stats
+
+class BatchWorker(threading.Thread):
+    """Worker that drains jobs of one job type and runs them as a batch
+
+    Each job still gets its own IN_PROGRESS and COMPLETED/FAILED transition.
+    """
+
+    def __init__(self, worker_id: str, job_type: str, worker_queue: WorkerQueue,
+                 config: BatchConfig, metrics: BatchMetrics = None,
+                 job_listeners: JobListeners = None, retry_engine=None,
+                 watchdog=None, on_stuck=None):
+        super().__init__()
+        self.job_listeners = job_listeners or JobListeners()
+        self.retry_engine = retry_engine
+        self.watchdog = watchdog
+        self.on_stuck = on_stuck
+        self.worker_id = worker_id
+        self.job_type = job_type
+        self.worker_queue = worker_queue
+        self.config = config
+        self.metrics = metrics
+        self.daemon = True
+        self.running = True
+
+    def run(self):
+        event_log.info("worker_started", worker=self.worker_id, job_type=self.job_type)
+        while self.running:
+            try:
+                jobs = self.worker_queue.pop_batch(self.config.max_batch_size, self.config.linger)
+                retire = jobs[-1] is RETIRE
+                if retire:
+                    jobs.pop()
+                if jobs:
+                    self._execute_batch(jobs)
+                if retire:
+                    self.running = False
+                    event_log.info("worker_retired", worker=self.worker_id)
+                    break
+            except Exception as e:
+                event_log.error("worker_error", worker=self.worker_id, error=e)
+                time.sleep(1)
+
+    def replacement(self):
+        return BatchWorker(self.worker_id, self.job_type, self.worker_queue, self.config, self.metrics,
+                           self.job_listeners, self.retry_engine, self.watchdog, self.on_stuck)
+
+    def _execute_batch(self, jobs):
+        tickets = []
+        for job in jobs:
+            job.picked_by_worker(JobStatus.IN_PROGRESS, self.worker_id)
+            self.job_listeners.notify(job)
+            tickets.append(self.watchdog.watch(job, self._time_out) if self.watchdog else None)
+        if self.metrics is not None:
+            self.metrics.record(self.job_type, len(jobs))
+        event_log.info("batch_started", worker=self.worker_id, job_type=self.job_type, size=len(jobs))
+
+        try:
+            results = self.config.handler([job.payload for job in jobs])
+            if results is None:
+                results = [None] * len(jobs)
+            elif len(results) != len(jobs):
+                raise ValueError(f"batch handler returned {len(results)} results for {len(jobs)} jobs")
+        except Exception as e:
+            for job, ticket in zip(jobs, tickets):
+                if self._claim(ticket):
+                    self._fail_job(job, e)
+            event_log.warning("batch_failed", worker=self.worker_id, size=len(jobs), error=e)
+            return
+
+        failed = 0
+        for job, ticket, result in zip(jobs, tickets, results):
+            if not self._claim(ticket):
+                continue
+            if isinstance(result, Exception):
+                self._fail_job(job, result)
+                failed += 1
+            else:
+                job.complete_job(result)
+                self.job_listeners.notify(job)
+        event_log.info("batch_completed", worker=self.worker_id, size=len(jobs), failed=failed)
+
+    def _claim(self, ticket):
+        """True unless the watchdog already timed the job out"""
+        return self.watchdog is None or self.watchdog.release(ticket)
+
+    def _time_out(self, job):
+        """Watchdog callback: fail the job and hand this stuck worker's slot to a new one"""
+        self._fail_job(job, TimeoutError(f"job exceeded its {job.timeout}s timeout"))
+        if self.running:
+            self.running = False
+            event_log.warning("worker_stuck", worker=self.worker_id)
+            if self.on_stuck is not None:
+                self.on_stuck(self)
+
+    def _fail_job(self, job, error: Exception):
+        job.fail_job(error)
+        if self.retry_engine is not None and self.retry_engine.retry(job):
+            return
+        self.job_listeners.notify(job)
+
+    def stop(self):
+        self.running = False
+        # Wakes the worker if it is waiting on an empty queue; a full one wakes it anyway
+        self.worker_queue.try_push(RETIRE)
+        event_log.info("worker_stopping", worker=self.worker_id)
@@ -0,0 +1,196 @@
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from src.main.config.ids import new_id
+from src.main.config import event_log
+from src.main.config.job_status import JobStatus
+from src.main.job.job_listeners import JobListeners
+from src.main.persistence.shared_job_store import SharedJobStore
+from src.main.task.task import Task
+from src.main.worker.job_handlers import JobHandlerRegistry
+from src.main.worker.retry_engine import RetryEngine
+
+class ClusterNode:
+    """One scheduler/worker process sharing a SharedJobStore with others
+
+    Runs three kinds of threads against the shared store:
+    - a scheduling tick that balances partition leases among live nodes,
+      turns due tasks in its own partitions into jobs and requeues jobs
+      whose lease expired (their node died or stalled)
+    - a heartbeat that renews this node's partition and job leases
+    - workers that run due jobs and record their outcomes. A worker with
+      nothing to do claims jobs for itself and for the node's other idle
+      workers in one transaction, up to `claim_batch`, and hands the extra
+      jobs to them through a local queue; no job is leased before a
+      worker is free to start it
+
+    Start the same code in several processes (or on several hosts sharing
+    the file) to scale out; a node that dies loses its leases and its jobs
+    run again elsewhere, so execution is at-least-once. Handlers run on the
+    node's worker threads (the THREAD backend).
+    """
+
+    def __init__(self, store_path: str, node_id: str = None, num_workers: int = 3,
+                 lease_seconds: float = 10.0, claim_batch: int = 16, tick_interval: float = 0.5,
+                 handlers: JobHandlerRegistry = None, job_listeners: JobListeners = None,
+                 retry_base_delay: float = 1.0, retry_max_delay: float = 300.0):
+        self.node_id = node_id or f"node-{new_id()}"
+        self.store = SharedJobStore(store_path, lease_seconds)
+        self.num_workers = num_workers
+        self.claim_batch = claim_batch
+        self.tick_interval = tick_interval
+        self.handlers = handlers or JobHandlerRegistry.with_simulated_handlers()
+        self.job_listeners = job_listeners if job_listeners is not None else JobListeners()
+        # Only next_delay is used: retries are written back to the shared store
+        self.retry_policy = RetryEngine(None, base_delay=retry_base_delay, max_delay=retry_max_delay)
+        self.running = False
+        self.partitions = []
+        self.completed_count = 0
+        self._threads = []
+        self._count_lock = threading.Lock()
+        self._claim_lock = threading.Lock()
+        self._claimed = queue.Queue()  # Leased jobs handed to idle workers of this node
+        self._busy = 0
+
+    def start(self):
+        self.running = True
+        self.store.heartbeat(self.node_id)
+        self._spawn(self._tick_loop, "tick")
+        self._spawn(self._heartbeat_loop, "heartbeat")
+        for i in range(self.num_workers):
+            self._spawn(self._worker_loop, f"worker-{i}")
+        event_log.info("node_started", node=self.node_id, workers=self.num_workers)
+
+    def stop(self):
+        self.running = False
+        for thread in self._threads:
+            thread.join(timeout=self.tick_interval * 4)
+        # Hand back jobs claimed for workers that exited before taking them
+        leftover = []
+        while not self._claimed.empty():
+            job = self._claimed.get_nowait()
+            job.job_update(JobStatus.IN_QUEUE, False)
+            leftover.append(job)
+        if leftover:
+            self.store.finish_jobs(self.node_id, leftover)
+        event_log.info("node_stopped", node=self.node_id)
+
+    def register_handler(self, job_type: str, handler):
+        self.handlers.register(job_type, handler)
+
+    def add_task(self, name: str, job_type: str, schedule_time: datetime, **kwargs):
+        task = Task(name, job_type, schedule_time, **kwargs)
+        self.store.add_task(task)
+        return task.id
+
+    def cancel_task(self, task_id):
+        return self.store.remove_task(task_id)
+
+    def _spawn(self, target, name):
+        thread = threading.Thread(target=target, name=f"{self.node_id}-{name}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _tick_loop(self):
+        while self.running:
+            try:
+                self.partitions = self.store.balance_partitions(self.node_id)
+                while self.running:
+                    jobs = self.store.materialize_due_tasks(self.node_id)
+                    for job in jobs:
+                        self.job_listeners.notify(job)
+                    if len(jobs) < 1000:
+                        break
+                requeued, failed = self.store.reap_expired_leases()
+                if requeued:
+                    event_log.warning("expired_leases_requeued", node=self.node_id, jobs=requeued)
+                if failed:
+                    event_log.warning("expired_leases_failed", node=self.node_id, jobs=failed)
+            except Exception as e:
+                event_log.error("tick_error", node=self.node_id, error=e)
+            time.sleep(self.tick_interval)
+
+    def _heartbeat_loop(self):
+        while self.running:
+            try:
+                self.store.heartbeat(self.node_id)
+            except Exception as e:
+                event_log.error("heartbeat_error", node=self.node_id, error=e)
+            time.sleep(self.store.lease_seconds / 3)
+
+    def _worker_loop(self):
+        idle_sleep = 0.01
+        while self.running:
+            job = self._next_job()
+            if job is None:
+                # Other processes cannot signal us, so back off while idle; jobs claimed by
+                # another worker of this node still wake us at once
+                try:
+                    job = self._claimed.get(timeout=idle_sleep)
+                except queue.Empty:
+                    idle_sleep = min(idle_sleep * 2, self.tick_interval)
+                    continue
+                with self._count_lock:
+                    self._busy += 1
+            idle_sleep = 0.01
+            try:
+                self._run(job)
+            finally:
+                with self._count_lock:
+                    self._busy -= 1
+
+    def _next_job(self):
+        """A job for this worker (counted busy), or None if none is due"""
+        try:
+            job = self._claimed.get_nowait()
+        except queue.Empty:
+            job = None
+        if job is None:
+            with self._claim_lock:
+                # This worker plus the others that are idle and have no job waiting for them
+                idle = max(1, self.num_workers - self._busy - self._claimed.qsize())
+                try:
+                    jobs = self.store.claim_jobs(self.node_id, min(self.claim_batch, idle))
+                except Exception as e:
+                    event_log.error("claim_error", node=self.node_id, error=e)
+                    jobs = []
+                if not jobs:
+                    return None
+                job = jobs[0]
+                for other in jobs[1:]:
+                    self._claimed.put(other)
+        with self._count_lock:
+            self._busy += 1
+        return job
+
+    def _run(self, job):
+        self.job_listeners.notify(job)
+        self._execute(job)
+        try:
+            finished = self.store.finish_jobs(self.node_id, [job])
+        except Exception as e:
+            event_log.error("finish_error", node=self.node_id, error=e)
+            return
+        if not finished:
+            return
+        if job.status is JobStatus.COMPLETED:
+            with self._count_lock:
+                self.completed_count += 1
+        self.job_listeners.notify(job)
+
+    def _execute(self, job):
+        handler, _ = self.handlers.get(job.job_type)
+        try:
+            job.complete_job(handler(job.payload))
+        except Exception as e:
+            job.fail_job(e)
+            if job.attempt_count > job.max_retries:
+                return
+            try:
+                job.retry_delay = self.retry_policy.next_delay(job)
+            except ValueError as policy_error:
+                event_log.warning("retry_skipped", node=self.node_id, job=job.id, error=policy_error)
+                return
+            job.run_time = datetime.now() + timedelta(seconds=job.retry_delay)
+            job.job_update(JobStatus.IN_QUEUE, True)
@@ -0,0 +1,178 @@
+import threading
+from datetime import datetime
+from src.main.config import event_log
+from src.main.config.ids import new_id
+from src.main.config.job_status import JobStatus
+from src.main.job.job import Job
+from src.main.task.dag import Dag
+
+class StepState:
+    PENDING = 'PENDING'
+    QUEUED = 'QUEUED'
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    FAILED = 'FAILED'
+    CANCELLED = 'CANCELLED'
+    UPSTREAM_FAILED = 'UPSTREAM_FAILED'
+
+_ACTIVE = (StepState.PENDING, StepState.QUEUED, StepState.RUNNING)
+_FINAL_STATUS = {JobStatus.COMPLETED: StepState.COMPLETED, JobStatus.FAILED: StepState.FAILED,
+                 JobStatus.CANCELLED: StepState.CANCELLED}
+
+class DagRun:
+    """One run of a Dag: per-step state, job ids, results and errors"""
+
+    def __init__(self, dag: Dag, run_time: datetime = None):
+        self.id = new_id()
+        self.dag = dag
+        self.run_time = run_time
+        self.states = {name: StepState.PENDING for name in dag.nodes}
+        self.job_ids = {}
+        self.results = {}
+        self.errors = {}
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def status(self):
+        """RUNNING until no step can make progress, then SUCCEEDED or FAILED"""
+        if not self._done.is_set():
+            return 'RUNNING'
+        if all(state == StepState.COMPLETED for state in self.states.values()):
+            return 'SUCCEEDED'
+        return 'FAILED'
+
+    def wait(self, timeout: float = None):
+        """Block until the run finishes; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def task_id(self, name: str):
+        """task_id given to the jobs of step `name`"""
+        return f"dag:{self.id}:{name}"
+
+    def __repr__(self):
+        return f"DagRun(dag={self.dag.name}, id={self.id}, status={self.status})"
+
+class DagCoordinator:
+    """Turns DAG runs into jobs as their dependencies complete
+
+    Registered as a JobListener, it sees each step's job complete on the
+    worker thread that ran it and immediately hands the steps that became
+    ready to `enqueue(job)`, instead of waiting for a scheduled offset.
+    Step jobs take the DAG's critical-path priorities, so when more steps
+    are ready than there are workers, the longest remaining chains go
+    first.
+
+    A step that fails (after its retries) or is cancelled marks every step
+    downstream of it UPSTREAM_FAILED. rerun() resets failed steps, or
+    chosen steps, together with their downstream steps and runs them again
+    within the same DagRun, keeping completed results.
+    """
+
+    def __init__(self, enqueue):
+        self._enqueue = enqueue
+        self._lock = threading.Lock()
+        self._steps = {}  # job id -> (run, step name)
+        self._runs = {}
+
+    def start(self, dag: Dag, run_time: datetime = None):
+        run = DagRun(dag, run_time)
+        with self._lock:
+            self._runs[run.id] = run
+            jobs = [self._materialize(run, name, dag.priorities()) for name in dag.roots()]
+        event_log.info("dag_started", dag=dag.name, run=run.id, steps=len(dag))
+        self._submit(jobs)
+        return run
+
+    def rerun(self, run: DagRun, steps=None):
+        """Run `steps` (default: every step that did not complete) and their downstream steps again"""
+        dag = run.dag
+        with self._lock:
+            if steps is None:
+                steps = [name for name, state in run.states.items() if state != StepState.COMPLETED]
+            reset = dag.descendants(steps)
+            if not reset:
+                return
+            for name in reset:
+                if run.states[name] in (StepState.QUEUED, StepState.RUNNING):
+                    raise ValueError(f"DAG step {name!r} is still {run.states[name]}")
+                for upstream in dag.nodes[name].upstream:
+                    if upstream not in reset and run.states[upstream] != StepState.COMPLETED:
+                        raise ValueError(f"DAG step {name!r} needs {upstream!r}, which did not complete")
+            for name in reset:
+                run.states[name] = StepState.PENDING
+                run.results.pop(name, None)
+                run.errors.pop(name, None)
+            run.finished_at = None
+            run._done.clear()
+            self._runs[run.id] = run
+            priorities = dag.priorities()
+            jobs = [self._materialize(run, name, priorities) for name in dag.nodes
+                    if name in reset and self._is_ready(run, name)]
+            if not jobs:
+                self._maybe_finish(run)
+        event_log.info("dag_rerun", dag=dag.name, run=run.id, steps=len(reset))
+        self._submit(jobs)
+
+    def runs(self):
+        """Runs that have not finished"""
+        with self._lock:
+            return list(self._runs.values())
+
+    def __call__(self, job):
+        """JobListeners callback"""
+        step = self._steps.get(job.id)
+        if step is None:
+            return
+        run, name = step
+        status = job.status
+        jobs = []
+        with self._lock:
+            if status is JobStatus.IN_PROGRESS:
+                run.states[name] = StepState.RUNNING
+            elif status is JobStatus.IN_QUEUE:
+                run.states[name] = StepState.QUEUED  # Requeued for a retry
+            elif status in _FINAL_STATUS:
+                del self._steps[job.id]
+                run.states[name] = _FINAL_STATUS[status]
+                if status is JobStatus.COMPLETED:
+                    run.results[name] = job.result
+                    priorities = run.dag.priorities()
+                    jobs = [self._materialize(run, child, priorities)
+                            for child in run.dag.nodes[name].downstream if self._is_ready(run, child)]
+                else:
+                    run.errors[name] = job.error
+                    for downstream in run.dag.descendants(run.dag.nodes[name].downstream):
+                        if run.states[downstream] == StepState.PENDING:
+                            run.states[downstream] = StepState.UPSTREAM_FAILED
+                self._maybe_finish(run)
+        self._submit(jobs)
+
+    def _is_ready(self, run, name):
+        return (run.states[name] == StepState.PENDING
+                and all(run.states[upstream] == StepState.COMPLETED for upstream in run.dag.nodes[name].upstream))
+
+    def _materialize(self, run, name, priorities):
+        node = run.dag.nodes[name]
+        job = Job(run.task_id(name), run.run_time or datetime.now(), priority=priorities[name],
+                  job_type=node.job_type, payload=node.payload, retry_policy=node.retry_policy,
+                  max_retries=node.max_retries, timeout=node.timeout)
+        run.states[name] = StepState.QUEUED
+        run.job_ids[name] = job.id
+        self._steps[job.id] = (run, name)
+        return job
+
+    def _submit(self, jobs):
+        # Outside the lock: enqueue notifies listeners, this coordinator included
+        for job in jobs:
+            self._enqueue(job)
+
+    def _maybe_finish(self, run):
+        if any(state in _ACTIVE for state in run.states.values()):
+            return
+        run.finished_at = datetime.now()
+        self._runs.pop(run.id, None)
+        run._done.set()
+        event_log.info("dag_finished", dag=run.dag.name, run=run.id, status=run.status,
+                       seconds=round((run.finished_at - run.started_at).total_seconds(), 3))
@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import threading
+import time
+from src.main.config.job_status import JobStatus
+from src.main.worker.worker_queue import RETIRE
+
+class _Flow:
+    __slots__ = ('key', 'weight', 'heap', 'vtime', 'cost', 'picked')
+
+    def __init__(self, key, weight, cost):
+        self.key = key
+        self.weight = weight
+        self.heap = []
+        self.vtime = 0.0   # worker-seconds received, divided by weight
+        self.cost = cost   # moving average of execution seconds per job
+        self.picked = 0
+
+class FairWorkerQueue:
+    """Worker queue that shares workers between flows by weighted fair queuing
+
+    Jobs are grouped into flows by `flow_key(job)` (the job type by
+    default; return e.g. (job.job_type, tenant) to also be fair between
+    tenants). pop() serves the backlogged flow that has received the least
+    worker time per unit of `weights[key]` (default 1), so a backlog of
+    long DATA_EXPORT jobs gets its share of workers while NOTIFICATIONs
+    queued behind it still go out promptly. A pick is charged the flow's
+    average execution time and corrected when the attempt ends, which the
+    queue learns as a JobListener: register it with the app's listeners.
+
+    Within a flow, jobs go out by priority (lower first) then arrival.
+    With `aging` seconds, waiting that long is worth one priority level,
+    so low-priority jobs still make progress under a steady stream of
+    higher-priority ones. `quotas[job_type]` caps how many jobs of a type
+    may be in progress at once; their flows wait while at the cap.
+
+    RETIRE pills are handed out only when no job can be, so retiring a
+    worker never leaves a runnable job waiting. `maxsize` bounds queued jobs
+    as in WorkerQueue.
+    """
+
+    def __init__(self, weights: dict = None, quotas: dict = None, aging: float = None,
+                 flow_key=None, initial_cost: float = 0.1, maxsize: int = 0):
+        self.weights = dict(weights or {})
+        self.quotas = dict(quotas or {})
+        self.aging = aging
+        self.flow_key = flow_key or _job_type
+        self.initial_cost = initial_cost
+        self.maxsize = maxsize
+        self.on_space = None
+        self._full = False
+        lock = threading.Lock()
+        self._cond = threading.Condition(lock)
+        self._not_full = threading.Condition(lock)
+        self._flows = {}
+        self._backlogged = {}
+        self._in_progress = {}  # job_type -> picked jobs whose attempt has not ended
+        self._charges = {}      # job id -> (flow, seconds charged at pick)
+        self._vtime = 0.0
+        self._counter = itertools.count()
+        self._size = 0
+        self._retirements = 0
+
+    def push(self, job):
+        with self._cond:
+            if job is RETIRE:
+                self._retirements += 1
+            else:
+                while self.maxsize and self._size >= self.maxsize:
+                    self._not_full.wait()
+                self._add(job)
+            self._cond.notify()
+
+    def try_push(self, job):
+        """Push without blocking; False if the queue is full"""
+        with self._cond:
+            if self.maxsize and self._size >= self.maxsize:
+                self._full = True
+                return False
+            self._add(job)
+            self._cond.notify()
+            return True
+
+    def free_slots(self):
+        """Jobs that can be pushed without blocking, or None if unbounded
+
+        When there are none, the next pop calls on_space().
+        """
+        if not self.maxsize:
+            return None
+        with self._cond:
+            free = max(0, self.maxsize - self._size)
+            self._full = not free
+            return free
+
+    def pop(self):
+        with self._cond:
+            while True:
+                flow = self._next_flow()
+                if flow is not None:
+                    return self._take(flow)
+                if self._retirements:
+                    self._retirements -= 1
+                    return RETIRE
+                self._cond.wait()
+
+    def __call__(self, job):
+        """JobListeners callback: release quota and charge actual time when an attempt ends"""
+        if job.status is JobStatus.IN_PROGRESS:
+            return
+        with self._cond:
+            charge = self._charges.pop(job.id, None)
+            if charge is None:
+                return
+            flow, estimate = charge
+            self._in_progress[job.job_type] -= 1
+            if job.started_ns is not None and job.finished_ns is not None:
+                seconds = (job.finished_ns - job.started_ns) / 1e9
+                flow.vtime += (seconds - estimate) / flow.weight
+                flow.cost += 0.2 * (seconds - flow.cost)
+            self._cond.notify()
+
+    def is_empty(self):
+        return self.qsize() == 0
+
+    def qsize(self):
+        # Pending RETIRE pills count, as they do in WorkerQueue
+        with self._cond:
+            return self._size + self._retirements
+
+    def stats(self):
+        """Queued, picked, weight and average cost per flow; jobs in progress per type"""
+        with self._cond:
+            flows = {key: {"queued": len(flow.heap), "picked": flow.picked, "weight": flow.weight,
+                           "avg_seconds": flow.cost}
+                     for key, flow in self._flows.items()}
+            return {"flows": flows, "in_progress": dict(self._in_progress)}
+
+    def _add(self, job):
+        key = self.flow_key(job)
+        flow = self._flows.get(key)
+        if flow is None:
+            flow = _Flow(key, self.weights.get(key, 1.0), self.initial_cost)
+            self._flows[key] = flow
+        if not flow.heap:
+            # An idle flow does not bank credit for the time it had no work
+            flow.vtime = max(flow.vtime, self._vtime)
+            self._backlogged[key] = flow
+        rank = job.priority
+        if self.aging:
+            rank = job.priority * self.aging + time.monotonic()
+        heapq.heappush(flow.heap, (rank, next(self._counter), job))
+        self._size += 1
+
+    def _next_flow(self):
+        best = None
+        for flow in self._backlogged.values():
+            if best is not None and flow.vtime >= best.vtime:
+                continue
+            job_type = flow.heap[0][-1].job_type
+            quota = self.quotas.get(job_type)
+            if quota is not None and self._in_progress.get(job_type, 0) >= quota:
+                continue
+            best = flow
+        return best
+
+    def _take(self, flow):
+        job = heapq.heappop(flow.heap)[-1]
+        if not flow.heap:
+            del self._backlogged[flow.key]
+        self._size -= 1
+        self._not_full.notify()
+        if self._full:
+            self._full = False
+            if self.on_space is not None:
+                self.on_space()
+        self._vtime = flow.vtime
+        estimate = flow.cost
+        flow.vtime += estimate / flow.weight
+        flow.picked += 1
+        self._charges[job.id] = (flow, estimate)
+        self._in_progress[job.job_type] = self._in_progress.get(job.job_type, 0) + 1
+        return job
+
+def _job_type(job):
+    return job.job_type
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from collections import namedtuple
+from functools import partial
+from src.main.config.execution_backend import ExecutionBackend
+from src.main.config.job_type import JobType
+
+# Simulated execution times used until real handlers are registered
+SIMULATED_EXECUTION_TIMES = {
+    JobType.EMAIL: 1,
+    JobType.NOTIFICATION: 0.5,
+    JobType.REPORT: 3,
+    JobType.DATA_EXPORT: 5
+}
+DEFAULT_SIMULATED_EXECUTION_TIME = 2
+
+def simulate_work(seconds: float, payload=None):
+    """Placeholder handler that just sleeps"""
+    time.sleep(seconds)
+
+# Batch handlers take a list of payloads and return one result per payload;
+# a returned Exception instance fails just that job
+BatchConfig = namedtuple('BatchConfig', ['handler', 'max_batch_size', 'linger', 'num_workers'])
+
+async def simulate_io(seconds: float, payload=None):
+    """Placeholder coroutine handler that waits without holding a thread"""
+    await asyncio.sleep(seconds)
+
+class JobHandlerRegistry:
+    """Maps a JobType to the handler that executes it and its execution backend
+
+    A handler is called with the job's payload and its return value becomes
+    the job result. Handlers meant for the process backend must be
+    picklable, i.e. module-level functions or partials of them; handlers
+    for the async backend are coroutine functions.
+    """
+
+    def __init__(self):
+        self._handlers = {}
+        self._batch_handlers = {}
+        self._default = (partial(simulate_work, DEFAULT_SIMULATED_EXECUTION_TIME), ExecutionBackend.THREAD)
+
+    @classmethod
+    def with_simulated_handlers(cls):
+        registry = cls()
+        for job_type, seconds in SIMULATED_EXECUTION_TIMES.items():
+            registry.register(job_type, partial(simulate_work, seconds))
+        return registry
+
+    def register(self, job_type: str, handler, backend: str = ExecutionBackend.THREAD):
+        self._handlers[job_type] = (handler, backend)
+
+    def register_batch(self, job_type: str, handler, max_batch_size: int = 100,
+                       linger: float = 0.005, num_workers: int = 1):
+        """Register a handler that processes up to `max_batch_size` jobs per call
+
+        Workers wait at most `linger` seconds for a batch to fill up.
+        """
+        self._batch_handlers[job_type] = BatchConfig(handler, max_batch_size, linger, num_workers)
+
+    def get_batch(self, job_type: str):
+        return self._batch_handlers.get(job_type)
+
+    def batch_job_types(self):
+        return list(self._batch_handlers)
+
+    def get(self, job_type: str):
+        """Return (handler, backend) for a job type"""
+        return self._handlers.get(job_type, self._default)
+
+    def uses_backend(self, backend: str):
+        return bool(self.job_types_for(backend))
+
+    def job_types_for(self, backend: str):
+        return [job_type for job_type, (_, registered_backend) in self._handlers.items()
+                if registered_backend == backend]
@@ -0,0 +1,94 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from src.main.config import event_log
+
+def _run_handler(handler, payload_blob):
+    """Entry point inside the pool process"""
+    payload = pickle.loads(payload_blob) if payload_blob is not None else None
+    return handler(payload)
+
+class ProcessPoolBackend:
+    """Runs CPU-bound handlers on a ProcessPoolExecutor
+
+    Payloads are treated as immutable: they are pickled once and the bytes
+    are cached per payload object, so a recurring task or a retried job does
+    not pay for serializing the same large payload again. Submissions block once every pool process is
+    busy, which keeps excess jobs in the WorkerQueue instead of piling up
+    inside the executor.
+
+    A running submission cannot be interrupted inside its process, so
+    cancel() replaces the pool and terminates the old one's processes;
+    the other jobs it was running fail with BrokenProcessPool.
+    """
+
+    def __init__(self, max_workers: int = None, payload_cache_size: int = 64):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._payload_cache = OrderedDict()
+        self._payload_cache_size = payload_cache_size
+        self._cache_lock = threading.Lock()
+
+    def submit(self, handler, payload, on_done, on_start=None):
+        """Run handler(payload) in a pool process and call on_done(future)
+
+        on_start() is called once a pool slot is free, just before the
+        handler is handed to the pool.
+        """
+        blob = self._serialize(payload)
+        self._slots.acquire()
+        try:
+            if on_start is not None:
+                on_start()
+            with self._executor_lock:
+                executor = self._executor
+                future = executor.submit(_run_handler, handler, blob)
+        except Exception:
+            self._slots.release()
+            raise
+        future.executor = executor
+        future.add_done_callback(self._release_slot)
+        future.add_done_callback(on_done)
+        return future
+
+    def cancel(self, future):
+        """Stop a submission, restarting the pool if it is already running"""
+        if future.cancel() or future.done():
+            return
+        with self._executor_lock:
+            old = future.executor
+            if old is not self._executor:
+                return  # its pool was already replaced
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        processes = list((getattr(old, "_processes", None) or {}).values())
+        old.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        event_log.warning("process_pool_restarted", processes=len(processes))
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _release_slot(self, future):
+        self._slots.release()
+
+    def _serialize(self, payload):
+        if payload is None:
+            return None
+        key = id(payload)
+        with self._cache_lock:
+            cached = self._payload_cache.get(key)
+            # The cached entry holds a reference to the payload, so its id cannot be reused
+            if cached is not None and cached[0] is payload:
+                self._payload_cache.move_to_end(key)
+                return cached[1]
+        blob = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._cache_lock:
+            self._payload_cache[key] = (payload, blob)
+            if len(self._payload_cache) > self._payload_cache_size:
+                self._payload_cache.popitem(last=False)
+        return blob
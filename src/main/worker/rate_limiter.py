@@ -0,0 +1,42 @@
+import time
+
+class TokenBucket:
+    """Allows `rate` jobs per second on average, in bursts of up to `burst`
+
+    Used only by the scheduler thread: it reads available() before a
+    dispatch pass, take()s one token per job handed to a worker queue, and
+    sleeps until refill_time() when a type has run out.
+    """
+    __slots__ = ('rate', 'burst', 'tokens', '_updated')
+
+    def __init__(self, rate: float, burst: float = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        if self.burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst!r}")
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+
+    def available(self):
+        """Whole tokens available now"""
+        self._refill()
+        return int(self.tokens)
+
+    def take(self, count: int = 1):
+        self._refill()
+        self.tokens -= count
+
+    def refill_time(self, count: int = 1):
+        """Seconds until `count` tokens are available"""
+        self._refill()
+        return max(0.0, (count - self.tokens) / self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def __repr__(self):
+        return f"TokenBucket(rate={self.rate}, burst={self.burst})"
@@ -0,0 +1,68 @@
+import random
+from datetime import datetime, timedelta
+from src.main.job.job import Job
+from src.main.job.job_listeners import JobListeners
+from src.main.config import event_log
+from src.main.config.job_status import JobStatus
+from src.main.config.retry_policy import RetryPolicy
+
+class RetryEngine:
+    """Re-enqueues failed jobs with a backoff chosen by their retry policy
+
+    A job is retried while its attempt_count is at most max_retries. Every
+    policy is randomized so that jobs failing together during an outage do
+    not come back together when the dependency recovers:
+
+    - FIXED_DELAY: base_delay, spread uniformly over +/-50%
+    - EXPONENTIAL_BACKOFF: "full jitter", uniform in [0, base_delay * 2^(n-1)]
+    - DECORRELATED_JITTER: uniform in [base_delay, 3 * previous delay], where
+      the first retry's previous delay is base_delay
+
+    Delays are capped at max_delay. `on_schedule(run_time)` is called for
+    every retry so the scheduler can wake up in time for it.
+    """
+
+    def __init__(self, priority_queue, job_listeners: JobListeners = None, on_schedule=None,
+                 base_delay: float = 1.0, max_delay: float = 300.0, rng: random.Random = None):
+        self.priority_queue = priority_queue
+        self.job_listeners = job_listeners or JobListeners()
+        self.on_schedule = on_schedule
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def retry(self, job: Job):
+        """Re-enqueue a failed job if it has retries left; returns True if it was"""
+        if job.attempt_count > job.max_retries:
+            return False
+        try:
+            delay = self.next_delay(job)
+        except ValueError as e:
+            event_log.warning("retry_skipped", job=job.id, error=e)
+            return False
+        job.retry_delay = delay
+        job.run_time = datetime.now() + timedelta(seconds=delay)
+        job.job_update(JobStatus.IN_QUEUE, True)
+        self.priority_queue.add(job)
+        self.job_listeners.notify(job)
+        if self.on_schedule is not None:
+            self.on_schedule(job.run_time)
+        event_log.info("job_retry_scheduled", job=job.id, delay=round(delay, 3),
+                       attempt=job.attempt_count, error=job.error)
+        return True
+
+    def next_delay(self, job: Job):
+        """Backoff in seconds before the job's next attempt"""
+        base = self.base_delay
+        if job.retry_policy == RetryPolicy.FIXED_DELAY:
+            delay = self.rng.uniform(0.5 * base, 1.5 * base)
+        elif job.retry_policy == RetryPolicy.EXPONENTIAL_BACKOFF:
+            # attempt_count is capped in the exponent so huge retry counts cannot overflow
+            delay = self.rng.uniform(0, base * 2 ** min(job.attempt_count - 1, 62))
+        elif job.retry_policy == RetryPolicy.DECORRELATED_JITTER:
+            # Seeded with base, so even the first retries of jobs failing together are spread out
+            previous = max(base, job.retry_delay)
+            delay = self.rng.uniform(base, 3 * previous)
+        else:
+            raise ValueError(f"unknown retry policy {job.retry_policy!r}")
+        return min(delay, self.max_delay)
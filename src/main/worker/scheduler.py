@@ -1,36 +1,140 @@
+import collections
 import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.main.job.job_priority_queue import JobPriorityQueue
 from src.main.worker.worker_queue import WorkerQueue
 from src.main.job.job import Job
+from src.main.job.job_listeners import JobListeners
+from src.main.job.overlap_guard import OverlapGuard
+from src.main.metrics.registry import MetricsRegistry
+from src.main.config import event_log
 from src.main.config.job_status import JobStatus
+from src.main.config.misfire_policy import MisfirePolicy
+from src.main.config.overlap_policy import OverlapPolicy
+from src.main.worker.rate_limiter import TokenBucket
 
 class Scheduler(threading.Thread):
-    def __init__(self, priority_queue: JobPriorityQueue, worker_queue: WorkerQueue, task_management):
+    def __init__(self, priority_queue: JobPriorityQueue, worker_queue: WorkerQueue, task_management,
+                 job_listeners: JobListeners = None, metrics: MetricsRegistry = None):
         super().__init__()
+        self.job_listeners = job_listeners or JobListeners()
         self.priority_queue = priority_queue
         self.worker_queue = worker_queue
         self.task_management = task_management
         self.daemon = True
         self.running = True
-        self.check_interval = 1  # Check every second
+        self.check_interval = 1  # Back-off after an error
+        self.max_idle_interval = 60  # Upper bound on a sleep with nothing due
+        self.dispatch_batch_size = 256  # Jobs popped per priority queue lock
+        self.misfire_grace = 60  # Seconds late before a recurring fire counts as misfired
+        self.routes = {}  # job_type -> queue for types not served by worker_queue
+        # Optional SpillFile: queued jobs beyond overflow_threshold wait on disk
+        self.overflow = None
+        self.overflow_threshold = None
+        self.rate_limits = {}  # job_type -> TokenBucket; due jobs wait in the priority queue for tokens
+        # Active jobs of tasks with an overlap policy, kept current by job transitions
+        self.overlap = OverlapGuard(on_idle=self._owed_run)
+        self.job_listeners.add(self.overlap)
+        self._owed_runs = collections.deque()  # COALESCE tasks whose deferred run is due now
+        self.metrics = metrics = metrics or MetricsRegistry()
+        self._queue_full = metrics.counter("worker_queue_full_total",
+                                           "Worker queues found full by a dispatch pass")
+        self._spilled = metrics.counter("jobs_spilled_total", "Queued jobs moved to the overflow file")
+        self._reloaded = metrics.counter("jobs_reloaded_total", "Jobs read back from the overflow file")
+        self._overlapping = {policy: metrics.counter("overlapping_fires_total",
+                                                     "Recurring fires dropped while the task had a job active",
+                                                     policy=policy)
+                             for policy in (OverlapPolicy.SKIP, OverlapPolicy.COALESCE)}
+        self._rate_limited = {}
+        self._throttled = {}  # job_type -> time its bucket has a token again, for types with due jobs waiting on it
+        self._backpressured = False  # The default worker queue is full
+        self._blocked_types = set()  # Routed types whose queue is full
+        worker_queue.on_space = self.wakeup
+        self._wakeup_event = threading.Event()
+        self._deadline = None
         
     def run(self):
-        """Main scheduler loop - runs in its own thread"""
-        print("[Scheduler] Started")
+        """Main scheduler loop - runs in its own thread
+
+        Instead of polling, the thread sleeps until the earliest known
+        deadline across TaskManagement and the priority queue, or until
+        wakeup() reports an earlier one. While a full worker queue holds
+        back due jobs, it sleeps until a worker frees a slot instead.
+        """
+        event_log.info("scheduler_started")
         while self.running:
             try:
+                # Clear before scanning so a wakeup raised mid-pass is not lost
+                self._wakeup_event.clear()
+                self._deadline = None
+
                 # Check for ready tasks and create jobs
+                self._create_owed_jobs()
                 self._create_jobs_from_ready_tasks()
                 
                 # Move ready jobs from priority queue to worker queue
-                self._move_ready_jobs_to_worker_queue()
+                self._backpressured = not self._move_ready_jobs_to_worker_queue()
+
+                if self.overflow is not None:
+                    self._balance_overflow()
                 
-                time.sleep(self.check_interval)
+                self._wait_for_next_deadline()
             except Exception as e:
-                print(f"[Scheduler] Error: {e}")
+                event_log.error("scheduler_error", error=e)
                 time.sleep(self.check_interval)
+
+    def wakeup(self, deadline: datetime = None):
+        """Wake the scheduler if `deadline` is earlier than the one it sleeps on"""
+        current = self._deadline
+        if deadline is None or current is None or deadline < current:
+            self._wakeup_event.set()
+
+    def route(self, job_type: str, queue):
+        """Send jobs of `job_type` to `queue` instead of the default worker queue"""
+        self.routes[job_type] = queue
+        if hasattr(queue, "on_space"):
+            queue.on_space = self.wakeup
+
+    def set_rate_limit(self, job_type: str, rate: float, burst: float = None):
+        """Dispatch at most `rate` jobs of `job_type` per second, in bursts of up to `burst`
+
+        A rate of None removes the limit.
+        """
+        if rate is None:
+            self.rate_limits.pop(job_type, None)
+        else:
+            self._rate_limited[job_type] = self.metrics.counter(
+                "dispatch_rate_limited_total", "Dispatch passes that left due jobs of a type behind for lack of tokens",
+                job_type=job_type)
+            self.rate_limits[job_type] = TokenBucket(rate, burst)
+        self.wakeup()
+
+    def _next_deadline(self):
+        """Earliest time at which there may be work to do"""
+        deadlines = [self.task_management.next_schedule_time()]
+        # Due jobs held back by a full queue, or waiting for tokens, would make this a busy loop
+        skip = self._blocked_types.union(self._throttled)
+        if not self._backpressured:
+            deadlines.append(self.priority_queue.next_run_time(skip_types=skip))
+        else:
+            # Only routed types can still go out until a worker frees a default slot
+            open_routes = [job_type for job_type in self.routes if job_type not in skip]
+            if open_routes:
+                deadlines.append(self.priority_queue.next_run_time(skip_types=skip, job_types=open_routes))
+        deadlines.extend(self._throttled.values())
+        deadlines = [d for d in deadlines if d is not None]
+        return min(deadlines) if deadlines else None
+
+    def _wait_for_next_deadline(self):
+        deadline = self._next_deadline()
+        if deadline is None:
+            timeout = self.max_idle_interval
+        else:
+            self._deadline = deadline
+            timeout = min((deadline - datetime.now()).total_seconds(), self.max_idle_interval)
+        if timeout > 0:
+            self._wakeup_event.wait(timeout)
     
     def _create_jobs_from_ready_tasks(self):
         """Create jobs from tasks that are ready to run"""
@@ -38,45 +142,185 @@ class Scheduler(threading.Thread):
         current_time = datetime.now()
         
         for task in ready_tasks:
-            # Create a job for this task
-            job = Job(
-                task_id=task.id,
-                run_time=task.schedule_time,
-                priority=0,  # Default priority, can be enhanced
-                status=JobStatus.IN_QUEUE
-            )
-            
-            # Add job to priority queue
-            self.priority_queue.add(job)
-            print(f"[Scheduler] Created job {job.id} for task {task.name}")
+            misfired = (current_time - task.schedule_time).total_seconds() > self.misfire_grace
+            if misfired and task.is_recurring() and task.misfire_policy == MisfirePolicy.SKIP:
+                # Drop the late fire and resume at the next one after now
+                next_time = task.next_fire_after(current_time)
+                self.task_management.reschedule_task(task.id, next_time)
+                event_log.info("fire_skipped", task=task.name, missed=task.schedule_time, next=next_time)
+                continue
+
+            policy = task.overlap_policy
+            if policy != OverlapPolicy.ALLOW and task.is_recurring() and self._overlaps(task):
+                # SKIP drops the fire; COALESCE folds it into one run after the active job ends
+                next_time = self._next_fire(task, misfired, current_time)
+                self.task_management.reschedule_task(task.id, next_time)
+                self._overlapping[policy].inc()
+                event_log.info("fire_overlapped", task=task.name, policy=policy, next=next_time)
+                continue
+
+            self._create_job(task, task.schedule_time)
             
             # Handle recurring tasks
             if task.is_recurring():
                 task.mark_executed()
-                # Update schedule time for next run
-                task.schedule_time = task.next_run_time()
+                # Update schedule time for next run (keeps the ready-time index in sync)
+                self.task_management.reschedule_task(task.id, self._next_fire(task, misfired, current_time))
             else:
                 # Remove non-recurring tasks after creating job
                 self.task_management.remove_task(task.id)
     
+    def _create_job(self, task, run_time: datetime):
+        job = Job(
+            task_id=task.id,
+            run_time=run_time,
+            priority=task.priority,
+            status=JobStatus.IN_QUEUE,
+            job_type=task.job_type,
+            payload=task.payload,
+            retry_policy=task.retry_policy,
+            max_retries=task.max_retries,
+            timeout=task.timeout
+        )
+        if task.overlap_policy != OverlapPolicy.ALLOW:
+            self.overlap.track(job)
+
+        # Add job to priority queue
+        self.priority_queue.add(job)
+        self.job_listeners.notify(job)
+        event_log.info("job_created", job=job.id, task=task.name)
+
+    def _owed_run(self, task_id):
+        # Called on the thread that finished the task's last active job
+        self._owed_runs.append(task_id)
+        self.wakeup()
+
+    def _create_owed_jobs(self):
+        """One job for each COALESCE task whose deferred fires came due while it was busy"""
+        while self._owed_runs:
+            task = self.task_management.get_task(self._owed_runs.popleft())
+            if task is not None:  # Removed meanwhile
+                self._create_job(task, datetime.now())
+                task.mark_executed()
+
+    def _next_fire(self, task, misfired, current_time):
+        # FIRE_ONCE collapses a backlog of missed fires into one job;
+        # FIRE_ALL steps through each missed fire on the following passes
+        if misfired and task.misfire_policy == MisfirePolicy.FIRE_ONCE:
+            return task.next_fire_after(current_time)
+        return task.next_run_time()
+
+    def _overlaps(self, task):
+        """True if the task's overlap policy holds back its current fire"""
+        if task.overlap_policy == OverlapPolicy.COALESCE:
+            return self.overlap.defer(task.id)
+        queued, running = self.overlap.active(task.id)
+        return queued > 0 or running > 0
+
     def _move_ready_jobs_to_worker_queue(self):
-        """Move jobs that are ready to run from priority queue to worker queue"""
+        """Move due jobs to the worker queues; False if the default queue filled up
+
+        Each bounded queue, the default one and every route, takes at most
+        its free slots per batch. A job whose queue turns out to be full (a
+        race with another producer) goes back to the priority queue, and
+        jobs for that queue are not popped again this pass; other queues
+        keep being served. Routed types whose queue is full are left out of
+        the next deadline until their queue calls on_space().
+
+        Rate-limited types are popped only up to their available tokens, so
+        their other due jobs stay in the priority queue rather than taking
+        worker slots. Types that run out with due jobs left behind are
+        recorded with the time they get a token again, which bounds the
+        scheduler's next sleep.
+        """
         current_time = datetime.now()
-        
-        # Check jobs in priority queue and move ready ones
-        while not self.priority_queue.is_empty():
-            job = self.priority_queue.peek()
-            
-            if job and job.run_time <= current_time:
-                # Remove from priority queue and add to worker queue
-                job = self.priority_queue.pop()
-                self.worker_queue.push(job)
-                print(f"[Scheduler] Moved job {job.id} to worker queue")
-            else:
-                # No more ready jobs
+        limits = dict(self.rate_limits)  # set_rate_limit may run on another thread
+        quotas = {job_type: bucket.available() for job_type, bucket in limits.items()}
+        try:
+            return self._dispatch_ready_jobs(current_time, limits, quotas)
+        finally:
+            throttled = {}
+            exhausted = [job_type for job_type, left in quotas.items() if left <= 0]
+            if exhausted:
+                for job_type in self.priority_queue.due_types(exhausted, current_time):
+                    throttled[job_type] = current_time + timedelta(seconds=limits[job_type].refill_time())
+                    self._rate_limited[job_type].inc()
+            self._throttled = throttled
+
+    def _dispatch_ready_jobs(self, current_time, limits, quotas):
+        full = set()  # Queues found full this pass
+        # Pop ready jobs in batches so the queue lock is taken once per batch
+        while True:
+            limit = self.dispatch_batch_size
+            pop_quotas = dict(quotas)
+            job_types = None
+            free_slots = self.worker_queue.free_slots()
+            if free_slots == 0:
+                full.add(self.worker_queue)
+            if self.worker_queue in full:
+                job_types = list(self.routes)
+            elif free_slots is not None and not self.routes:
+                limit = min(limit, free_slots)
+            for job_type, queue in self.routes.items():
+                free = 0 if queue in full else queue.free_slots()
+                if free == 0:
+                    full.add(queue)
+                if free is not None:
+                    pop_quotas[job_type] = min(free, pop_quotas.get(job_type, free))
+            if job_types is not None and not any(pop_quotas.get(job_type, 1) > 0 for job_type in job_types):
+                break
+            jobs = self.priority_queue.pop_ready(current_time, limit, pop_quotas, job_types)
+            held_back = []
+            for job in jobs:
+                queue = self.routes.get(job.job_type, self.worker_queue)
+                if queue in full or not queue.try_push(job):
+                    full.add(queue)
+                    held_back.append(job)
+                    continue
+                if job.job_type in quotas:
+                    quotas[job.job_type] -= 1
+                    limits[job.job_type].take()
+                job.dispatched_at = current_time
+                event_log.debug("job_dispatched", job=job.id)
+            if held_back:
+                # The queues that filled are skipped from now on, so the next batch serves the others
+                self.priority_queue.add_many(held_back)
+            elif len(jobs) < limit:
                 break
+        if full:
+            self._queue_full.inc(len(full))
+        self._blocked_types = {job_type for job_type, queue in self.routes.items() if queue in full}
+        return self.worker_queue not in full
+
+    def _balance_overflow(self):
+        """Spill the worst queued jobs past overflow_threshold; reload them below 80% of it"""
+        queued = len(self.priority_queue)
+        low_water = int(self.overflow_threshold * 0.8)
+        if queued > self.overflow_threshold:
+            jobs = self.priority_queue.pop_lowest(queued - low_water)
+            # Batches no larger than the gap between the marks, so a reload never re-spills
+            batch_size = max(1, self.overflow_threshold - low_water)
+            kept = []
+            for start in range(0, len(jobs), batch_size):
+                batch = jobs[start:start + batch_size]
+                try:
+                    self.overflow.append(batch)
+                except Exception as e:
+                    # Back to the priority queue rather than lost between the tiers
+                    event_log.error("spill_failed", count=len(batch), error=e)
+                    kept.extend(batch)
+            if kept:
+                self.priority_queue.add_many(kept)
+            self._spilled.inc(len(jobs) - len(kept))
+            event_log.info("jobs_spilled", count=len(jobs) - len(kept), on_disk=len(self.overflow))
+        elif queued < low_water and len(self.overflow):
+            jobs = self.overflow.read_batch()
+            self.priority_queue.add_many(jobs)
+            self._reloaded.inc(len(jobs))
+            event_log.info("jobs_reloaded", count=len(jobs), on_disk=len(self.overflow))
     
     def stop(self):
         """Stop the scheduler"""
         self.running = False
-        print("[Scheduler] Stopping...")
+        self._wakeup_event.set()
+        event_log.info("scheduler_stopping")
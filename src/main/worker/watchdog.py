@@ -0,0 +1,82 @@
+import heapq
+import itertools
+import threading
+from src.main.config import clock, event_log
+
+class Watchdog(threading.Thread):
+    """Enforces job timeouts from one thread with a heap of deadlines
+
+    Executors call watch() when they start a job and release() before they
+    record its outcome. A job's deadline is the time it was watched plus
+    job.timeout seconds. Whichever side removes the job from the active set
+    first owns its terminal transition: if the deadline passes first, the
+    watchdog calls on_expire(job) and the executor's later release() returns
+    False, so a late result is discarded.
+
+    watch() and release() are O(log n) and O(1); released jobs are left in
+    the heap and skipped, and the heap is rebuilt once they dominate it.
+    """
+
+    def __init__(self):
+        super().__init__(name="watchdog")
+        self.daemon = True
+        self.running = True
+        self.expired_count = 0
+        self._cond = threading.Condition()
+        self._heap = []
+        self._active = {}
+        self._counter = itertools.count()
+
+    def watch(self, job, on_expire):
+        """Start timing `job`; returns the ticket to pass to release()"""
+        ticket = (job.id, job.attempt_count)
+        with self._cond:
+            self._active[ticket] = (job, on_expire)
+            if job.timeout:
+                deadline = clock.now_ns() + int(job.timeout * 1e9)
+                entry = (deadline, next(self._counter), ticket)
+                heapq.heappush(self._heap, entry)
+                if self._heap[0] is entry:
+                    self._cond.notify()
+        return ticket
+
+    def release(self, ticket):
+        """Stop timing a job; returns False if it already timed out"""
+        if ticket is None:
+            return True
+        with self._cond:
+            released = self._active.pop(ticket, None) is not None
+            if len(self._heap) > 1024 and len(self._heap) > 2 * len(self._active):
+                self._heap = [entry for entry in self._heap if entry[2] in self._active]
+                heapq.heapify(self._heap)
+            return released
+
+    def run(self):
+        while self.running:
+            expired = []
+            with self._cond:
+                now = clock.now_ns()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, ticket = heapq.heappop(self._heap)
+                    watched = self._active.pop(ticket, None)
+                    if watched is not None:
+                        expired.append(watched)
+                if not expired:
+                    timeout = (self._heap[0][0] - now) / 1e9 if self._heap else None
+                    self._cond.wait(timeout)
+                    continue
+            # Callbacks run outside the lock; they may watch or release other jobs
+            for job, on_expire in expired:
+                self.expired_count += 1
+                try:
+                    on_expire(job)
+                except Exception as e:
+                    event_log.error("watchdog_error", job=job.id, error=e)
+
+    def __len__(self):
+        return len(self._active)
+
+    def stop(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify()
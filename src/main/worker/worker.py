@@ -1,64 +1,149 @@
 import threading
 import time
-from src.main.worker.worker_queue import WorkerQueue
+from concurrent.futures import CancelledError
+from src.main.worker.worker_queue import RETIRE, WorkerQueue
+from src.main.worker.job_handlers import JobHandlerRegistry
 from src.main.job.job import Job
+from src.main.job.job_listeners import JobListeners
+from src.main.config import event_log
 from src.main.config.job_status import JobStatus
-from src.main.config.job_type import JobType
+from src.main.config.execution_backend import ExecutionBackend
 
 class Worker(threading.Thread):
-    def __init__(self, worker_id: str, worker_queue: WorkerQueue):
+    def __init__(self, worker_id: str, worker_queue: WorkerQueue,
+                 handlers: JobHandlerRegistry = None, process_backend=None,
+                 job_listeners: JobListeners = None, retry_engine=None,
+                 watchdog=None, on_stuck=None):
         super().__init__()
+        self.job_listeners = job_listeners or JobListeners()
+        self.retry_engine = retry_engine
+        self.watchdog = watchdog
+        self.on_stuck = on_stuck  # called with this worker when a job times out on it
         self.worker_id = worker_id
         self.worker_queue = worker_queue
+        self.handlers = handlers or JobHandlerRegistry.with_simulated_handlers()
+        self.process_backend = process_backend
         self.daemon = True
         self.running = True
+        self.busy = False
 
     def run(self):
         """Main worker loop - consumes jobs from worker queue"""
-        print(f"[Worker-{self.worker_id}] Started")
+        event_log.info("worker_started", worker=self.worker_id)
         while self.running:
             try:
                 # Get job from worker queue (blocking call)
                 job = self.worker_queue.pop()
+                if job is RETIRE:
+                    # Jobs queued ahead of the pill were already taken, so none is dropped
+                    self.running = False
+                    event_log.info("worker_retired", worker=self.worker_id)
+                    break
                 if job:
-                    self._execute_job(job)
+                    self.busy = True
+                    try:
+                        self._execute_job(job)
+                    finally:
+                        self.busy = False
             except Exception as e:
-                print(f"[Worker-{self.worker_id}] Error: {e}")
+                event_log.error("worker_error", worker=self.worker_id, error=e)
                 time.sleep(1)
-    
+
+    def replacement(self):
+        """A fresh worker with the same configuration, to take over a stuck one"""
+        return Worker(self.worker_id, self.worker_queue, self.handlers, self.process_backend,
+                      self.job_listeners, self.retry_engine, self.watchdog, self.on_stuck)
+
     def _execute_job(self, job: Job):
-        """Execute a job based on its task type"""
+        """Execute a job with the handler registered for its job type"""
+        # Mark job as in progress
+        job.picked_by_worker(JobStatus.IN_PROGRESS, self.worker_id)
+        self.job_listeners.notify(job)
+        event_log.info("job_started", worker=self.worker_id, job=job.id, task=job.task_id)
+
+        handler, backend = self.handlers.get(job.job_type)
+        if backend == ExecutionBackend.PROCESS and self.process_backend is not None:
+            # The pool reports back through the callback; this thread moves on
+            submitted = []
+            ticket = [None]
+
+            def cancel(job):
+                if submitted:
+                    self.process_backend.cancel(submitted[0])
+
+            def start_watch():
+                # Once a pool slot is free, so time spent waiting for one is not counted
+                ticket[0] = self._watch(job, cancel)
+
+            try:
+                submitted.append(self.process_backend.submit(
+                    handler, job.payload, lambda future: self._finish_from_future(job, future, ticket[0]),
+                    on_start=start_watch))
+            except Exception as e:
+                self._fail_job(job, e, ticket[0])
+            return
+
+        ticket = self._watch(job, self._abandon)
         try:
-            # Mark job as in progress
-            job.picked_by_worker(JobStatus.IN_PROGRESS, self.worker_id)
-            print(f"[Worker-{self.worker_id}] Starting job {job.id} (task: {job.task_id})")
-            
-            # Simulate job execution based on job type
-            # In a real system, this would dispatch to actual job handlers
-            execution_time = self._get_execution_time_for_job_type(job)
-            time.sleep(execution_time)
-            
-            # Mark job as completed
-            job.complete_job()
-            print(f"[Worker-{self.worker_id}] Completed job {job.id}")
-            
+            result = handler(job.payload)
         except Exception as e:
-            # Mark job as failed
-            job.fail_job()
-            print(f"[Worker-{self.worker_id}] Failed job {job.id}: {e}")
-    
-    def _get_execution_time_for_job_type(self, job: Job):
-        """Simulate different execution times for different job types"""
-        # This would be replaced with actual job execution logic
-        job_type_times = {
-            JobType.EMAIL: 1,
-            JobType.NOTIFICATION: 0.5,
-            JobType.REPORT: 3,
-            JobType.DATA_EXPORT: 5
-        }
-        return job_type_times.get(job.task_id, 2)  # Default 2 seconds
-    
+            self._fail_job(job, e, ticket)
+            return
+        self._complete_job(job, result, ticket)
+
+    def _watch(self, job: Job, cancel):
+        if self.watchdog is None:
+            return None
+        return self.watchdog.watch(job, lambda job: self._time_out(job, cancel))
+
+    def _claim(self, job: Job, ticket):
+        """True if this worker, not the watchdog, records the job's outcome"""
+        if self.watchdog is None or self.watchdog.release(ticket):
+            return True
+        event_log.warning("late_outcome_discarded", worker=self.worker_id, job=job.id)
+        return False
+
+    def _time_out(self, job: Job, cancel):
+        """Watchdog callback: fail the job, then stop the work behind it"""
+        self._record_failure(job, TimeoutError(f"job exceeded its {job.timeout}s timeout"))
+        cancel(job)
+
+    def _abandon(self, job: Job):
+        """Give up on this thread while it is stuck in a handler and get it replaced"""
+        if not self.running:
+            return
+        self.running = False
+        event_log.warning("worker_stuck", worker=self.worker_id, job=job.id)
+        if self.on_stuck is not None:
+            self.on_stuck(self)
+
+    def _finish_from_future(self, job: Job, future, ticket):
+        error = CancelledError() if future.cancelled() else future.exception()
+        if error is not None:
+            self._fail_job(job, error, ticket)
+        else:
+            self._complete_job(job, future.result(), ticket)
+
+    def _complete_job(self, job: Job, result, ticket=None):
+        if not self._claim(job, ticket):
+            return
+        job.complete_job(result)
+        self.job_listeners.notify(job)
+        event_log.info("job_completed", worker=self.worker_id, job=job.id)
+
+    def _fail_job(self, job: Job, error: Exception, ticket=None):
+        if not self._claim(job, ticket):
+            return
+        self._record_failure(job, error)
+
+    def _record_failure(self, job: Job, error: Exception):
+        job.fail_job(error)
+        if self.retry_engine is not None and self.retry_engine.retry(job):
+            return
+        self.job_listeners.notify(job)
+        event_log.warning("job_failed", worker=self.worker_id, job=job.id, error=error)
+
     def stop(self):
         """Stop the worker"""
         self.running = False
-        print(f"[Worker-{self.worker_id}] Stopping...")
+        event_log.info("worker_stopping", worker=self.worker_id)
@@ -0,0 +1,204 @@
+import itertools
+import math
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+from src.main.config import event_log
+from src.main.config.job_status import JobStatus
+from src.main.worker.worker_queue import RETIRE, WorkerQueue
+
+# One scale decision; `size` fields count live workers, lag is in seconds
+ScaleEvent = namedtuple("ScaleEvent", "time action from_size to_size reason queue_depth lag busy")
+
+class ScalingPolicy:
+    """Decides the worker count from queue depth, pick lag and idleness
+
+    Scales up as soon as there are more than `target_queue_depth` queued
+    jobs per worker, or a job waited longer than `target_lag` seconds from
+    its run_time to being picked. Scales down one worker at a time once
+    workers have been idle with an empty queue for `cooldown` seconds, and
+    never within `cooldown` of the previous change.
+
+    decide() is a pure function of its inputs and the policy's own clock
+    state, so recorded traces can be replayed through it without threads.
+    """
+
+    def __init__(self, min_workers: int, max_workers: int, target_queue_depth: float = 2.0,
+                 target_lag: float = 1.0, cooldown: float = 10.0):
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, min_workers)
+        self.target_queue_depth = target_queue_depth
+        self.target_lag = target_lag
+        self.cooldown = cooldown
+        self._last_pressure = None
+        self._last_change = None
+
+    def decide(self, now: float, size: int, busy: int, queue_depth: int, lag: float):
+        """Return (target size, reason); reason is None when size stays the same"""
+        if self._last_pressure is None:
+            self._last_pressure = now
+        if size < self.min_workers:
+            return self._change(now, self.min_workers, "below minimum")
+
+        if queue_depth > 0 or busy >= size:
+            self._last_pressure = now
+        wanted = size
+        reason = None
+        if queue_depth > self.target_queue_depth * size:
+            wanted = math.ceil(queue_depth / self.target_queue_depth)
+            reason = f"queue depth {queue_depth}"
+        elif lag > self.target_lag and queue_depth > 0:
+            wanted = size + max(1, size // 2)
+            reason = f"pick lag {lag:.2f}s"
+        if reason is not None:
+            wanted = min(wanted, self.max_workers)
+            if wanted > size:
+                return self._change(now, wanted, reason)
+            return size, None
+
+        idle = size - busy
+        if (idle > 0 and size > self.min_workers
+                and now - self._last_pressure >= self.cooldown
+                and (self._last_change is None or now - self._last_change >= self.cooldown)):
+            return self._change(now, size - 1, f"idle for {now - self._last_pressure:.0f}s")
+        return size, None
+
+    def _change(self, now, target, reason):
+        self._last_change = now
+        return target, reason
+
+class WorkerPool(threading.Thread):
+    """Elastic set of workers consuming one WorkerQueue
+
+    A controller thread samples queue depth, busy workers and the largest
+    run_time-to-pick lag since the last sample every `interval` seconds,
+    and asks the ScalingPolicy for a target size. New workers come from
+    `worker_factory(worker_id)`. Workers are retired by pushing a RETIRE
+    pill, so a worker only exits between jobs and no queued job is dropped.
+
+    Every change is recorded as a ScaleEvent in `events` and passed to the
+    `on_scale` callbacks; metrics() returns counters for dashboards.
+    """
+
+    def __init__(self, worker_queue: WorkerQueue, worker_factory, policy: ScalingPolicy,
+                 job_listeners=None, interval: float = 0.5, max_events: int = 1000):
+        super().__init__(name="worker-pool")
+        self.daemon = True
+        self.running = True
+        self.worker_queue = worker_queue
+        self.worker_factory = worker_factory
+        self.policy = policy
+        self.interval = interval
+        self.workers = []
+        self.events = deque(maxlen=max_events)
+        self.on_scale = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._worker_ids = set()
+        self._pending_retirements = 0
+        self._max_lag = 0.0
+        self._counters = {"scale_ups": 0, "scale_downs": 0, "workers_started": 0,
+                          "workers_retired": 0, "workers_replaced": 0}
+        if job_listeners is not None:
+            job_listeners.add(self._record_pick)
+
+    def start(self):
+        """Start the minimum number of workers, then the controller if the pool can grow"""
+        with self._lock:
+            self._add_workers(self.policy.min_workers)
+        if self.policy.max_workers > self.policy.min_workers:
+            super().start()
+
+    def run(self):
+        while self.running:
+            time.sleep(self.interval)
+            try:
+                self.rebalance()
+            except Exception as e:
+                event_log.error("worker_pool_error", error=e)
+
+    def rebalance(self):
+        """Take one sample and apply the policy's decision"""
+        with self._lock:
+            self._prune()
+            size = len(self.workers) - self._pending_retirements
+            busy = sum(1 for worker in self.workers if worker.busy)
+            queue_depth = max(0, self.worker_queue.qsize() - self._pending_retirements)
+            lag, self._max_lag = self._max_lag, 0.0
+            target, reason = self.policy.decide(time.monotonic(), size, busy, queue_depth, lag)
+            if reason is None or target == size:
+                return
+            if target > size:
+                self._add_workers(target - size)
+                self._counters["scale_ups"] += 1
+                action = "up"
+            else:
+                for _ in range(size - target):
+                    self._pending_retirements += 1
+                    self.worker_queue.push(RETIRE)
+                self._counters["scale_downs"] += 1
+                action = "down"
+            event = ScaleEvent(datetime.now(), action, size, target, reason, queue_depth, lag, busy)
+            self.events.append(event)
+        event_log.info("worker_pool_scaled", action=action, size=size, target=target, reason=reason)
+        for callback in self.on_scale:
+            callback(event)
+
+    def replace(self, worker):
+        """Swap a stuck worker for a fresh one (watchdog callback)"""
+        replacement = worker.replacement()
+        with self._lock:
+            if worker in self.workers:
+                self.workers[self.workers.index(worker)] = replacement
+            else:
+                self.workers.append(replacement)
+            self._counters["workers_replaced"] += 1
+        replacement.start()
+
+    def metrics(self):
+        with self._lock:
+            self._prune()
+            return dict(self._counters,
+                        size=len(self.workers) - self._pending_retirements,
+                        busy=sum(1 for worker in self.workers if worker.busy),
+                        queue_depth=self.worker_queue.qsize(),
+                        min_workers=self.policy.min_workers,
+                        max_workers=self.policy.max_workers)
+
+    def stop(self):
+        self.running = False
+        with self._lock:
+            workers = list(self.workers)
+        for worker in workers:
+            worker.stop()
+
+    def __len__(self):
+        with self._lock:
+            return len(self.workers) - self._pending_retirements
+
+    def _add_workers(self, count):
+        for _ in range(count):
+            worker = self.worker_factory(f"worker-{next(self._ids)}")
+            self._worker_ids.add(worker.worker_id)
+            self.workers.append(worker)
+            worker.start()
+            self._counters["workers_started"] += 1
+
+    def _prune(self):
+        """Forget workers that exited after taking a RETIRE pill"""
+        alive = []
+        for worker in self.workers:
+            if worker.is_alive():
+                alive.append(worker)
+            else:
+                self._pending_retirements = max(0, self._pending_retirements - 1)
+                self._counters["workers_retired"] += 1
+        self.workers[:] = alive
+
+    def _record_pick(self, job):
+        # JobListeners callback; only IN_PROGRESS transitions carry a pick
+        if job.status is JobStatus.IN_PROGRESS and job.worker_id in self._worker_ids:
+            lag = (datetime.now() - job.run_time).total_seconds()
+            if lag > self._max_lag:
+                self._max_lag = lag
@@ -1,15 +1,88 @@
 import queue
+import time
+
+# Pushed onto a WorkerQueue to make exactly one consumer exit once it gets there
+RETIRE = object()
 
 class WorkerQueue:
-    def __init__(self):
-        self.q = queue.Queue()
+    """Hand-off queue between the scheduler and workers
+
+    With maxsize > 0, push() blocks while the queue is full; the scheduler
+    uses try_push() instead and leaves jobs in the priority queue, then
+    calls on_space() from the next pop to resume dispatching.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.q = queue.Queue(maxsize)
+        self.maxsize = maxsize
+        self.on_space = None
+        self._full = False
 
     def push(self, job):
         self.q.put(job)
+
+    def try_push(self, job):
+        """Push without blocking; False if the queue is full"""
+        # Flagged before trying so a pop racing with a failed put still signals
+        self._full = True
+        try:
+            self.q.put_nowait(job)
+        except queue.Full:
+            return False
+        self._full = False
+        return True
+
+    def free_slots(self):
+        """Jobs that can be pushed without blocking, or None if unbounded
+
+        When there are none, the next pop calls on_space().
+        """
+        if not self.maxsize:
+            return None
+        self._full = True
+        free = max(0, self.maxsize - self.q.qsize())
+        if free:
+            self._full = False
+        return free
     
     def pop(self):
-        return self.q.get()
+        job = self.q.get()
+        if self._full:
+            self._space_freed()
+        return job
+
+    def pop_batch(self, max_size: int, linger: float):
+        """Block for one job, then collect up to max_size within `linger` seconds
+
+        A RETIRE pill ends the batch early and is returned as its last item.
+        """
+        jobs = [self.q.get()]
+        deadline = time.monotonic() + linger
+        while len(jobs) < max_size and jobs[-1] is not RETIRE:
+            try:
+                jobs.append(self.q.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self.q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        if self._full:
+            self._space_freed()
+        return jobs
     
     def is_empty(self):
         return self.q.empty()
+
+    def qsize(self):
+        return self.q.qsize()
+
+    def _space_freed(self):
+        self._full = False
+        if self.on_space is not None:
+            self.on_space()
     
\ No newline at end of file
@@ -17,26 +17,24 @@ from src.main.worker.worker_queue import WorkerQueue
 from src.main.job.job import Job
 from src.main.config.job_status import JobStatus
 
-def test_singleton_behavior():
-    """Test that JobPriorityQueue is truly a singleton"""
-    print("🔍 Testing Singleton Behavior:")
+def test_queue_isolation():
+    """Test that separate JobPriorityQueue instances do not share state"""
+    print("🔍 Testing Queue Isolation:")
     
     # Create multiple instances
     queue1 = JobPriorityQueue()
     queue2 = JobPriorityQueue()
-    queue3 = JobPriorityQueue()
     
     print(f"Queue1 ID: {id(queue1)}")
     print(f"Queue2 ID: {id(queue2)}")
-    print(f"Queue3 ID: {id(queue3)}")
-    print(f"Are they the same object? {queue1 is queue2 is queue3}")
+    print(f"Are they the same object? {queue1 is queue2}")
     
-    # Test that changes in one affect all
+    # Test that changes in one do not affect the other
     job1 = Job("test-task-1", datetime.now(), priority=1)
     queue1.add(job1)
     
-    print(f"Added job to queue1, queue2 size: {len(queue2.heap)}")
-    print(f"queue3 peek: {queue3.peek()}")
+    print(f"Added job to queue1, queue1 size: {len(queue1)}, queue2 size: {len(queue2)}")
+    print(f"queue2 peek: {queue2.peek()}")
     print()
 
 def test_worker_queue_thread_safety():
@@ -111,12 +109,13 @@ def test_priority_queue_ordering():
     print()
 
 def test_concurrent_priority_queue_access():
-    """Test concurrent access to singleton priority queue"""
+    """Test concurrent access to a shared, sharded priority queue"""
     print("🔍 Testing Concurrent Priority Queue Access:")
     
+    pq = JobPriorityQueue(num_shards=2)  # Shared by all threads below
+    
     def add_jobs_to_pq(thread_id, num_jobs):
         """Add jobs to priority queue from multiple threads"""
-        pq = JobPriorityQueue()  # Each thread gets same singleton instance
         for i in range(num_jobs):
             job = Job(f"thread-{thread_id}-job-{i}", datetime.now(), priority=thread_id)
             pq.add(job)
@@ -125,7 +124,6 @@ def test_concurrent_priority_queue_access():
     
     def consume_jobs_from_pq(consumer_id, num_jobs):
         """Consume jobs from priority queue"""
-        pq = JobPriorityQueue()  # Same singleton instance
         for i in range(num_jobs):
             while pq.is_empty():
                 time.sleep(0.05)  # Wait for jobs
@@ -154,11 +152,11 @@ def test_concurrent_priority_queue_access():
 
 def main():
     print("=" * 60)
-    print("THREAD SAFETY & SINGLETON DEMONSTRATION")
+    print("THREAD SAFETY DEMONSTRATION")
     print("=" * 60)
     print()
     
-    test_singleton_behavior()
+    test_queue_isolation()
     test_priority_queue_ordering()
     test_worker_queue_thread_safety()
     test_concurrent_priority_queue_access()